@@ -0,0 +1,83 @@
+"""Compare the streaming hierarchy filter with the ElementTree round-trip it replaced.
+
+Usage: python benchmarks/bench_hierarchy_filter.py [dump.xml ...]
+
+Without arguments, synthetic RecyclerView-style dumps of increasing size are used. Pass files
+saved from ``d.dump_hierarchy()`` to measure real-world screens.
+"""
+
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ui.hierarchy_service import filter_hierarchy_xml  # noqa: E402
+
+ATTRIBUTES = ["text", "resource-id", "bounds", "class"]
+NODE_ATTRIBUTES = (
+    'index="{index}" text="Item {index} &amp; more" resource-id="com.example:id/title" '
+    'class="android.widget.TextView" package="com.example" content-desc="" checkable="false" '
+    'checked="false" clickable="true" enabled="true" focusable="true" focused="false" '
+    'scrollable="false" long-clickable="false" password="false" selected="false" '
+    'bounds="[0,{top}][1080,{bottom}]" drawing-order="{index}" hint=""'
+)
+
+
+def elementtree_filter(xml_dump: str, attributes_to_keep: list[str]) -> str:
+    root = ET.fromstring(xml_dump)
+    for node in root.iter():
+        for attribute in list(node.attrib):
+            if attribute not in attributes_to_keep:
+                del node.attrib[attribute]
+    return ET.tostring(root, encoding="unicode")
+
+
+def synthetic_dump(rows: int) -> str:
+    lines = ["<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>", '<hierarchy rotation="0">']
+    lines.append(f"  <node {NODE_ATTRIBUTES.format(index=0, top=0, bottom=2400)}>")
+    for row in range(rows):
+        top = row * 120
+        lines.append(f"    <node {NODE_ATTRIBUTES.format(index=row, top=top, bottom=top + 120)}>")
+        for child in range(3):
+            lines.append(f"      <node {NODE_ATTRIBUTES.format(index=child, top=top, bottom=top + 40)} />")
+        lines.append("    </node>")
+    lines.append("  </node>")
+    lines.append("</hierarchy>")
+    return "\n".join(lines)
+
+
+def measure(func, xml_dump: str, repeat: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(xml_dump, ATTRIBUTES)
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+
+    tracemalloc.start()
+    func(xml_dump, ATTRIBUTES)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / (1024 * 1024)
+
+
+def main(paths: list[str]) -> None:
+    if paths:
+        dumps = [(Path(path).name, Path(path).read_text(encoding="utf-8")) for path in paths]
+    else:
+        dumps = [(f"synthetic-{rows}-rows", synthetic_dump(rows)) for rows in (100, 1000, 5000)]
+
+    print(f"{'dump':<24}{'nodes':>8}{'etree ms':>11}{'stream ms':>11}{'etree MiB':>11}{'stream MiB':>12}")
+    for name, xml_dump in dumps:
+        if filter_hierarchy_xml(xml_dump, ATTRIBUTES) != elementtree_filter(xml_dump, ATTRIBUTES):
+            raise SystemExit(f"{name}: streaming output differs from ElementTree output")
+        repeat = max(1, 200_000 // max(1, len(xml_dump) // 100))
+        etree_ms, etree_mib = measure(elementtree_filter, xml_dump, repeat)
+        stream_ms, stream_mib = measure(filter_hierarchy_xml, xml_dump, repeat)
+        nodes = xml_dump.count("<node")
+        print(f"{name:<24}{nodes:>8}{etree_ms:>11.2f}{stream_ms:>11.2f}{etree_mib:>11.2f}{stream_mib:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
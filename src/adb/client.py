@@ -1,11 +1,58 @@
-from adbutils import adb
+from adbutils import AdbClient
+
+from adb.wire_client import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    AdbConnectionPool,
+    AdbWireClient,
+    PooledAdbDevice,
+    parse_device_states,
+)
 
 
 class AdbClientProvider:
-    """Thin wrapper around adbutils global client."""
+    """Thin wrapper around an adbutils client for the adb server at ``host``:``port``.
+
+    With a ``pool`` the calls this server makes (device listing, state, shell, transports)
+    go over pooled adb server connections; everything else falls back to adbutils.
+    """
+
+    def __init__(self, pool: AdbConnectionPool | None = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self._adb = AdbClient(host=host, port=port)
+        self._wire_client = AdbWireClient(pool) if pool is not None else None
 
     def list_devices(self):
-        return adb.device_list()
+        if self._wire_client is None:
+            return self._adb.device_list()
+        states = self._wire_client.device_states()
+        return [self.get_device(serial) for serial, state in states.items() if state == "device"]
 
     def get_device(self, serial: str):
-        return adb.device(serial=serial)
+        if self._wire_client is None:
+            return self.adbutils_device(serial)
+        return PooledAdbDevice(self._wire_client, serial, fallback=lambda: self.adbutils_device(serial))
+
+    def adbutils_device(self, serial: str):
+        """Plain adbutils device on the configured server, for libraries that need one (uiautomator2)."""
+        return self._adb.device(serial=serial)
+
+    def track_devices(self):
+        """Yield a full ``{serial: state}`` snapshot each time the adb server reports a change."""
+        if self._wire_client is not None:
+            yield from self._wire_client.track_devices()
+            return
+        connection = self._adb.make_connection()
+        try:
+            connection.send_command("host:track-devices")
+            connection.check_okay()
+            while True:
+                yield parse_device_states(connection.read_string_block())
+        finally:
+            connection.close()
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        if self._wire_client is not None and not present:
+            self._wire_client.pool.invalidate(serial)
+
+    def stats(self) -> dict | None:
+        return self._wire_client.pool.stats() if self._wire_client is not None else None
@@ -0,0 +1,86 @@
+import logging
+from threading import Event, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+ONLINE_STATE = "device"
+
+
+class DeviceInventory:
+    """In-memory view of attached devices kept current by an adb track-devices watcher."""
+
+    def __init__(self, client_provider, reconnect_backoff_s: float = 1.0):
+        self._client_provider = client_provider
+        self._reconnect_backoff_s = reconnect_backoff_s
+        self._states: dict[str, str] = {}
+        self._synced = False
+        self._listeners = []
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = Thread(target=self._watch, name="adb-track-devices", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._lock:
+            self._thread = None
+            self._synced = False
+
+    def add_listener(self, listener) -> None:
+        """Register ``listener(serial, present)`` called when a device comes online or goes away."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def is_synced(self) -> bool:
+        with self._lock:
+            return self._synced
+
+    def serials(self) -> list[str]:
+        with self._lock:
+            return sorted(serial for serial, state in self._states.items() if state == ONLINE_STATE)
+
+    def contains(self, serial: str) -> bool:
+        with self._lock:
+            return self._states.get(serial) == ONLINE_STATE
+
+    def states(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._states)
+
+    def apply_snapshot(self, states: dict[str, str]) -> None:
+        with self._lock:
+            previous = {serial for serial, state in self._states.items() if state == ONLINE_STATE}
+            current = {serial for serial, state in states.items() if state == ONLINE_STATE}
+            self._states = dict(states)
+            self._synced = True
+            listeners = list(self._listeners)
+
+        events = [(serial, False) for serial in sorted(previous - current)]
+        events += [(serial, True) for serial in sorted(current - previous)]
+        for serial, present in events:
+            for listener in listeners:
+                try:
+                    listener(serial, present)
+                except Exception:
+                    logger.exception("Device inventory listener failed for %s", serial)
+
+    def _watch(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                for states in self._client_provider.track_devices():
+                    if self._stop_event.is_set():
+                        return
+                    self.apply_snapshot(states)
+            except Exception as error:
+                logger.warning("adb track-devices watcher disconnected: %s", error)
+
+            with self._lock:
+                self._synced = False
+            self._stop_event.wait(self._reconnect_backoff_s)
@@ -1,34 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+
 from models.device import DeviceInfo
 
+# Device properties fetched in a single shell round-trip, keyed by DeviceInfo field.
+DEVICE_PROPERTIES = {
+    "model": "ro.product.model",
+    "android_version": "ro.build.version.release",
+}
+
 
 class DeviceManager:
-    """Handles device discovery and metadata retrieval from adbutils."""
+    """Handles device discovery and metadata retrieval from adbutils.
+
+    Only the static properties (model, Android version) are cached for ``info_ttl_s``; the
+    device state is always current, read from a synced inventory or asked from adb.
+    """
 
-    def __init__(self, client_provider):
+    def __init__(self, client_provider, info_ttl_s: float = 30.0, max_workers: int = 16, inventory=None):
         self._client_provider = client_provider
+        self._inventory = inventory
+        self._info_ttl_s = info_ttl_s
+        self._max_workers = max(1, max_workers)
+        self._properties_cache: dict[str, tuple[dict[str, str], float]] = {}
+        self._cache_lock = Lock()
 
     def list_devices(self) -> list[DeviceInfo]:
-        devices = []
-        for device in self._client_provider.list_devices():
-            state = self._safe_get_state(device)
-            model = self._safe_shell(device, "getprop ro.product.model")
-            android_version = self._safe_shell(device, "getprop ro.build.version.release")
-            devices.append(
-                DeviceInfo(
-                    serial=device.serial,
-                    state=state,
-                    model=model or None,
-                    android_version=android_version or None,
-                )
-            )
-        return devices
+        devices = self._list_adb_devices()
+        self._prune_cache({device.serial for device in devices})
+        states = self._known_states()
+
+        infos: dict[str, DeviceInfo] = {}
+        pending = []
+        for device in devices:
+            properties = self._get_cached_properties(device.serial)
+            if properties is None or device.serial not in states:
+                pending.append(device)
+            else:
+                infos[device.serial] = _device_info(device.serial, states[device.serial], properties)
+
+        for info in self._probe_devices(pending, states):
+            infos[info.serial] = info
+        return [infos[device.serial] for device in devices]
+
+    def get_device_info(self, serial: str) -> DeviceInfo | None:
+        if serial not in self.list_serials():
+            self.invalidate(serial)
+            return None
+        return self._probe_device(self.get_device(serial), self._known_states())
 
     def list_serials(self) -> list[str]:
+        if self.inventory_synced():
+            return self._inventory.serials()
         return [device.serial for device in self._client_provider.list_devices()]
 
+    def inventory_synced(self) -> bool:
+        """True when ``list_serials`` answers from the device inventory instead of an adb round trip."""
+        return self._inventory is not None and self._inventory.is_synced()
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        self.invalidate(serial)
+
     def get_device(self, serial: str):
         return self._client_provider.get_device(serial)
 
+    def invalidate(self, serial: str | None = None) -> None:
+        with self._cache_lock:
+            if serial is None:
+                self._properties_cache.clear()
+            else:
+                self._properties_cache.pop(serial, None)
+
+    def _list_adb_devices(self) -> list:
+        if self.inventory_synced():
+            return [self.get_device(serial) for serial in self._inventory.serials()]
+        return list(self._client_provider.list_devices())
+
+    def _known_states(self) -> dict[str, str]:
+        """Device states the inventory already holds (empty when it is not synced)."""
+        return self._inventory.states() if self.inventory_synced() else {}
+
+    def _probe_devices(self, devices, states: dict[str, str]) -> list[DeviceInfo]:
+        if not devices:
+            return []
+        if len(devices) == 1:
+            return [self._probe_device(devices[0], states)]
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(devices))) as pool:
+            return list(pool.map(lambda device: self._probe_device(device, states), devices))
+
+    def _probe_device(self, device, states: dict[str, str]) -> DeviceInfo:
+        state = states.get(device.serial) or self._safe_get_state(device)
+        properties = self._get_cached_properties(device.serial)
+        if properties is None:
+            properties = self._safe_getprops(device, DEVICE_PROPERTIES)
+            # A failed probe is not cached, so metadata appears as soon as the device answers.
+            if properties and self._info_ttl_s > 0:
+                with self._cache_lock:
+                    self._properties_cache[device.serial] = (properties, monotonic())
+        return _device_info(device.serial, state, properties)
+
+    def _get_cached_properties(self, serial: str) -> dict[str, str] | None:
+        if self._info_ttl_s <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._properties_cache.get(serial)
+            if entry is None:
+                return None
+            properties, fetched_at = entry
+            if monotonic() - fetched_at > self._info_ttl_s:
+                self._properties_cache.pop(serial, None)
+                return None
+            return properties
+
+    def _prune_cache(self, serials: set[str]) -> None:
+        with self._cache_lock:
+            for serial in list(self._properties_cache):
+                if serial not in serials:
+                    del self._properties_cache[serial]
+
     @staticmethod
     def _safe_get_state(device) -> str:
         try:
@@ -37,9 +127,25 @@ class DeviceManager:
             return "unknown"
 
     @staticmethod
-    def _safe_shell(device, command: str) -> str:
+    def _safe_getprops(device, properties: dict[str, str]) -> dict[str, str]:
+        command = "; ".join(f'echo "{key}=$(getprop {prop})"' for key, prop in properties.items())
         try:
-            output = device.shell(command)
-            return str(output).strip()
+            output = str(device.shell(command))
         except Exception:
-            return ""
+            return {}
+
+        values = {}
+        for line in output.splitlines():
+            key, separator, value = line.partition("=")
+            if separator and key in properties:
+                values[key] = value.strip()
+        return values
+
+
+def _device_info(serial: str, state: str, properties: dict[str, str]) -> DeviceInfo:
+    return DeviceInfo(
+        serial=serial,
+        state=state,
+        model=properties.get("model") or None,
+        android_version=properties.get("android_version") or None,
+    )
@@ -0,0 +1,132 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from time import monotonic
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    data: bytes
+    captured_at: float
+    generation: int | None = None
+
+
+class FrameGrabber:
+    """Captures frames periodically in the background and keeps the latest ones in a ring buffer.
+
+    The grabber stops by itself after ``idle_timeout_s`` without readers and is restarted by
+    ``ensure_running`` on the next read, so idle devices cost no capture or USB bandwidth.
+    With a ``generation`` callable (the session's UI generation) every frame is tagged with the
+    generation read before its capture started, and ``latest`` never returns a frame taken
+    before the last input action.
+    """
+
+    def __init__(
+        self,
+        capture,
+        interval_s: float = 1.0,
+        ring_size: int = 3,
+        idle_timeout_s: float = 30.0,
+        generation=None,
+    ):
+        self._capture = capture
+        self._generation = generation
+        self._interval_s = max(0.0, interval_s)
+        self._idle_timeout_s = idle_timeout_s
+        self._frames: deque[CapturedFrame] = deque(maxlen=max(1, ring_size))
+        self._last_read_at = monotonic()
+        self._captured = 0
+        self._errors = 0
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def interval_s(self) -> float:
+        return self._interval_s
+
+    def is_running(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def ensure_running(self) -> None:
+        with self._lock:
+            self._last_read_at = monotonic()
+            if self._thread is not None:
+                return
+            self._stop_event = Event()
+            self._thread = Thread(target=self._run, args=(self._stop_event,), name="frame-grabber", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_event.set()
+            self._thread = None
+
+    def current_generation(self) -> int | None:
+        return self._generation() if self._generation is not None else None
+
+    def latest(self, max_age_s: float | None = None) -> CapturedFrame | None:
+        """Return the newest frame, or ``None`` if it is older than ``max_age_s`` or predates the current generation."""
+        generation = self.current_generation()
+        with self._lock:
+            self._last_read_at = monotonic()
+            if not self._frames:
+                return None
+            frame = self._frames[-1]
+        if max_age_s is not None and monotonic() - frame.captured_at > max_age_s:
+            return None
+        if generation is not None and (frame.generation is None or frame.generation < generation):
+            return None
+        return frame
+
+    def frames(self) -> list[CapturedFrame]:
+        with self._lock:
+            return list(self._frames)
+
+    def offer(self, data: bytes, captured_at: float | None = None, generation: int | None = None) -> None:
+        """Add a frame captured outside the grabber, e.g. by a synchronous request.
+
+        ``generation`` is the UI generation read before the capture started.
+        """
+        frame = CapturedFrame(
+            data=data, captured_at=monotonic() if captured_at is None else captured_at, generation=generation
+        )
+        with self._lock:
+            if not self._frames or frame.captured_at >= self._frames[-1].captured_at:
+                self._frames.append(frame)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "buffered_frames": len(self._frames),
+                "frames_captured": self._captured,
+                "capture_errors": self._errors,
+            }
+
+    def _run(self, stop_event: Event) -> None:
+        while not stop_event.is_set():
+            with self._lock:
+                if monotonic() - self._last_read_at > self._idle_timeout_s:
+                    if self._thread is not None and self._stop_event is stop_event:
+                        self._thread = None
+                    return
+
+            started_at = monotonic()
+            generation = self.current_generation()
+            try:
+                data = self._capture()
+            except Exception as error:
+                with self._lock:
+                    self._errors += 1
+                logger.debug("Frame capture failed: %s", error)
+            else:
+                self.offer(data, captured_at=started_at, generation=generation)
+                with self._lock:
+                    self._captured += 1
+
+            stop_event.wait(max(0.0, self._interval_s - (monotonic() - started_at)))
@@ -0,0 +1,38 @@
+import struct
+from dataclasses import dataclass
+
+# android.graphics.PixelFormat / HAL pixel formats emitted by `screencap` without `-p`.
+PIXEL_FORMAT_RAWMODES = {
+    1: "RGBA",  # RGBA_8888
+    2: "RGBX",  # RGBX_8888
+    5: "BGRA",  # BGRA_8888
+}
+BYTES_PER_PIXEL = 4
+# Android 9+ appends a colorspace word to the original width/height/format header.
+HEADER_SIZES = (16, 12)
+
+
+@dataclass(frozen=True)
+class RawFrame:
+    width: int
+    height: int
+    rawmode: str
+    pixels: memoryview
+
+
+def parse_raw_screencap(data: bytes) -> RawFrame:
+    """Parse raw `screencap` output without copying the pixel buffer."""
+    if len(data) < HEADER_SIZES[-1]:
+        raise ValueError("Raw screencap output is too short")
+
+    width, height, pixel_format = struct.unpack_from("<III", data, 0)
+    rawmode = PIXEL_FORMAT_RAWMODES.get(pixel_format)
+    if rawmode is None:
+        raise ValueError(f"Unsupported screencap pixel format: {pixel_format}")
+
+    pixel_bytes = width * height * BYTES_PER_PIXEL
+    for header_size in HEADER_SIZES:
+        if len(data) == header_size + pixel_bytes:
+            pixels = memoryview(data)[header_size:]
+            return RawFrame(width=width, height=height, rawmode=rawmode, pixels=pixels)
+    raise ValueError(f"Unexpected raw screencap size {len(data)} for {width}x{height}")
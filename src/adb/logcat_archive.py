@@ -0,0 +1,387 @@
+import json
+import logging
+import mmap
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+from adb.logcat_reader import LogcatReader, levels_at_or_above
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+# ActivityManager announces new processes as "Start proc <pid>:<package>/<uid> ...".
+_START_PROC_PATTERN = re.compile(r"Start proc (\d+):([^/\s]+)")
+
+
+@dataclass
+class _PendingBlock:
+    lines: list[str] = field(default_factory=list)
+    size: int = 0
+    min_ts: float | None = None
+    max_ts: float | None = None
+    levels: set[str] = field(default_factory=set)
+    pids: set[int] = field(default_factory=set)
+
+    def add(self, record, line: str) -> None:
+        self.lines.append(line)
+        self.size += len(line)
+        self.levels.add(record.level)
+        self.pids.add(record.pid)
+        if record.timestamp is not None:
+            self.min_ts = record.timestamp if self.min_ts is None else min(self.min_ts, record.timestamp)
+            self.max_ts = record.timestamp if self.max_ts is None else max(self.max_ts, record.timestamp)
+
+
+class _DeviceLog:
+    """Append state for one device: the open segment, its pending block and the pid-to-package map."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.lock = Lock()
+        self.segment_path: Path | None = None
+        self.segment_size = 0
+        self.block = _PendingBlock()
+        self.packages: dict[int, str] = {}
+        self.last_flush_at = time.monotonic()
+        self.last_archived_ts = _last_indexed_ts(directory)
+
+
+class LogcatArchive:
+    """Stores parsed logcat records in rotating, block-compressed segment files per device.
+
+    Each segment is a sequence of zlib blocks; a sidecar index lists every block's offset, time
+    range, levels and pid-to-package map so searches only decompress blocks that can match.
+    Retention runs when the archive opens, whenever a segment rotates and on every
+    ``enforce_retention`` call, so quiet or detached devices age out as well.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        block_max_bytes: int = 64 * 1024,
+        flush_interval_s: float = 5.0,
+        retention_bytes: int = 1024 * 1024 * 1024,
+        retention_age_s: float = 72 * 3600,
+    ):
+        self._root = Path(root_dir)
+        self._segment_max_bytes = segment_max_bytes
+        self._block_max_bytes = block_max_bytes
+        self._flush_interval_s = flush_interval_s
+        self._retention_bytes = retention_bytes
+        self._retention_age_s = retention_age_s
+        self._devices: dict[str, _DeviceLog] = {}
+        self._lock = Lock()
+        self.enforce_retention()
+
+    def append(self, serial: str, record) -> None:
+        device_log = self._device_log(serial)
+        with device_log.lock:
+            if record.timestamp is not None and device_log.last_archived_ts is not None:
+                # Readers replay the device buffer when they (re)start; skip what is already archived.
+                if record.timestamp <= device_log.last_archived_ts:
+                    return
+                device_log.last_archived_ts = None
+
+            started = _START_PROC_PATTERN.search(record.message)
+            if started:
+                device_log.packages[int(started.group(1))] = started.group(2)
+
+            line = "\t".join(
+                [record.time_text, str(record.pid), str(record.tid), record.level, record.tag, record.message]
+            )
+            device_log.block.add(record, line + "\n")
+            due = time.monotonic() - device_log.last_flush_at >= self._flush_interval_s
+            if device_log.block.size >= self._block_max_bytes or due:
+                self._flush_locked(device_log)
+
+    def note_pids(self, serial: str, app_package: str, pids: set[int]) -> None:
+        """Record pids known to belong to ``app_package`` (e.g. from ``pidof``)."""
+        device_log = self._device_log(serial)
+        with device_log.lock:
+            for pid in pids:
+                device_log.packages[pid] = app_package
+
+    def flush(self, serial: str | None = None) -> None:
+        with self._lock:
+            device_logs = list(self._devices.values()) if serial is None else [self._devices.get(serial)]
+        for device_log in device_logs:
+            if device_log is None:
+                continue
+            with device_log.lock:
+                self._flush_locked(device_log)
+
+    def enforce_retention(self) -> int:
+        """Delete expired or over-budget segments in every device directory and return how many were removed."""
+        if not self._root.is_dir():
+            return 0
+        removed = 0
+        for directory in sorted(path for path in self._root.iterdir() if path.is_dir()):
+            with self._lock:
+                device_log = next((log for log in self._devices.values() if log.directory == directory), None)
+            if device_log is None:
+                removed += self._apply_retention(directory, active_segment=None)
+                continue
+            with device_log.lock:
+                removed += self._apply_retention(directory, active_segment=device_log.segment_path)
+                if device_log.segment_path is not None and not device_log.segment_path.exists():
+                    device_log.segment_path = None
+                    device_log.segment_size = 0
+        return removed
+
+    def search(
+        self,
+        serial: str,
+        pattern: str | None = None,
+        app_package: str | None = None,
+        min_level: str = "V",
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+    ):
+        """Yield formatted archived lines matching all filters, oldest first."""
+        self.flush(serial)
+        regex = re.compile(pattern) if pattern else None
+        levels = set(levels_at_or_above(min_level))
+        directory = self._device_dir(serial)
+        if not directory.is_dir():
+            return
+
+        for segment_path in sorted(directory.glob(f"*{SEGMENT_SUFFIX}")):
+            blocks = _read_index(segment_path.with_suffix(INDEX_SUFFIX))
+            candidates = [
+                block
+                for block in blocks
+                if levels.intersection(block["levels"])
+                and _overlaps(block["min_ts"], block["max_ts"], since_ts, until_ts)
+                and (app_package is None or app_package in block["pids"].values())
+            ]
+            if not candidates:
+                continue
+            try:
+                yield from self._search_segment(
+                    segment_path, candidates, regex, app_package, levels, since_ts, until_ts
+                )
+            except FileNotFoundError:
+                continue  # Deleted by retention while the search was running.
+
+    def stats(self) -> dict:
+        segments = list(self._root.glob(f"*/*{SEGMENT_SUFFIX}")) if self._root.is_dir() else []
+        return {
+            "root_dir": str(self._root),
+            "segments": len(segments),
+            "bytes": sum(path.stat().st_size for path in segments),
+        }
+
+    def _search_segment(self, segment_path, blocks, regex, app_package, levels, since_ts, until_ts):
+        with open(segment_path, "rb") as segment_file:
+            if segment_file.seek(0, 2) == 0:
+                return
+            with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for block in blocks:
+                    package_pids = {pid for pid, package in block["pids"].items() if package == app_package}
+                    data = zlib.decompress(mapped[block["offset"] : block["offset"] + block["length"]])
+                    for line in data.decode("utf-8", errors="replace").splitlines():
+                        time_text, pid, tid, level, tag, message = line.split("\t", 5)
+                        if level not in levels:
+                            continue
+                        if app_package is not None and pid not in package_pids:
+                            continue
+                        if since_ts is not None or until_ts is not None:
+                            timestamp = _parse_ts(time_text)
+                            if not _overlaps(timestamp, timestamp, since_ts, until_ts):
+                                continue
+                        formatted = f"{time_text} {int(pid):5d} {int(tid):5d} {level} {tag}: {message}"
+                        if regex is not None and not regex.search(formatted):
+                            continue
+                        yield formatted
+
+    def _device_log(self, serial: str) -> _DeviceLog:
+        with self._lock:
+            device_log = self._devices.get(serial)
+            if device_log is None:
+                directory = self._device_dir(serial)
+                directory.mkdir(parents=True, exist_ok=True)
+                device_log = _DeviceLog(directory)
+                self._devices[serial] = device_log
+            return device_log
+
+    def _device_dir(self, serial: str) -> Path:
+        return self._root / re.sub(r"[^A-Za-z0-9._-]", "_", serial)
+
+    def _flush_locked(self, device_log: _DeviceLog) -> None:
+        device_log.last_flush_at = time.monotonic()
+        block = device_log.block
+        if not block.lines:
+            return
+
+        if device_log.segment_path is None or device_log.segment_size >= self._segment_max_bytes:
+            device_log.segment_path = device_log.directory / f"{time.time_ns():020d}{SEGMENT_SUFFIX}"
+            device_log.segment_size = 0
+            self._apply_retention(device_log.directory, active_segment=device_log.segment_path)
+
+        compressed = zlib.compress("".join(block.lines).encode("utf-8"))
+        with open(device_log.segment_path, "ab") as segment_file:
+            offset = segment_file.seek(0, 2)
+            segment_file.write(compressed)
+        entry = {
+            "offset": offset,
+            "length": len(compressed),
+            "count": len(block.lines),
+            "min_ts": block.min_ts,
+            "max_ts": block.max_ts,
+            "levels": "".join(sorted(block.levels)),
+            "pids": {str(pid): device_log.packages.get(pid) for pid in sorted(block.pids)},
+        }
+        with open(device_log.segment_path.with_suffix(INDEX_SUFFIX), "a", encoding="utf-8") as index_file:
+            index_file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+        device_log.segment_size = offset + len(compressed)
+        device_log.block = _PendingBlock()
+
+    def _apply_retention(self, directory: Path, active_segment: Path | None) -> int:
+        """Delete segments past the age limit, then the oldest ones while over the size budget.
+
+        The active segment is only deleted for age, i.e. when nothing was appended to it for the
+        whole retention period; the next flush then opens a new one.
+        """
+        segments = sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+        now = time.time()
+        total = sum(path.stat().st_size for path in segments)
+        removed = 0
+        for path in segments:
+            expired = self._retention_age_s > 0 and now - path.stat().st_mtime > self._retention_age_s
+            oversized = self._retention_bytes > 0 and total > self._retention_bytes and path != active_segment
+            if not (expired or oversized):
+                continue
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+class LogcatArchiver:
+    """Keeps one logcat reader per attached device running and feeding a ``LogcatArchive``.
+
+    Every ``retention_interval_s`` seconds it also enforces the archive's retention limits.
+    """
+
+    def __init__(
+        self,
+        archive: LogcatArchive,
+        device_manager,
+        buffer_lines: int = 20000,
+        retention_interval_s: float = 600.0,
+    ):
+        self.archive = archive
+        self._device_manager = device_manager
+        self._buffer_lines = buffer_lines
+        self._retention_interval_s = retention_interval_s
+        self._readers: dict[str, LogcatReader] = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+
+    def start(self, serials: list[str] | None = None) -> None:
+        """Start archiving ``serials`` (all attached devices by default) without blocking the caller."""
+        Thread(target=self._start_all, args=(serials,), name="logcat-archiver-start", daemon=True).start()
+        if self._retention_interval_s > 0:
+            Thread(target=self._run_retention, name="logcat-archive-retention", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def reader_for(self, serial: str) -> LogcatReader | None:
+        with self._lock:
+            return self._readers.get(serial)
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        if present:
+            self._start_reader(serial)
+            return
+        with self._lock:
+            reader = self._readers.pop(serial, None)
+        if reader is not None:
+            reader.stop()
+        self.archive.flush(serial)
+
+    def _run_retention(self) -> None:
+        while not self._stop_event.wait(self._retention_interval_s):
+            try:
+                removed = self.archive.enforce_retention()
+            except Exception:
+                logger.exception("Logcat archive retention pass failed")
+                continue
+            if removed:
+                logger.info("Logcat archive retention removed %d segments", removed)
+
+    def _start_all(self, serials: list[str] | None) -> None:
+        try:
+            targets = self._device_manager.list_serials() if serials is None else serials
+        except Exception as error:
+            logger.warning("Unable to list devices for logcat archiving: %s", error)
+            return
+        for serial in targets:
+            self._start_reader(serial)
+
+    def _start_reader(self, serial: str) -> None:
+        with self._lock:
+            if serial in self._readers:
+                return
+        reader = None
+        try:
+            reader = LogcatReader(self._device_manager.get_device(serial), capacity=self._buffer_lines)
+            reader.add_listener(lambda record: self.archive.append(serial, record))
+            with self._lock:
+                if serial in self._readers:
+                    return
+                self._readers[serial] = reader
+            reader.ensure_running()
+        except Exception as error:
+            logger.warning("Unable to start logcat archiving for %s: %s", serial, error)
+            with self._lock:
+                if reader is not None and self._readers.get(serial) is reader:
+                    del self._readers[serial]
+
+
+def _read_index(index_path: Path) -> list[dict]:
+    blocks = []
+    try:
+        with open(index_path, encoding="utf-8") as index_file:
+            for line in index_file:
+                try:
+                    blocks.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # A torn final entry from an interrupted write.
+    except FileNotFoundError:
+        return []  # Not written yet, or deleted by retention.
+    return blocks
+
+
+def _last_indexed_ts(directory: Path) -> float | None:
+    for index_path in sorted(directory.glob(f"*{INDEX_SUFFIX}"), reverse=True):
+        timestamps = [block["max_ts"] for block in _read_index(index_path) if block["max_ts"] is not None]
+        if timestamps:
+            return max(timestamps)
+    return None
+
+
+def _parse_ts(time_text: str) -> float | None:
+    try:
+        return float(time_text)
+    except ValueError:
+        return None
+
+
+def _overlaps(min_ts: float | None, max_ts: float | None, since_ts: float | None, until_ts: float | None) -> bool:
+    if since_ts is None and until_ts is None:
+        return True
+    if min_ts is None or max_ts is None:
+        return False
+    if since_ts is not None and max_ts < since_ts:
+        return False
+    return until_ts is None or min_ts <= until_ts
@@ -0,0 +1,335 @@
+import heapq
+import logging
+import re
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+# Android priorities from least to most severe; `*:X` filters keep X and everything after it.
+LEVEL_ORDER = "VDIWEFA"
+
+LOGCAT_FORMAT_ARGS = "-v threadtime -v epoch"
+
+_RECORD_PATTERN = re.compile(
+    r"^\s*(?P<time>\d+\.\d+|\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s+(?P<pid>\d+)\s+(?P<tid>\d+)\s+"
+    r"(?P<level>[VDIWEFA])\s(?P<tag>.*?)\s*:(?: (?P<message>.*))?$"
+)
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    seq: int
+    time_text: str
+    timestamp: float | None
+    pid: int
+    tid: int
+    level: str
+    tag: str
+    message: str
+
+    def format(self) -> str:
+        return f"{self.time_text} {self.pid:5d} {self.tid:5d} {self.level} {self.tag}: {self.message}"
+
+
+def parse_logcat_line(line: str) -> dict | None:
+    """Parse one `threadtime` line (with or without the `epoch` modifier) into record fields."""
+    match = _RECORD_PATTERN.match(line)
+    if match is None:
+        return None
+    time_text = match.group("time")
+    return {
+        "time_text": time_text,
+        "timestamp": float(time_text) if "-" not in time_text else None,
+        "pid": int(match.group("pid")),
+        "tid": int(match.group("tid")),
+        "level": match.group("level"),
+        "tag": match.group("tag"),
+        "message": match.group("message") or "",
+    }
+
+
+def levels_at_or_above(level: str) -> str:
+    return LEVEL_ORDER[LEVEL_ORDER.index(level):]
+
+
+@dataclass(frozen=True)
+class LogSlice:
+    records: list[LogRecord]
+    has_more: bool
+    # Sequence number a follow-up read should continue after.
+    end_seq: int
+    # True when records after the requested position were already evicted from the buffer.
+    missed: bool
+
+
+class LogRingBuffer:
+    """Bounded in-memory log store indexed by pid and level."""
+
+    def __init__(self, capacity: int = 20000):
+        self._capacity = max(1, capacity)
+        self._records: deque[LogRecord] = deque()
+        self._by_pid: dict[int, deque[LogRecord]] = {}
+        self._by_level: dict[str, deque[LogRecord]] = {level: deque() for level in LEVEL_ORDER}
+        self._next_seq = 1
+        self._lock = Lock()
+
+    def append(self, fields: dict) -> LogRecord:
+        with self._lock:
+            record = LogRecord(seq=self._next_seq, **fields)
+            self._next_seq += 1
+            self._records.append(record)
+            self._by_pid.setdefault(record.pid, deque()).append(record)
+            self._by_level[record.level].append(record)
+
+            if len(self._records) > self._capacity:
+                evicted = self._records.popleft()
+                pid_records = self._by_pid[evicted.pid]
+                pid_records.popleft()
+                if not pid_records:
+                    del self._by_pid[evicted.pid]
+                self._by_level[evicted.level].popleft()
+            return record
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._next_seq - 1
+
+    def query(
+        self,
+        pids: set[int] | None = None,
+        min_level: str = "V",
+        limit: int | None = None,
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+    ) -> list[LogRecord]:
+        """Return the newest ``limit`` matching records, oldest first."""
+        with self._lock:
+            matches = []
+            for record in self._iter_newest_first_locked(pids, min_level, since_ts, until_ts):
+                matches.append(record)
+                if limit is not None and len(matches) >= limit:
+                    break
+        matches.reverse()
+        return matches
+
+    def tail(
+        self,
+        pids: set[int] | None = None,
+        min_level: str = "V",
+        limit: int | None = None,
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+    ) -> LogSlice:
+        """Like ``query``, but also report the position to continue from with ``read_after``."""
+        with self._lock:
+            records = []
+            for record in self._iter_newest_first_locked(pids, min_level, since_ts, until_ts):
+                records.append(record)
+                if limit is not None and len(records) >= limit:
+                    break
+            records.reverse()
+            return LogSlice(records=records, has_more=False, end_seq=self._next_seq - 1, missed=False)
+
+    def read_after(
+        self,
+        after_seq: int,
+        pids: set[int] | None = None,
+        min_level: str = "V",
+        limit: int | None = None,
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+    ) -> LogSlice:
+        """Return the oldest ``limit`` matching records written after ``after_seq``.
+
+        The cost is proportional to the number of records appended since ``after_seq``.
+        """
+        with self._lock:
+            newer = []
+            for record in self._iter_newest_first_locked(pids, min_level, since_ts, until_ts):
+                if record.seq <= after_seq:
+                    break
+                newer.append(record)
+            newer.reverse()
+
+            first_seq = self._records[0].seq if self._records else self._next_seq
+            has_more = limit is not None and len(newer) > limit
+            records = newer[:limit] if has_more else newer
+            return LogSlice(
+                records=records,
+                has_more=has_more,
+                end_seq=records[-1].seq if has_more else self._next_seq - 1,
+                missed=after_seq + 1 < first_seq,
+            )
+
+    def _iter_newest_first_locked(self, pids, min_level: str, since_ts: float | None, until_ts: float | None):
+        levels = levels_at_or_above(min_level)
+        if pids is not None:
+            sources = [self._by_pid[pid] for pid in pids if pid in self._by_pid]
+            check_level = True
+        else:
+            sources = [self._by_level[level] for level in levels]
+            check_level = False
+        check_time = since_ts is not None or until_ts is not None
+
+        for record in heapq.merge(*(reversed(source) for source in sources), key=lambda record: -record.seq):
+            if check_level and record.level not in levels:
+                continue
+            if check_time and not _in_window(record.timestamp, since_ts, until_ts):
+                continue
+            yield record
+
+
+def _in_window(timestamp: float | None, since_ts: float | None, until_ts: float | None) -> bool:
+    if timestamp is None:
+        return False
+    if since_ts is not None and timestamp < since_ts:
+        return False
+    return until_ts is None or timestamp <= until_ts
+
+
+class LogcatReader:
+    """Streams one device's logcat into a ``LogRingBuffer`` from a long-running background reader."""
+
+    def __init__(self, device, capacity: int = 20000, buffer_name: str = "default", reconnect_backoff_s: float = 1.0):
+        self._device = device
+        self._buffer_name = buffer_name
+        self._reconnect_backoff_s = reconnect_backoff_s
+        self.buffer = LogRingBuffer(capacity)
+        # Distinguishes sequence numbers of this reader from those of a reader that replaced it.
+        self.reader_id = uuid.uuid4().hex[:12]
+        self._listeners = []
+        self._lock = Lock()
+        self._start_lock = Lock()
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+        self._connection = None
+        self._latest: tuple[float, set] | None = None
+        self._replay_guard: tuple[float, set] | None = None
+
+    def add_listener(self, listener) -> None:
+        """Register ``listener(record)`` called for every new record."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def is_running(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def ensure_running(self) -> None:
+        """Load the current device buffer synchronously on first use, then follow it in the background."""
+        with self._start_lock:
+            with self._lock:
+                if self._thread is not None:
+                    return
+                self._stop_event = Event()
+                stop_event = self._stop_event
+
+            self._ingest_text(str(self._device.shell(f"logcat -d -b {self._buffer_name} {LOGCAT_FORMAT_ARGS}")))
+
+            with self._lock:
+                if stop_event.is_set():
+                    return
+                self._thread = Thread(target=self._follow, args=(stop_event,), name="logcat-reader", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_event.set()
+            self._thread = None
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {"running": self.is_running(), "buffered_records": len(self.buffer), "last_seq": self.buffer.last_seq}
+
+    def _follow(self, stop_event: Event) -> None:
+        while not stop_event.is_set():
+            try:
+                with self._lock:
+                    latest = self._latest
+                    self._replay_guard = (latest[0], set(latest[1])) if latest is not None else None
+                command = f"logcat -b {self._buffer_name} {LOGCAT_FORMAT_ARGS}"
+                if latest is not None:
+                    # -T replays entries from the newest timestamp already buffered; the replay guard drops them.
+                    command += f" -T {latest[0]:.3f}"
+
+                connection = self._device.shell(command, stream=True)
+                with self._lock:
+                    if stop_event.is_set():
+                        connection.close()
+                        return
+                    self._connection = connection
+                pending = b""
+                for chunk in _iter_chunks(connection):
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+                    for line in lines:
+                        self._ingest_line(line.decode("utf-8", errors="replace").rstrip("\r"))
+            except Exception as error:
+                if not stop_event.is_set():
+                    logger.warning("logcat reader disconnected: %s", error)
+            stop_event.wait(self._reconnect_backoff_s)
+
+    def _ingest_text(self, text: str) -> None:
+        for line in text.splitlines():
+            self._ingest_line(line)
+
+    def _ingest_line(self, line: str) -> None:
+        fields = parse_logcat_line(line)
+        if fields is None:
+            return
+
+        timestamp = fields["timestamp"]
+        if timestamp is not None:
+            identity = (fields["pid"], fields["tid"], fields["level"], fields["tag"], fields["message"])
+            with self._lock:
+                if self._is_replayed_locked(timestamp, identity):
+                    return
+                if self._latest is not None and timestamp == self._latest[0]:
+                    self._latest[1].add(identity)
+                elif self._latest is None or timestamp > self._latest[0]:
+                    self._latest = (timestamp, {identity})
+
+        record = self.buffer.append(fields)
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(record)
+            except Exception:
+                logger.exception("logcat listener failed")
+
+    def _is_replayed_locked(self, timestamp: float, identity: tuple) -> bool:
+        guard = self._replay_guard
+        if guard is None:
+            return False
+        if timestamp > guard[0]:
+            self._replay_guard = None
+            return False
+        if timestamp < guard[0]:
+            return True
+        if identity in guard[1]:
+            guard[1].discard(identity)
+            return True
+        return False
+
+
+def _iter_chunks(connection, chunk_size: int = 65536):
+    sock = getattr(connection, "conn", connection)
+    while True:
+        chunk = sock.recv(chunk_size)
+        if not chunk:
+            return
+        yield chunk
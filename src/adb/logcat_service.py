@@ -1,5 +1,11 @@
+import base64
+import binascii
+import re
 import shlex
+from itertools import islice
+from threading import Lock
 
+from adb.logcat_reader import LogcatReader, LogRingBuffer, parse_logcat_line
 from errors import ValidationError
 from shared.validators import LOG_LEVEL_MAP
 
@@ -7,19 +13,170 @@ from shared.validators import LOG_LEVEL_MAP
 class LogcatService:
     """Retrieves app-specific logcat data."""
 
-    @staticmethod
-    def get_for_package(device, app_package: str, level: str, max_lines: int = 100) -> str:
-        if not app_package.strip():
-            raise ValidationError("app_package cannot be empty")
+    def __init__(self, streaming: bool = True, buffer_lines: int = 20000, archiver=None):
+        self._streaming = streaming
+        self._buffer_lines = buffer_lines
+        self._archiver = archiver
+        self._reader_lock = Lock()
+
+    def reader_for(self, session) -> LogcatReader | None:
+        """Return the session's background logcat reader, creating and starting it on first use."""
+        if not self._streaming:
+            return None
+        if self._archiver is not None:
+            # Share the archiver's reader instead of following the same device twice.
+            archived_reader = self._archiver.reader_for(session.serial)
+            if archived_reader is not None:
+                archived_reader.ensure_running()
+                return archived_reader
+        with self._reader_lock:
+            if session.logcat_reader is None:
+                session.logcat_reader = LogcatReader(session.adb_device, capacity=self._buffer_lines)
+            reader = session.logcat_reader
+        reader.ensure_running()
+        return reader
+
+    def get_for_package(self, device, app_package: str, level: str, max_lines: int = 100, reader=None) -> str:
         if max_lines <= 0:
             raise ValidationError("max_lines must be > 0")
 
-        pid_command = f"pidof -s {shlex.quote(app_package)}"
-        pid = str(device.shell(pid_command)).strip()
-        if not pid:
-            raise ValidationError(f"App with package '{app_package}' not running or not found")
+        pids = self.resolve_pids(device, app_package)
+        log_level = LOG_LEVEL_MAP[level]
+        if reader is not None:
+            records = reader.buffer.query(pids=pids, min_level=log_level, limit=max_lines)
+        else:
+            records = self._dump_records(device, pids, log_level, max_lines)
+        return "\n".join(record.format() for record in records)
+
+    def read_updates(
+        self,
+        device,
+        reader,
+        app_package: str | None,
+        level: str,
+        cursor: str | None = None,
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+        max_lines: int = 500,
+    ) -> dict:
+        """Return records written after ``cursor`` plus a cursor for the next poll.
+
+        Without a cursor the newest ``max_lines`` records are returned. Records of processes that
+        exited since the cursor was issued stay reachable because the cursor carries their pids.
+        """
+        if reader is None:
+            raise ValidationError("Incremental logcat reads require logcat streaming to be enabled")
+        if max_lines <= 0:
+            raise ValidationError("max_lines must be > 0")
+        if since_ts is not None and until_ts is not None and since_ts > until_ts:
+            raise ValidationError("since_epoch_s must be <= until_epoch_s")
+
+        position = decode_logcat_cursor(cursor) if cursor else None
+        pids = None
+        if app_package is not None:
+            pids = self._pidof(device, app_package)
+            if position is not None and position["reader_id"] == reader.reader_id:
+                pids |= position["pids"]
+            if not pids:
+                raise ValidationError(f"App with package '{app_package}' not running or not found")
 
         log_level = LOG_LEVEL_MAP[level]
-        log_output = str(device.shell(f"logcat -d -b default *:{log_level}"))
-        filtered = [line for line in log_output.splitlines() if pid in line]
-        return "\n".join(filtered[-max_lines:])
+        reset = position is not None and position["reader_id"] != reader.reader_id
+        if position is None or reset:
+            log_slice = reader.buffer.tail(pids, log_level, max_lines, since_ts=since_ts, until_ts=until_ts)
+        else:
+            log_slice = reader.buffer.read_after(
+                position["seq"], pids, log_level, max_lines, since_ts=since_ts, until_ts=until_ts
+            )
+
+        return {
+            "lines": [record.format() for record in log_slice.records],
+            "cursor": encode_logcat_cursor(reader.reader_id, log_slice.end_seq, pids),
+            "has_more": log_slice.has_more,
+            "reset": reset,
+            "missed_records": log_slice.missed,
+        }
+
+    def search_archive(
+        self,
+        serial: str,
+        pattern: str | None,
+        app_package: str | None,
+        level: str,
+        since_ts: float | None = None,
+        until_ts: float | None = None,
+        max_results: int = 200,
+    ) -> dict:
+        """Search archived logcat lines of ``serial``, oldest first, stopping after ``max_results``."""
+        if self._archiver is None:
+            raise ValidationError("Logcat archive is not enabled; start the server with --logcat-archive-dir")
+        if max_results <= 0:
+            raise ValidationError("max_results must be > 0")
+        if since_ts is not None and until_ts is not None and since_ts > until_ts:
+            raise ValidationError("since_epoch_s must be <= until_epoch_s")
+        if app_package is not None and not app_package.strip():
+            raise ValidationError("app_package cannot be empty")
+        if pattern:
+            try:
+                re.compile(pattern)
+            except re.error as error:
+                raise ValidationError(f"Invalid pattern: {error}") from error
+
+        matches = self._archiver.archive.search(
+            serial,
+            pattern=pattern,
+            app_package=app_package,
+            min_level=LOG_LEVEL_MAP[level],
+            since_ts=since_ts,
+            until_ts=until_ts,
+        )
+        lines = list(islice(matches, max_results + 1))
+        return {"lines": lines[:max_results], "truncated": len(lines) > max_results}
+
+    def resolve_pids(self, device, app_package: str) -> set[int]:
+        pids = self._pidof(device, app_package)
+        if not pids:
+            raise ValidationError(f"App with package '{app_package}' not running or not found")
+        return pids
+
+    def _pidof(self, device, app_package: str) -> set[int]:
+        if not app_package.strip():
+            raise ValidationError("app_package cannot be empty")
+
+        pid_output = str(device.shell(f"pidof {shlex.quote(app_package)}")).strip()
+        pids = {int(pid) for pid in pid_output.split() if pid.isdigit()}
+        serial = getattr(device, "serial", None)
+        if pids and self._archiver is not None and serial:
+            self._archiver.archive.note_pids(serial, app_package, pids)
+        return pids
+
+    @staticmethod
+    def _dump_records(device, pids: set[int], log_level: str, max_lines: int) -> list:
+        buffer = LogRingBuffer(capacity=max_lines)
+        log_output = str(device.shell(f"logcat -d -b default -v threadtime *:{log_level}"))
+        for line in log_output.splitlines():
+            fields = parse_logcat_line(line)
+            if fields is not None and fields["pid"] in pids:
+                buffer.append(fields)
+        return buffer.query()
+
+
+def encode_logcat_cursor(reader_id: str, seq: int, pids: set[int] | None) -> str:
+    pid_text = ",".join(str(pid) for pid in sorted(pids or ()))
+    raw = f"v1:{reader_id}:{seq}:{pid_text}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_logcat_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, reader_id, seq, pid_text = base64.urlsafe_b64decode(padded).decode().split(":")
+        if version != "v1":
+            raise ValueError(version)
+        return {
+            "reader_id": reader_id,
+            "seq": int(seq),
+            "pids": {int(pid) for pid in pid_text.split(",") if pid},
+        }
+    except (ValueError, UnicodeDecodeError, binascii.Error) as error:
+        raise ValidationError("Invalid logcat cursor") from error
@@ -1,10 +1,101 @@
-from shared.serializers import image_to_png_bytes
+import hashlib
+from threading import Lock
+from time import monotonic
+
+from adb.frame_grabber import FrameGrabber
+from adb.framebuffer import parse_raw_screencap
+from shared.serializers import image_to_png_bytes, png_bytes_to_image, raw_frame_to_png_bytes
+
+SCREENSHOT_MODES = ("raw", "png")
+OUTPUT_FORMAT = "png"
 
 
 class ScreenService:
     """Captures screenshots through adbutils and serializes them as PNG bytes."""
 
+    def __init__(
+        self,
+        capture_mode: str = "raw",
+        frame_grabber_interval_s: float = 0.0,
+        frame_grabber_ring_size: int = 3,
+        frame_grabber_idle_timeout_s: float = 30.0,
+    ):
+        if capture_mode not in SCREENSHOT_MODES:
+            raise ValueError(f"Unsupported screenshot mode: {capture_mode}")
+        self._capture_mode = capture_mode
+        self._frame_grabber_interval_s = frame_grabber_interval_s
+        self._frame_grabber_ring_size = frame_grabber_ring_size
+        self._frame_grabber_idle_timeout_s = frame_grabber_idle_timeout_s
+        self._grabber_lock = Lock()
+
+    def frame_grabber_for(self, session) -> FrameGrabber | None:
+        """Return the session's background frame grabber, creating it on first use if grabbing is enabled."""
+        if self._frame_grabber_interval_s <= 0:
+            return None
+        with self._grabber_lock:
+            if session.frame_grabber is None:
+                session.frame_grabber = FrameGrabber(
+                    lambda: self.capture_frame_bytes(session.adb_device),
+                    interval_s=self._frame_grabber_interval_s,
+                    ring_size=self._frame_grabber_ring_size,
+                    idle_timeout_s=self._frame_grabber_idle_timeout_s,
+                    generation=lambda: session.ui_state.generation,
+                )
+            return session.frame_grabber
+
+    def capture_frame_bytes(self, device) -> bytes:
+        if self._capture_mode == "raw":
+            return device.shell("screencap", encoding=None)
+        return device.shell("screencap -p", encoding=None)
+
+    def capture_png_bytes(self, device, scale_factor: float = 0.4, cache=None, frame_grabber=None) -> bytes:
+        """Capture and encode a screenshot.
+
+        With a ``frame_grabber`` the freshest buffered frame is used when one is recent enough
+        and was taken after the last input action; ``cache`` returns the already-encoded bytes
+        when the captured frame is unchanged.
+        """
+        data = None
+        if frame_grabber is not None:
+            frame_grabber.ensure_running()
+            frame = frame_grabber.latest(max_age_s=2 * frame_grabber.interval_s)
+            data = frame.data if frame is not None else None
+        if data is None:
+            generation = frame_grabber.current_generation() if frame_grabber is not None else None
+            captured_at = monotonic()
+            data = self.capture_frame_bytes(device)
+            if frame_grabber is not None:
+                frame_grabber.offer(data, captured_at=captured_at, generation=generation)
+
+        if self._capture_mode == "raw":
+            try:
+                frame = parse_raw_screencap(data)
+            except ValueError:
+                # Unknown pixel format or a mangled transfer: fall back to the device-encoded PNG.
+                data = device.shell("screencap -p", encoding=None)
+            else:
+                return self._encode_cached(
+                    cache,
+                    data,
+                    scale_factor,
+                    lambda: raw_frame_to_png_bytes(frame, scale_factor=scale_factor),
+                )
+
+        return self._encode_cached(
+            cache,
+            data,
+            scale_factor,
+            lambda: image_to_png_bytes(png_bytes_to_image(data), scale_factor=scale_factor),
+        )
+
     @staticmethod
-    def capture_png_bytes(device, scale_factor: float = 0.4) -> bytes:
-        image = device.screenshot()
-        return image_to_png_bytes(image, scale_factor=scale_factor)
+    def _encode_cached(cache, data: bytes, scale_factor: float, encode) -> bytes:
+        if cache is None:
+            return encode()
+
+        key = (hashlib.blake2b(data, digest_size=16).digest(), scale_factor, OUTPUT_FORMAT)
+        encoded = cache.get(key)
+        if encoded is None:
+            encoded = encode()
+            cache.put(key, encoded)
+        return encoded
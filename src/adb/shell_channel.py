@@ -0,0 +1,424 @@
+import logging
+import secrets
+import shlex
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from threading import Condition
+
+logger = logging.getLogger(__name__)
+
+# adb shell protocol v2 packet ids (system/core/adb/shell_protocol.h).
+SHELL_V2_STDIN = 0
+SHELL_V2_STDOUT = 1
+SHELL_V2_STDERR = 2
+SHELL_V2_EXIT = 3
+SHELL_V2_CLOSE_STDIN = 4
+_SHELL_V2_HEADER = struct.Struct("<BI")
+_RECV_SIZE = 65536
+
+
+class ShellChannelError(Exception):
+    """Raised when a persistent shell channel is closed or stops responding."""
+
+
+@dataclass
+class ShellResult:
+    command: str
+    exit_code: int | None
+    stdout: str
+    stderr: str
+    output_bytes: int
+    truncated: bool
+    timed_out: bool
+    duration_ms: float
+
+
+class BoundedOutput:
+    """Collects a byte stream keeping only its first and last ``max_bytes // 2`` bytes."""
+
+    def __init__(self, max_bytes: int):
+        self._head_limit = max(0, max_bytes) - max(0, max_bytes) // 2
+        self._tail_limit = max(0, max_bytes) // 2
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self._head) + len(self._tail)
+
+    def write(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        room = self._head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data and self._tail_limit:
+            self._tail += data
+            del self._tail[: max(0, len(self._tail) - self._tail_limit)]
+
+    def text(self) -> str:
+        if not self.truncated:
+            return (bytes(self._head) + bytes(self._tail)).decode("utf-8", errors="replace")
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        return (
+            bytes(self._head).decode("utf-8", errors="replace")
+            + f"\n... [{omitted} bytes omitted] ...\n"
+            + bytes(self._tail).decode("utf-8", errors="replace")
+        )
+
+
+class ShellChannel:
+    """A long-lived ``sh`` on the device behind one adb transport, running commands one after another.
+
+    Each command runs as ``sh -c`` with stdin from ``/dev/null`` and is followed by a unique
+    end marker carrying its exit status, so commands never see each other's input and a
+    failing command cannot end the channel. With shell protocol v2 stdout and stderr arrive
+    separately and both streams are terminated by the marker; the legacy protocol merges them.
+    """
+
+    def __init__(self, connection, v2: bool):
+        self._connection = connection
+        self._sock = getattr(connection, "conn", connection)
+        self.v2 = v2
+        self._nonce = secrets.token_hex(4)
+        self._sequence = 0
+        self._packet_buffer = b""
+        self.closed = False
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+    def stream(self, commands: list[str], timeout_s: float):
+        """Yield ``(index, kind, value)`` events for a batch of commands sent in one write.
+
+        ``kind`` is ``"stdout"`` or ``"stderr"`` with a bytes chunk, or ``"exit"`` with the exit
+        code once command ``index`` finished. ``timeout_s`` applies to each command separately.
+        If a command times out the channel is closed (killing the command) and
+        ``TimeoutError`` is raised; any other transport failure raises ``ShellChannelError``.
+        """
+        if self.closed:
+            raise ShellChannelError("Shell channel is closed")
+        markers = []
+        script = []
+        for command in commands:
+            self._sequence += 1
+            marker = f"__MCP_{self._nonce}_{self._sequence}__".encode()
+            markers.append(marker)
+            script.append(self._wrap(command, marker.decode()))
+        self._send_stdin("".join(script).encode())
+        self.last_used_at = time.monotonic()
+
+        carry = {"stdout": b"", "stderr": b""}
+        for index, marker in enumerate(markers):
+            deadline = time.monotonic() + timeout_s
+            parsers = {"stdout": _MarkerParser(marker, with_status=True)}
+            if self.v2:
+                parsers["stderr"] = _MarkerParser(marker, with_status=False)
+            # Output of this command may have arrived together with the end of the previous one.
+            for kind, parser in parsers.items():
+                chunk = parser.feed(carry.get(kind, b""))
+                if chunk:
+                    yield index, kind, chunk
+            while not all(parser.done for parser in parsers.values()):
+                for kind, data in self._receive(deadline):
+                    parser = parsers.get(kind)
+                    if parser is None:
+                        continue
+                    chunk = parser.feed(data)
+                    if chunk:
+                        yield index, kind, chunk
+            yield index, "exit", parsers["stdout"].status
+            carry = {kind: parser.leftover for kind, parser in parsers.items()}
+        leftover = sum(len(data) for data in carry.values())
+        if leftover:
+            logger.debug("Discarding %d unexpected bytes after the last shell marker", leftover)
+        self.last_used_at = time.monotonic()
+
+    def run(
+        self,
+        commands: list[str],
+        timeout_s: float = 30.0,
+        max_output_bytes: int = 65536,
+        on_output=None,
+    ) -> list[ShellResult]:
+        """Run a batch of commands and collect each one's output within ``max_output_bytes`` per stream.
+
+        ``on_output(index, kind, chunk)`` receives every output chunk as it arrives, before it is
+        bounded. A timed-out command is reported with ``timed_out`` set and the commands after it
+        are not run.
+        """
+        results = []
+        outputs = {"stdout": BoundedOutput(max_output_bytes), "stderr": BoundedOutput(max_output_bytes)}
+        started_at = time.perf_counter()
+        try:
+            for index, kind, value in self.stream(commands, timeout_s):
+                if kind != "exit":
+                    outputs[kind].write(value)
+                    if on_output is not None:
+                        on_output(index, kind, value)
+                    continue
+                results.append(_result(commands[index], value, outputs, started_at, timed_out=False))
+                outputs = {"stdout": BoundedOutput(max_output_bytes), "stderr": BoundedOutput(max_output_bytes)}
+                started_at = time.perf_counter()
+        except TimeoutError:
+            results.append(_result(commands[len(results)], None, outputs, started_at, timed_out=True))
+        return results
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.v2:
+                self._sock.sendall(_SHELL_V2_HEADER.pack(SHELL_V2_CLOSE_STDIN, 0))
+        except OSError:
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+
+    def _wrap(self, command: str, marker: str) -> str:
+        quoted = shlex.quote(command)
+        if self.v2:
+            return (
+                f"sh -c {quoted} </dev/null; __mcp_rc=$?; "
+                f"printf '\\n{marker} %d\\n' \"$__mcp_rc\"; printf '\\n{marker}\\n' >&2\n"
+            )
+        return f"sh -c {quoted} </dev/null 2>&1; printf '\\n{marker} %d\\n' \"$?\"\n"
+
+    def _send_stdin(self, data: bytes) -> None:
+        if self.v2:
+            data = _SHELL_V2_HEADER.pack(SHELL_V2_STDIN, len(data)) + data
+        try:
+            self._sock.sendall(data)
+        except OSError as error:
+            self.close()
+            raise ShellChannelError(f"Shell channel write failed: {error}") from error
+
+    def _receive(self, deadline: float) -> list[tuple[str, bytes]]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.close()
+            raise TimeoutError("Shell command timed out")
+        try:
+            self._sock.settimeout(remaining)
+            chunk = self._sock.recv(_RECV_SIZE)
+        except (socket.timeout, TimeoutError) as error:
+            self.close()
+            raise TimeoutError("Shell command timed out") from error
+        except OSError as error:
+            self.close()
+            raise ShellChannelError(f"Shell channel read failed: {error}") from error
+        if not chunk:
+            self.close()
+            raise ShellChannelError("Shell channel closed by the device")
+        if not self.v2:
+            return [("stdout", chunk)]
+
+        self._packet_buffer += chunk
+        packets = []
+        while len(self._packet_buffer) >= _SHELL_V2_HEADER.size:
+            packet_id, length = _SHELL_V2_HEADER.unpack_from(self._packet_buffer)
+            end = _SHELL_V2_HEADER.size + length
+            if len(self._packet_buffer) < end:
+                break
+            payload = self._packet_buffer[_SHELL_V2_HEADER.size : end]
+            self._packet_buffer = self._packet_buffer[end:]
+            if packet_id == SHELL_V2_STDOUT:
+                packets.append(("stdout", payload))
+            elif packet_id == SHELL_V2_STDERR:
+                packets.append(("stderr", payload))
+            elif packet_id == SHELL_V2_EXIT:
+                self.close()
+                raise ShellChannelError("Shell channel exited on the device")
+        return packets
+
+
+class ShellChannelPool:
+    """Per-session pool of persistent shell channels.
+
+    ``opener`` returns a new ``ShellChannel``. Callers check a channel out exclusively; channels
+    that failed or timed out are discarded, and idle channels are reused so that running a
+    command costs no adb transport setup. At most ``max_channels`` are open at once.
+    """
+
+    def __init__(self, opener, max_channels: int = 2, idle_timeout_s: float = 300.0):
+        self._opener = opener
+        self._max_channels = max(1, max_channels)
+        self._idle_timeout_s = idle_timeout_s
+        self._idle: list[ShellChannel] = []
+        self._busy = 0
+        self._condition = Condition()
+        self._closed = False
+        self._opened = 0
+        self._reused = 0
+        self._discarded = 0
+        self._protocol: str | None = None
+
+    def run(
+        self,
+        commands: list[str],
+        timeout_s: float = 30.0,
+        max_output_bytes: int = 65536,
+        wait_timeout_s: float | None = None,
+        on_output=None,
+    ) -> list[ShellResult]:
+        channel = self._acquire(wait_timeout_s if wait_timeout_s is not None else timeout_s)
+        try:
+            return channel.run(
+                commands, timeout_s=timeout_s, max_output_bytes=max_output_bytes, on_output=on_output
+            )
+        finally:
+            self._release(channel)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for channel in idle:
+            channel.close()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "max_channels": self._max_channels,
+                "opened": self._opened,
+                "reused": self._reused,
+                "discarded": self._discarded,
+                "protocol": self._protocol,
+            }
+
+    def _acquire(self, wait_timeout_s: float) -> ShellChannel:
+        deadline = time.monotonic() + max(0.0, wait_timeout_s)
+        expired = []
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ShellChannelError("Shell channel pool is closed")
+                channel = self._pop_idle_locked(expired)
+                if channel is not None:
+                    self._reused += 1
+                if channel is not None or self._busy + len(self._idle) < self._max_channels:
+                    self._busy += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free shell channel")
+                self._condition.wait(remaining)
+
+        for stale in expired:
+            stale.close()
+        if channel is not None:
+            return channel
+        try:
+            channel = self._opener()
+        except BaseException:
+            with self._condition:
+                self._busy -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opened += 1
+            self._protocol = "v2" if channel.v2 else "legacy"
+        return channel
+
+    def _pop_idle_locked(self, expired: list) -> ShellChannel | None:
+        now = time.monotonic()
+        while self._idle:
+            channel = self._idle.pop()
+            if not channel.closed and now - channel.last_used_at <= self._idle_timeout_s:
+                return channel
+            expired.append(channel)
+            self._discarded += 1
+        return None
+
+    def _release(self, channel: ShellChannel) -> None:
+        with self._condition:
+            self._busy -= 1
+            if channel.closed or self._closed:
+                self._discarded += 1
+                keep = False
+            else:
+                self._idle.append(channel)
+                keep = True
+            self._condition.notify()
+        if not keep:
+            channel.close()
+
+
+def open_shell_channel(adb_device, prefer_v2: bool = True) -> ShellChannel:
+    """Open ``sh`` on the device over shell protocol v2, falling back to the legacy shell service."""
+    if prefer_v2:
+        try:
+            return ShellChannel(_open_service(adb_device, "shell,v2,raw:sh"), v2=True)
+        except Exception as error:
+            logger.debug("shell v2 unavailable on %s, using legacy shell: %s", adb_device.serial, error)
+    return ShellChannel(_open_service(adb_device, "shell:sh"), v2=False)
+
+
+def _open_service(adb_device, service: str):
+    connection = adb_device.open_transport()
+    try:
+        connection.send_command(service)
+        connection.check_okay()
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+class _MarkerParser:
+    """Splits one stream at ``\\n<marker>[ <status>]\\n`` while passing earlier bytes through."""
+
+    def __init__(self, marker: bytes, with_status: bool):
+        self._needle = b"\n" + marker + (b" " if with_status else b"\n")
+        self._with_status = with_status
+        self._pending = b""
+        self.done = False
+        self.status: int | None = None
+        self.leftover = b""
+
+    def feed(self, data: bytes) -> bytes:
+        if self.done:
+            self.leftover += data
+            return b""
+        self._pending += data
+        position = self._pending.find(self._needle)
+        if position < 0:
+            # Hold back a possible partial marker at the end of the buffer.
+            keep = len(self._needle) - 1
+            output, self._pending = self._pending[:-keep], self._pending[-keep:]
+            return output
+        if self._with_status:
+            end = self._pending.find(b"\n", position + len(self._needle))
+            if end < 0:
+                output, self._pending = self._pending[:position], self._pending[position:]
+                return output
+            self.status = int(self._pending[position + len(self._needle) : end])
+            rest = self._pending[end + 1 :]
+        else:
+            rest = self._pending[position + len(self._needle) :]
+        output = self._pending[:position]
+        self._pending = b""
+        self.done = True
+        self.leftover = rest
+        return output
+
+
+def _result(command: str, exit_code, outputs: dict, started_at: float, timed_out: bool) -> ShellResult:
+    return ShellResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=outputs["stdout"].text(),
+        stderr=outputs["stderr"].text(),
+        output_bytes=outputs["stdout"].total_bytes + outputs["stderr"].total_bytes,
+        truncated=outputs["stdout"].truncated or outputs["stderr"].truncated,
+        timed_out=timed_out,
+        duration_ms=round((time.perf_counter() - started_at) * 1000, 3),
+    )
@@ -1,7 +1,57 @@
+from threading import Lock
+
+from adb.shell_channel import ShellChannelPool, open_shell_channel
+from errors import ValidationError
+
+MAX_COMMANDS = 50
+
+
 class ShellService:
-    """Provides shell command execution on a target device."""
+    """Runs shell commands over a per-session pool of persistent shell channels."""
+
+    def __init__(self, max_channels: int = 2, idle_timeout_s: float = 300.0, prefer_v2: bool = True):
+        self._max_channels = max_channels
+        self._idle_timeout_s = idle_timeout_s
+        self._prefer_v2 = prefer_v2
+        self._pool_lock = Lock()
+
+    def pool_for(self, session) -> ShellChannelPool:
+        """Return the session's shell channel pool, creating it on first use."""
+        with self._pool_lock:
+            if session.shell_pool is None:
+                session.shell_pool = ShellChannelPool(
+                    lambda: open_shell_channel(session.adb_device, prefer_v2=self._prefer_v2),
+                    max_channels=self._max_channels,
+                    idle_timeout_s=self._idle_timeout_s,
+                )
+            return session.shell_pool
+
+    def run(
+        self,
+        session,
+        commands: list[str],
+        timeout_s: float = 30.0,
+        max_output_bytes: int = 65536,
+        on_output=None,
+    ) -> list:
+        """Run ``commands`` in order on one channel, sent to the device in a single write.
 
-    @staticmethod
-    def run(device, command: str) -> str:
-        output = device.shell(command)
-        return str(output)
+        ``on_output(index, kind, chunk)`` is called from the worker thread for every output chunk.
+        """
+        if not commands:
+            raise ValidationError("commands cannot be empty")
+        if len(commands) > MAX_COMMANDS:
+            raise ValidationError(f"At most {MAX_COMMANDS} commands are allowed per call")
+        if any(not command.strip() for command in commands):
+            raise ValidationError("commands cannot contain empty entries")
+        if timeout_s <= 0:
+            raise ValidationError("timeout_s must be > 0")
+        if max_output_bytes <= 0:
+            raise ValidationError("max_output_bytes must be > 0")
+        try:
+            return self.pool_for(session).run(
+                commands, timeout_s=timeout_s, max_output_bytes=max_output_bytes, on_output=on_output
+            )
+        finally:
+            # Shell commands can change what is on screen (input, am start, ...), even when a later one fails.
+            session.ui_state.bump()
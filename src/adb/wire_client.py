@@ -0,0 +1,460 @@
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+
+
+class AdbWireError(Exception):
+    """Raised when the adb server rejects a request or the connection breaks."""
+
+
+class AdbConnection:
+    """One TCP connection to the adb server speaking the smart-socket protocol.
+
+    ``conn`` is the raw socket, matching what adbutils connections expose to stream readers.
+    """
+
+    def __init__(self, sock: socket.socket, on_close=None):
+        self.conn = sock
+        self._on_close = on_close
+        self.closed = False
+        self.created_at = time.monotonic()
+
+    def send_command(self, payload: str) -> None:
+        data = payload.encode()
+        self.conn.sendall(f"{len(data):04x}".encode() + data)
+
+    def check_okay(self) -> None:
+        status = self.read_exact(4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbWireError(self.read_string_block())
+        raise AdbWireError(f"Unexpected adb server status: {status!r}")
+
+    def read_exact(self, size: int) -> bytes:
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = self.conn.recv(size - len(chunks))
+            if not chunk:
+                raise AdbWireError("adb server closed the connection")
+            chunks += chunk
+        return bytes(chunks)
+
+    def read_string_block(self) -> str:
+        length = int(self.read_exact(4), 16)
+        return self.read_exact(length).decode("utf-8", errors="replace")
+
+    def read_until_close(self) -> bytes:
+        chunks = bytearray()
+        while True:
+            chunk = self.conn.recv(65536)
+            if not chunk:
+                return bytes(chunks)
+            chunks += chunk
+
+    def recv(self, size: int) -> bytes:
+        return self.conn.recv(size)
+
+    def is_alive(self) -> bool:
+        """Cheap idle check: an idle transport must have nothing to read and must not be at EOF."""
+        if self.closed:
+            return False
+        timeout = self.conn.gettimeout()
+        try:
+            self.conn.setblocking(False)
+            self.conn.recv(1, socket.MSG_PEEK)
+            return False  # EOF, or unsolicited data on a connection no service has started on.
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                self.conn.settimeout(timeout)
+            except OSError:
+                pass
+
+    def close(self, notify: bool = True) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.close()
+        finally:
+            if notify and self._on_close is not None:
+                self._on_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AdbConnectionPool:
+    """Keeps connections to the adb server already switched to a device transport.
+
+    Selecting a transport (``host:transport:<serial>``) costs a round trip on a fresh TCP
+    connection before every device service. The adb server hands a connection over to the
+    service that runs on it, so a connection is used once; the pool keeps up to
+    ``max_idle_per_serial`` pre-handshaked connections per recently used device and refills
+    them in the background after each checkout. Idle connections are health-checked before
+    reuse and dropped after ``idle_timeout_s``. ``max_connections`` bounds idle plus in-use
+    connections opened through the pool. Connections for long-lived services, taken with
+    ``acquire_long_lived``, are not counted: they are never returned or evicted, so counting them
+    would leave short requests waiting for slots that cannot free up.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_idle_per_serial: int = 2,
+        max_connections: int = 64,
+        idle_timeout_s: float = 30.0,
+        connect_timeout_s: float = 5.0,
+        prefill: bool = True,
+    ):
+        self._address = (host, port)
+        self._max_idle_per_serial = max(0, max_idle_per_serial)
+        self._max_connections = max(1, max_connections)
+        self._idle_timeout_s = idle_timeout_s
+        self._connect_timeout_s = connect_timeout_s
+        self._condition = Condition()
+        self._idle: dict[str, list[AdbConnection]] = {}
+        self._open = 0
+        self._long_lived = 0
+        self._refilling: set[str] = set()
+        self._refiller = ThreadPoolExecutor(max_workers=1, thread_name_prefix="adb-pool-refill") if prefill else None
+        self._closed = False
+        self._metrics = {
+            "connects": 0,
+            "transport_handshakes": 0,
+            "hits": 0,
+            "misses": 0,
+            "health_check_failures": 0,
+            "expired": 0,
+            "limit_waits": 0,
+        }
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._address
+
+    def connect(self, timeout_s: float | None = None) -> AdbConnection:
+        """Open a new server connection (not pooled) counted towards ``max_connections``."""
+        self._reserve(self._connect_timeout_s if timeout_s is None else timeout_s)
+        try:
+            sock = self._connect_socket()
+        except Exception:
+            self._release_slot()
+            raise
+        return AdbConnection(sock, on_close=self._release_slot)
+
+    def acquire_transport(self, serial: str) -> AdbConnection:
+        """Return a connection bound to ``serial``'s transport, ready for one service request."""
+        connection = self._take_idle(serial)
+        if connection is None:
+            with self._condition:
+                self._metrics["misses"] += 1
+            connection = self._open_transport(serial)
+        else:
+            with self._condition:
+                self._metrics["hits"] += 1
+        self._schedule_refill(serial)
+        return connection
+
+    def acquire_long_lived(self, serial: str) -> AdbConnection:
+        """Like ``acquire_transport``, for a service that holds its connection indefinitely.
+
+        The connection does not count towards ``max_connections``. An idle pre-handshaked
+        connection is reused when one is available and its slot handed back to the pool.
+        """
+        connection = self._take_idle(serial)
+        if connection is not None:
+            with self._condition:
+                self._metrics["hits"] += 1
+                self._open -= 1
+                self._long_lived += 1
+                self._condition.notify()
+            connection._on_close = self._release_long_lived
+            self._schedule_refill(serial)
+            return connection
+        with self._condition:
+            self._metrics["misses"] += 1
+            self._long_lived += 1
+        try:
+            connection = AdbConnection(self._connect_socket(), on_close=self._release_long_lived)
+        except Exception:
+            self._release_long_lived()
+            raise
+        self._handshake(connection, serial)
+        return connection
+
+    def invalidate(self, serial: str | None = None) -> None:
+        """Close idle connections for ``serial`` (all serials if ``None``)."""
+        with self._condition:
+            if serial is None:
+                dropped = [connection for connections in self._idle.values() for connection in connections]
+                self._idle.clear()
+            else:
+                dropped = self._idle.pop(serial, [])
+        for connection in dropped:
+            connection.close()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+        self.invalidate()
+        if self._refiller is not None:
+            self._refiller.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        with self._condition:
+            idle = {serial: len(connections) for serial, connections in self._idle.items() if connections}
+            return {
+                "open": self._open,
+                "idle": sum(idle.values()),
+                "in_use": self._open - sum(idle.values()),
+                "long_lived": self._long_lived,
+                "idle_per_serial": dict(sorted(idle.items())),
+                "max_idle_per_serial": self._max_idle_per_serial,
+                "max_connections": self._max_connections,
+                **self._metrics,
+            }
+
+    def _open_transport(self, serial: str) -> AdbConnection:
+        connection = self.connect()
+        self._handshake(connection, serial)
+        return connection
+
+    def _connect_socket(self) -> socket.socket:
+        try:
+            sock = socket.create_connection(self._address, timeout=self._connect_timeout_s)
+        except OSError as error:
+            host, port = self._address
+            raise AdbWireError(f"Cannot connect to adb server at {host}:{port}: {error}") from error
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._condition:
+            self._metrics["connects"] += 1
+        return sock
+
+    def _handshake(self, connection: AdbConnection, serial: str) -> None:
+        try:
+            connection.send_command(f"host:transport:{serial}")
+            connection.check_okay()
+        except Exception:
+            connection.close()
+            raise
+        with self._condition:
+            self._metrics["transport_handshakes"] += 1
+
+    def _take_idle(self, serial: str) -> AdbConnection | None:
+        now = time.monotonic()
+        stale = []
+        try:
+            while True:
+                with self._condition:
+                    connections = self._idle.get(serial)
+                    if not connections:
+                        return None
+                    connection = connections.pop()
+                    if now - connection.created_at > self._idle_timeout_s:
+                        self._metrics["expired"] += 1
+                        stale.append(connection)
+                        continue
+                if connection.is_alive():
+                    return connection
+                with self._condition:
+                    self._metrics["health_check_failures"] += 1
+                stale.append(connection)
+        finally:
+            for connection in stale:
+                connection.close()
+
+    def _schedule_refill(self, serial: str) -> None:
+        if self._refiller is None or self._max_idle_per_serial == 0:
+            return
+        with self._condition:
+            if self._closed or serial in self._refilling:
+                return
+            self._refilling.add(serial)
+        try:
+            self._refiller.submit(self._refill, serial)
+        except RuntimeError:
+            with self._condition:
+                self._refilling.discard(serial)
+
+    def _refill(self, serial: str) -> None:
+        try:
+            while True:
+                with self._condition:
+                    idle = len(self._idle.get(serial, []))
+                    # Leave headroom so refilling never makes callers wait for a connection slot.
+                    if self._closed or idle >= self._max_idle_per_serial or self._open >= self._max_connections - 1:
+                        return
+                try:
+                    connection = self._open_transport(serial)
+                except Exception as error:
+                    logger.debug("Could not pre-open adb transport for %s: %s", serial, error)
+                    return
+                with self._condition:
+                    if not self._closed:
+                        self._idle.setdefault(serial, []).append(connection)
+                        continue
+                connection.close()
+                return
+        finally:
+            with self._condition:
+                self._refilling.discard(serial)
+
+    def _reserve(self, timeout_s: float) -> None:
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        with self._condition:
+            waited = False
+            while self._open >= self._max_connections:
+                if not waited:
+                    self._metrics["limit_waits"] += 1
+                    waited = True
+                if not self._evict_idle_locked():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdbWireError(f"adb connection limit reached ({self._max_connections})")
+                    self._condition.wait(remaining)
+            self._open += 1
+
+    def _evict_idle_locked(self) -> bool:
+        """Close the oldest idle connection to make room; returns False if none is idle."""
+        oldest_serial = None
+        for serial, connections in self._idle.items():
+            if connections and (
+                oldest_serial is None or connections[0].created_at < self._idle[oldest_serial][0].created_at
+            ):
+                oldest_serial = serial
+        if oldest_serial is None:
+            return False
+        connection = self._idle[oldest_serial].pop(0)
+        # Release the slot here: notifying would call _release_slot, which takes the lock we hold.
+        connection.close(notify=False)
+        self._open -= 1
+        return True
+
+    def _release_slot(self) -> None:
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _release_long_lived(self) -> None:
+        with self._condition:
+            self._long_lived -= 1
+
+
+class AdbWireClient:
+    """Minimal adb server client for the requests this server makes, built on ``AdbConnectionPool``."""
+
+    def __init__(self, pool: AdbConnectionPool):
+        self.pool = pool
+
+    def host_request(self, service: str) -> str:
+        with self.pool.connect() as connection:
+            connection.send_command(service)
+            connection.check_okay()
+            return connection.read_string_block()
+
+    def device_states(self) -> dict[str, str]:
+        return parse_device_states(self.host_request("host:devices"))
+
+    def get_state(self, serial: str) -> str:
+        return self.host_request(f"host-serial:{serial}:get-state").strip()
+
+    def open_service(
+        self, serial: str, service: str, timeout_s: float | None = None, long_lived: bool = False
+    ) -> AdbConnection:
+        """Start ``service`` on ``serial``; ``long_lived`` services are kept out of the connection limit."""
+        pool = self.pool
+        connection = pool.acquire_long_lived(serial) if long_lived else pool.acquire_transport(serial)
+        try:
+            connection.conn.settimeout(timeout_s)
+            connection.send_command(service)
+            connection.check_okay()
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def shell(self, serial: str, command: str, timeout_s: float | None = None) -> bytes:
+        with self.open_service(serial, f"shell:{command}", timeout_s=timeout_s) as connection:
+            return connection.read_until_close()
+
+    def track_devices(self):
+        """Yield a full ``{serial: state}`` snapshot each time the adb server reports a change."""
+        # Long-lived: uses its own connection so it never holds a pool slot.
+        sock = socket.create_connection(self.pool.address)
+        connection = AdbConnection(sock)
+        try:
+            connection.send_command("host:track-devices")
+            connection.check_okay()
+            while True:
+                yield parse_device_states(connection.read_string_block())
+        finally:
+            connection.close()
+
+
+class PooledAdbDevice:
+    """adbutils-compatible device for the calls this server makes, served over pooled connections.
+
+    Attributes it does not implement are delegated to the adbutils device from ``fallback``.
+    """
+
+    def __init__(self, client: AdbWireClient, serial: str, fallback=None, shell_timeout_s: float = 120.0):
+        self.serial = serial
+        self._client = client
+        self._fallback_factory = fallback
+        self._fallback = None
+        self._shell_timeout_s = shell_timeout_s
+
+    def shell(self, cmdargs, stream: bool = False, timeout: float | None = None, encoding="utf-8", rstrip=True):
+        command = cmdargs if isinstance(cmdargs, str) else " ".join(cmdargs)
+        if stream:
+            # Streams (logcat follow) block until data arrives, like adbutils stream connections.
+            return self._client.open_service(self.serial, f"shell:{command}", timeout_s=None, long_lived=True)
+        output = self._client.shell(self.serial, command, timeout_s=timeout or self._shell_timeout_s)
+        if encoding is None:
+            return output
+        text = output.decode(encoding, errors="replace")
+        return text.rstrip() if rstrip else text
+
+    def get_state(self) -> str:
+        return self._client.get_state(self.serial)
+
+    def open_transport(self, timeout: float | None = None) -> AdbConnection:
+        """Open a transport for a persistent service (shell channels), outside the connection limit."""
+        connection = self._client.pool.acquire_long_lived(self.serial)
+        connection.conn.settimeout(timeout)
+        return connection
+
+    def __getattr__(self, name):
+        if name.startswith("_") or self._fallback_factory is None:
+            raise AttributeError(name)
+        if self._fallback is None:
+            self._fallback = self._fallback_factory()
+        return getattr(self._fallback, name)
+
+    def __repr__(self) -> str:
+        return f"PooledAdbDevice(serial={self.serial!r})"
+
+
+def parse_device_states(output: str) -> dict[str, str]:
+    states = {}
+    for line in output.splitlines():
+        serial, _, state = line.strip().partition("\t")
+        if serial and state:
+            states[serial] = state.strip()
+    return states
@@ -0,0 +1,194 @@
+import base64
+import time
+
+from errors import ValidationError, classify_error, worst_error_kind
+from shared.validators import parse_returned_attributes, validate_dump_format
+from ui.selector_engine import UiSelector
+
+MAX_STEPS = 100
+MAX_WAIT_S = 60.0
+SELECTOR_FIELDS = ("text", "resource_id", "content_desc", "class_name", "xpath", "index", "regex")
+
+
+class ActionRunner:
+    """Executes an ordered list of UI steps against one device session.
+
+    The caller runs ``run`` once under the session's ``ui_lock``, so a whole script pays for
+    device resolution, session lookup, scheduling and lock acquisition only once.
+    """
+
+    def __init__(self, interaction_service, selector_service, hierarchy_service, screen_service, sleep=time.sleep):
+        self._interaction_service = interaction_service
+        self._selector_service = selector_service
+        self._hierarchy_service = hierarchy_service
+        self._screen_service = screen_service
+        self._sleep = sleep
+        self._handlers = {
+            "tap": self._tap,
+            "swipe": self._swipe,
+            "send_text": self._send_text,
+            "system_action": self._system_action,
+            "click": self._click,
+            "wait": self._wait,
+            "screenshot": self._screenshot,
+            "dump": self._dump,
+        }
+
+    @property
+    def actions(self) -> tuple[str, ...]:
+        return tuple(self._handlers)
+
+    def validate(self, steps: list[dict]) -> None:
+        if not steps:
+            raise ValidationError("steps cannot be empty")
+        if len(steps) > MAX_STEPS:
+            raise ValidationError(f"At most {MAX_STEPS} steps are allowed per call")
+        for index, step in enumerate(steps):
+            action = step.get("action")
+            if action not in self._handlers:
+                allowed = ", ".join(self._handlers)
+                raise ValidationError(f"Step {index}: unknown action {action!r}. Allowed values: {allowed}")
+
+    def run(self, session, steps: list[dict], stop_on_error: bool = True) -> dict:
+        """Run ``steps`` in order and report each step's outcome and duration.
+
+        Step failures are recorded rather than raised, so a partially executed script is never
+        retried as a whole. With ``stop_on_error`` the remaining steps are skipped after a failure.
+        ``error_kind`` is the most severe ``ErrorKind`` among failed steps, so device faults still
+        reach the circuit breaker.
+        """
+        self.validate(steps)
+        results = []
+        started_at = time.perf_counter()
+        failed = False
+        for index, step in enumerate(steps):
+            action = step["action"]
+            if failed and stop_on_error:
+                results.append({"index": index, "action": action, "status": "skipped"})
+                continue
+
+            step_started_at = time.perf_counter()
+            try:
+                result = self._handlers[action](session, step)
+            except Exception as error:
+                failed = True
+                results.append(
+                    {
+                        "index": index,
+                        "action": action,
+                        "status": "error",
+                        "error": str(error),
+                        "error_kind": classify_error(error).value,
+                        "duration_ms": _elapsed_ms(step_started_at),
+                    }
+                )
+            else:
+                results.append(
+                    {
+                        "index": index,
+                        "action": action,
+                        "status": "ok",
+                        "result": result,
+                        "duration_ms": _elapsed_ms(step_started_at),
+                    }
+                )
+
+        return {
+            "steps": results,
+            "completed": sum(1 for result in results if result["status"] == "ok"),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "skipped": sum(1 for result in results if result["status"] == "skipped"),
+            "error_kind": _value(worst_error_kind(result.get("error_kind") for result in results)),
+            "total_ms": _elapsed_ms(started_at),
+        }
+
+    def _tap(self, session, step: dict) -> str:
+        return self._interaction_service.tap(
+            session.u2_device, _required(step, "x"), _required(step, "y"), ui_state=session.ui_state
+        )
+
+    def _swipe(self, session, step: dict) -> str:
+        return self._interaction_service.swipe(
+            session.u2_device,
+            _required(step, "x1"),
+            _required(step, "y1"),
+            _required(step, "x2"),
+            _required(step, "y2"),
+            duration_ms=step.get("duration_ms", 300),
+            ui_state=session.ui_state,
+        )
+
+    def _send_text(self, session, step: dict) -> str:
+        return self._interaction_service.send_text(
+            session.u2_device,
+            _required(step, "text_to_send"),
+            clear=step.get("clear_existing", False),
+            ui_state=session.ui_state,
+        )
+
+    def _system_action(self, session, step: dict) -> str:
+        return self._interaction_service.system_action(
+            session.u2_device, _required(step, "system_action"), ui_state=session.ui_state
+        )
+
+    def _click(self, session, step: dict) -> str:
+        return self._selector_service.click(
+            session.u2_device,
+            **{name: step[name] for name in SELECTOR_FIELDS if step.get(name) is not None},
+            timeout_s=step.get("timeout_s", 10.0),
+            ui_state=session.ui_state,
+        )
+
+    def _wait(self, session, step: dict) -> str:
+        """Sleep for ``seconds``, or wait until the step's selector matches an element."""
+        criteria = {name: step[name] for name in SELECTOR_FIELDS if step.get(name) is not None}
+        if criteria:
+            selector = UiSelector(**criteria)
+            timeout_s = min(step.get("timeout_s", 10.0), MAX_WAIT_S)
+            node = self._selector_service.find(
+                session.u2_device, selector, timeout_s=timeout_s, ui_state=session.ui_state
+            )
+            return f"Found element with selector {selector.label} at {list(node.bounds)}"
+
+        seconds = _required(step, "seconds")
+        if not 0 <= seconds <= MAX_WAIT_S:
+            raise ValidationError(f"seconds must be between 0 and {MAX_WAIT_S:g}")
+        self._sleep(seconds)
+        return f"Waited {seconds:g}s"
+
+    def _screenshot(self, session, step: dict) -> dict:
+        # Always capture directly: a background frame may predate the steps that just ran.
+        png_bytes = self._screen_service.capture_png_bytes(
+            session.adb_device,
+            scale_factor=step.get("scale_factor", 0.4),
+            cache=session.screenshot_cache,
+        )
+        return {"format": "png", "data": base64.b64encode(png_bytes).decode()}
+
+    def _dump(self, session, step: dict) -> str:
+        return self._hierarchy_service.render_dump(
+            session.u2_device,
+            parse_returned_attributes(step.get("returned_attributes", "text,resource-id,class,bounds")),
+            output_format=validate_dump_format(step.get("output_format", "xml")),
+            compressed=step.get("compressed", False),
+            ui_state=session.ui_state,
+            force_refresh=step.get("force_refresh", False),
+            max_bytes=step.get("max_bytes", 65536),
+            since_token=step.get("since_token"),
+            include_token=step.get("include_token", False),
+        )
+
+
+def _required(step: dict, name: str):
+    value = step.get(name)
+    if value is None:
+        raise ValidationError(f"{step['action']} step requires '{name}'")
+    return value
+
+
+def _value(kind):
+    return kind.value if kind is not None else None
+
+
+def _elapsed_ms(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000, 3)
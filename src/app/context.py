@@ -1,21 +1,142 @@
+import asyncio
+import time
+
+from errors import ErrorKind, classify_error
+from orchestration.circuit_breaker import DeviceCircuitBreaker
 from orchestration.executor import DeviceExecutor
+from orchestration.scheduler import TaskPriority
 from orchestration.session_manager import DeviceSessionManager
+from shared.metrics import RESOLVE, record_phase
 
 
 class AppContext:
     """Application context shared across MCP tool handlers."""
 
-    def __init__(self, session_manager: DeviceSessionManager, executor: DeviceExecutor):
+    def __init__(
+        self,
+        session_manager: DeviceSessionManager,
+        executor: DeviceExecutor,
+        circuit_breaker: DeviceCircuitBreaker | None = None,
+    ):
         self.session_manager = session_manager
         self.executor = executor
+        self.circuit_breaker = circuit_breaker
+
+    def run_for_device(self, serial, operation, requires_ui_lock: bool = False, retry: bool = True):
+        serial = self._admit(serial)
+        try:
+            result = self._run_with_retry(serial, operation, requires_ui_lock, retry)
+        except BaseException as error:
+            self._record_outcome(serial, error)
+            raise
+        self._record_outcome(serial, None, result)
+        return result
+
+    async def run_for_device_async(
+        self,
+        serial,
+        operation,
+        requires_ui_lock: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        retry: bool = True,
+    ):
+        """Run ``operation(session)`` on the device's session.
+
+        A connection error is retried once on a fresh session; pass ``retry=False`` for operations
+        that must not run twice when they fail partway (shell batches).
+        """
+        serial = await self._admit_async(serial)
+        try:
+            result = await self._run_with_retry_async(serial, operation, requires_ui_lock, priority, retry)
+        except BaseException as error:
+            self._record_outcome(serial, error)
+            raise
+        self._record_outcome(serial, None, result)
+        return result
+
+    def _run_with_retry(self, serial, operation, requires_ui_lock: bool, retry: bool):
+        # Sessions are leased: counted in flight from lookup until the executor finishes the call.
+        session = self.session_manager.lease_session(serial)
+        try:
+            return self.executor.run(session, operation, requires_ui_lock=requires_ui_lock, leased=True)
+        except Exception as error:
+            if not retry or not self.session_manager.should_retry_after_error(error):
+                raise
+            self.session_manager.clear_session(session.serial)
+            refreshed_session = self.session_manager.lease_session(session.serial)
+            return self.executor.run(refreshed_session, operation, requires_ui_lock=requires_ui_lock, leased=True)
 
-    def run_for_device(self, serial, operation, requires_ui_lock: bool = False):
-        session = self.session_manager.get_session(serial)
+    async def _run_with_retry_async(
+        self, serial, operation, requires_ui_lock: bool, priority: TaskPriority, retry: bool
+    ):
+        session = await self._lease_session_async(serial)
         try:
-            return self.executor.run(session, operation, requires_ui_lock=requires_ui_lock)
+            return await self.executor.run_async(
+                session, operation, requires_ui_lock=requires_ui_lock, priority=priority, leased=True
+            )
         except Exception as error:
-            if not self.session_manager.should_retry_after_error(error):
+            if not retry or not self.session_manager.should_retry_after_error(error):
                 raise
             self.session_manager.clear_session(session.serial)
-            refreshed_session = self.session_manager.get_session(session.serial)
-            return self.executor.run(refreshed_session, operation, requires_ui_lock=requires_ui_lock)
+            refreshed_session = await self._lease_session_async(session.serial)
+            return await self.executor.run_async(
+                refreshed_session, operation, requires_ui_lock=requires_ui_lock, priority=priority, leased=True
+            )
+
+    async def _lease_session_async(self, serial):
+        """Lease ``serial``'s session on the worker pool.
+
+        If the caller is cancelled while the lookup runs, the lease it would have received is released.
+        """
+        leasing = asyncio.ensure_future(
+            self.executor.call_async(self.session_manager.lease_session, serial, key=serial, phase=None)
+        )
+        try:
+            return await asyncio.shield(leasing)
+        except asyncio.CancelledError:
+            leasing.add_done_callback(_release_abandoned_lease)
+            raise
+
+    async def _admit_async(self, serial):
+        """``_admit`` without blocking the event loop.
+
+        Runs inline while the device inventory is synced, when resolution is a memory lookup;
+        otherwise resolving lists devices over adb, so it runs on the worker pool.
+        """
+        if self.session_manager.resolves_in_memory():
+            return self._admit(serial)
+        return await self.executor.call_async(self._admit, serial, phase=None)
+
+    def _admit(self, serial):
+        """Resolve ``serial`` once per call and fail fast if its circuit is open."""
+        started_at = time.perf_counter()
+        resolved_serial = self.session_manager.resolve_serial(serial)
+        record_phase(RESOLVE, time.perf_counter() - started_at, resolved_serial)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.allow(resolved_serial)
+        return resolved_serial
+
+    def _record_outcome(self, serial, error: BaseException | None, result=None) -> None:
+        """Feed the call's outcome to the circuit breaker.
+
+        Operations that report failures in their result instead of raising (``run_actions``)
+        expose the most severe one as ``error_kind``.
+        """
+        if self.circuit_breaker is None:
+            return
+        if error is not None:
+            kind = classify_error(error)
+        else:
+            reported = result.get("error_kind") if isinstance(result, dict) else getattr(result, "error_kind", None)
+            kind = ErrorKind(reported) if reported else None
+        if kind is None:
+            self.circuit_breaker.record_success(serial)
+        elif kind.device_fault:
+            self.circuit_breaker.record_failure(serial, error or f"operation reported a {kind.value} error")
+        else:
+            self.circuit_breaker.release(serial)
+
+
+def _release_abandoned_lease(leasing: asyncio.Future) -> None:
+    if not leasing.cancelled() and leasing.exception() is None:
+        leasing.result().end_call()
@@ -0,0 +1,58 @@
+import time
+from functools import wraps
+
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from shared.metrics import LatencyMetrics, current_call
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class InstrumentedFastMCP(FastMCP):
+    """FastMCP server that records per-phase latency of every tool call in ``LatencyMetrics``.
+
+    ``call_tool`` spans the whole call, so the time between the handler returning and FastMCP
+    finishing the result conversion is recorded as the ``serialize`` phase.
+    """
+
+    def __init__(self, *args, metrics: LatencyMetrics, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
+
+    def tool(self, *args, **kwargs):
+        register = super().tool(*args, **kwargs)
+
+        def decorator(fn):
+            register(_mark_handler_done(fn, self.metrics))
+            return fn
+
+        return decorator
+
+    async def call_tool(self, name, *args, **kwargs):
+        with self.metrics.track_call(name):
+            return await super().call_tool(name, *args, **kwargs)
+
+
+def register_metrics_route(mcp: FastMCP, metrics: LatencyMetrics, path: str) -> None:
+    """Serve the histograms in the Prometheus text format on the HTTP transports."""
+
+    @mcp.custom_route(path, methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _mark_handler_done(fn, metrics: LatencyMetrics):
+    @wraps(fn)
+    async def handler(*args, **kwargs):
+        # Calls that do not enter through ``call_tool`` are still timed, without the serialize phase.
+        with metrics.track_call(fn.__name__):
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                call = current_call()
+                if call is not None:
+                    call.handler_done_at = time.perf_counter()
+
+    return handler
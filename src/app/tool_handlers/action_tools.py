@@ -0,0 +1,68 @@
+from mcp.server.fastmcp import FastMCP
+from pydantic import Field
+
+from errors import to_tool_error
+from models.actions import ActionRunResult, ActionStep, FanOutActionRunResult
+from orchestration.scheduler import TaskPriority
+
+STEPS_DESCRIPTION = (
+    "Ordered steps, e.g. [{\"action\": \"click\", \"resource_id\": \"com.app:id/email\"}, "
+    "{\"action\": \"send_text\", \"text_to_send\": \"me@example.com\"}, "
+    "{\"action\": \"system_action\", \"system_action\": \"BACK\"}]"
+)
+
+
+def register_action_tools(mcp: FastMCP, ctx, action_runner, fanout_runner):
+    @mcp.tool(structured_output=True)
+    async def run_actions(
+        serial: str | None = Field(default=None, description="Target device serial"),
+        steps: list[ActionStep] = Field(description=STEPS_DESCRIPTION),
+        stop_on_error: bool = Field(default=True, description="Skip the remaining steps after a failed step"),
+    ) -> ActionRunResult:
+        """Run several UI steps on one device in a single call, holding the device's UI lock once."""
+        try:
+            step_dicts = [step.model_dump(exclude_none=True) for step in steps]
+            action_runner.validate(step_dicts)
+
+            def operation(session):
+                return ActionRunResult(**action_runner.run(session, step_dicts, stop_on_error=stop_on_error))
+
+            return await ctx.run_for_device_async(serial, operation, requires_ui_lock=True)
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def run_actions_on_devices(
+        steps: list[ActionStep] = Field(description=STEPS_DESCRIPTION),
+        serials: list[str] | None = Field(default=None, description="Target device serials"),
+        all_online: bool = Field(default=False, description="Target every online device"),
+        model: str | None = Field(
+            default=None, description="Target online devices whose model contains this text (case-insensitive)"
+        ),
+        stop_on_error: bool = Field(default=True, description="Skip a device's remaining steps after a failed step"),
+        max_concurrency: int | None = Field(
+            default=None, description="Devices run at once for this call (capped by the server-wide limit)"
+        ),
+        timeout_s: float | None = Field(default=None, description="Per-device timeout in seconds"),
+    ) -> FanOutActionRunResult:
+        """Run the same UI steps on many devices concurrently and report each device's outcome."""
+        try:
+            step_dicts = [step.model_dump(exclude_none=True) for step in steps]
+            action_runner.validate(step_dicts)
+            targets = await ctx.executor.call_async(
+                fanout_runner.resolve_targets, serials, all_online, model, priority=TaskPriority.HIGH
+            )
+
+            def operation(session):
+                return action_runner.run(session, step_dicts, stop_on_error=stop_on_error)
+
+            result = await fanout_runner.run(
+                targets,
+                operation,
+                requires_ui_lock=True,
+                max_concurrency=max_concurrency,
+                timeout_s=timeout_s,
+            )
+            return FanOutActionRunResult(**result)
+        except Exception as error:
+            raise to_tool_error(error) from error
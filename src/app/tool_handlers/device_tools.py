@@ -1,48 +1,116 @@
+import asyncio
+from typing import Any
+
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.exceptions import ToolError
 from pydantic import Field
 
-from errors import to_tool_error
+from errors import ValidationError, to_tool_error
 from models.device import DeviceInfo
+from orchestration.scheduler import TaskPriority
 
 
-def register_device_tools(mcp: FastMCP, ctx, device_manager):
+def register_device_tools(mcp: FastMCP, ctx, device_manager, fanout_runner, adb_provider, session_warmer, metrics):
     @mcp.tool(structured_output=True)
-    def list_devices() -> list[DeviceInfo]:
+    async def list_devices() -> list[DeviceInfo]:
         """List all connected Android devices."""
         try:
-            return device_manager.list_devices()
+            return await ctx.executor.call_async(device_manager.list_devices)
         except Exception as error:
             raise to_tool_error(error) from error
 
     @mcp.tool(structured_output=True)
-    def get_device_status(
+    async def get_device_status(
         serial: str = Field(description="Target device serial"),
     ) -> DeviceInfo:
         """Get status and metadata for a specific device."""
         try:
-            devices = {d.serial: d for d in device_manager.list_devices()}
-            if serial not in devices:
+            device = await ctx.executor.call_async(device_manager.get_device_info, serial)
+            if device is None:
                 raise ToolError(f"Device not found: {serial}")
-            return devices[serial]
+            return device
         except Exception as error:
             raise to_tool_error(error) from error
 
     @mcp.tool(structured_output=True)
-    def clear_device_session(
+    async def clear_device_session(
         serial: str = Field(description="Target device serial"),
     ) -> str:
         """Clear a cached device session."""
         try:
-            removed = ctx.session_manager.clear_session(serial)
+            removed = await ctx.executor.call_async(ctx.session_manager.clear_session, serial)
             return f"Session cleared for {serial}" if removed else f"No active session for {serial}"
         except Exception as error:
             raise to_tool_error(error) from error
 
     @mcp.tool(structured_output=True)
-    def list_active_sessions() -> list[str]:
-        """List serial numbers with an active MCP session."""
+    async def list_active_sessions() -> dict[str, Any]:
+        """List active MCP sessions with their idle time and in-flight calls, plus eviction counts."""
+        try:
+            return ctx.session_manager.session_stats()
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def warm_sessions(
+        serials: list[str] | None = Field(
+            default=None, description="Devices to warm (default: configured warm serials or every attached device)"
+        ),
+        wait_s: float = Field(default=0.0, description="Wait up to this many seconds for the warm-ups to finish"),
+    ) -> dict[str, Any]:
+        """Connect device sessions ahead of use and return each device's readiness."""
+        try:
+            futures = await ctx.executor.call_async(session_warmer.submit, serials, priority=TaskPriority.LOW)
+            wait_s = min(max(wait_s, 0.0), 120.0)
+            if wait_s > 0 and futures:
+                # Wait on the event loop: the warm-ups run on the warmer's own threads.
+                await asyncio.wait([asyncio.wrap_future(future) for future in futures.values()], timeout=wait_s)
+            return session_warmer.status(list(futures))
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def get_session_readiness() -> dict[str, Any]:
+        """Report warm-up state (pending, warming, ready, failed) per device."""
+        try:
+            return session_warmer.status()
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def get_runtime_stats() -> dict[str, Any]:
+        """Get executor queue and wait-time statistics, circuit breaker states and per-session cache statistics."""
+        try:
+            sessions = {
+                session.serial: {
+                    "screenshot_cache": session.screenshot_cache.stats() if session.screenshot_cache else None,
+                    "frame_grabber": session.frame_grabber.stats() if session.frame_grabber else None,
+                    "logcat_reader": session.logcat_reader.stats() if session.logcat_reader else None,
+                    "shell_pool": session.shell_pool.stats() if session.shell_pool else None,
+                    "ui_state": session.ui_state.stats(),
+                }
+                for session in ctx.session_manager.cached_sessions()
+            }
+            return {
+                "executor": ctx.executor.stats(),
+                "adb_pool": adb_provider.stats(),
+                "fanout": fanout_runner.stats(),
+                "circuit_breaker": ctx.circuit_breaker.stats() if ctx.circuit_breaker else None,
+                "sessions": dict(sorted(sessions.items())),
+            }
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def get_server_metrics(
+        output_format: str = Field(default="summary", description="summary or prometheus"),
+    ) -> dict[str, Any]:
+        """Get per-tool and per-device latency histograms, in total and per phase."""
         try:
-            return ctx.session_manager.active_sessions()
+            if output_format == "prometheus":
+                return {"format": "prometheus", "text": metrics.render_prometheus()}
+            if output_format != "summary":
+                raise ValidationError("output_format must be 'summary' or 'prometheus'")
+            return metrics.snapshot()
         except Exception as error:
             raise to_tool_error(error) from error
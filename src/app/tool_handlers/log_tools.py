@@ -2,12 +2,14 @@ from mcp.server.fastmcp import FastMCP
 from pydantic import Field
 
 from errors import to_tool_error
+from models.logcat import LogcatPage, LogcatSearchResult
+from orchestration.scheduler import TaskPriority
 from shared.validators import validate_log_level
 
 
 def register_log_tools(mcp: FastMCP, ctx, logcat_service):
     @mcp.tool(structured_output=True)
-    def get_logcat_output(
+    async def get_logcat_output(
         serial: str | None = Field(default=None, description="Target device serial"),
         app_package: str = Field(description="App package to filter logcat by process pid"),
         log_level: str = Field(default="DEBUG", description="DEBUG, INFO, WARNING, ERROR"),
@@ -23,8 +25,75 @@ def register_log_tools(mcp: FastMCP, ctx, logcat_service):
                     app_package=app_package,
                     level=normalized_level,
                     max_lines=max_lines,
+                    reader=logcat_service.reader_for(session),
                 )
 
-            return ctx.run_for_device(serial, operation, requires_ui_lock=False)
+            return await ctx.run_for_device_async(
+                serial, operation, requires_ui_lock=False, priority=TaskPriority.HIGH
+            )
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def get_logcat_updates(
+        serial: str | None = Field(default=None, description="Target device serial"),
+        app_package: str | None = Field(default=None, description="Only lines from this app's processes"),
+        log_level: str = Field(default="DEBUG", description="DEBUG, INFO, WARNING, ERROR"),
+        cursor: str | None = Field(default=None, description="Cursor returned by the previous call"),
+        since_epoch_s: float | None = Field(default=None, description="Only lines at or after this device epoch time"),
+        until_epoch_s: float | None = Field(default=None, description="Only lines at or before this device epoch time"),
+        max_lines: int = Field(default=500, description="Maximum lines returned"),
+    ) -> LogcatPage:
+        """Get logcat lines written since a cursor, plus a new cursor for the next poll."""
+        try:
+            normalized_level = validate_log_level(log_level)
+
+            def operation(session):
+                page = logcat_service.read_updates(
+                    session.adb_device,
+                    logcat_service.reader_for(session),
+                    app_package=app_package,
+                    level=normalized_level,
+                    cursor=cursor,
+                    since_ts=since_epoch_s,
+                    until_ts=until_epoch_s,
+                    max_lines=max_lines,
+                )
+                return LogcatPage(**page)
+
+            return await ctx.run_for_device_async(
+                serial, operation, requires_ui_lock=False, priority=TaskPriority.HIGH
+            )
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def search_logcat_archive(
+        serial: str | None = Field(default=None, description="Device serial; may name a detached device"),
+        pattern: str | None = Field(default=None, description="Regular expression matched against each line"),
+        app_package: str | None = Field(default=None, description="Only lines from this app's processes"),
+        log_level: str = Field(default="DEBUG", description="DEBUG, INFO, WARNING, ERROR"),
+        since_epoch_s: float | None = Field(default=None, description="Only lines at or after this device epoch time"),
+        until_epoch_s: float | None = Field(default=None, description="Only lines at or before this device epoch time"),
+        max_results: int = Field(default=200, description="Maximum lines returned"),
+    ) -> LogcatSearchResult:
+        """Search the on-disk logcat archive, including history already rotated out of the device buffer."""
+        try:
+            normalized_level = validate_log_level(log_level)
+
+            def operation():
+                # Resolving the default device may list devices over adb, so it runs on the worker too.
+                result = logcat_service.search_archive(
+                    serial or ctx.session_manager.resolve_serial(None),
+                    pattern=pattern,
+                    app_package=app_package,
+                    level=normalized_level,
+                    since_ts=since_epoch_s,
+                    until_ts=until_epoch_s,
+                    max_results=max_results,
+                )
+                return LogcatSearchResult(**result)
+
+            return await ctx.executor.call_async(operation, priority=TaskPriority.LOW)
         except Exception as error:
             raise to_tool_error(error) from error
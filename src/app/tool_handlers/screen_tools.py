@@ -6,16 +6,21 @@ from errors import to_tool_error
 
 def register_screen_tools(mcp: FastMCP, ctx, screen_service):
     @mcp.tool()
-    def get_screenshot(
+    async def get_screenshot(
         serial: str | None = Field(default=None, description="Target device serial"),
         scale_factor: float = Field(default=0.4, description="Scale factor for returned screenshot"),
     ) -> Image:
         """Capture a screenshot from the target Android device."""
         try:
             def operation(session):
-                png_bytes = screen_service.capture_png_bytes(session.adb_device, scale_factor=scale_factor)
+                png_bytes = screen_service.capture_png_bytes(
+                    session.adb_device,
+                    scale_factor=scale_factor,
+                    cache=session.screenshot_cache,
+                    frame_grabber=screen_service.frame_grabber_for(session),
+                )
                 return Image(data=png_bytes, format="png")
 
-            return ctx.run_for_device(serial, operation, requires_ui_lock=False)
+            return await ctx.run_for_device_async(serial, operation, requires_ui_lock=False)
         except Exception as error:
             raise to_tool_error(error) from error
@@ -1,21 +1,111 @@
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import codecs
+
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 
 from errors import to_tool_error
+from models.shell import ShellCommandResult
 
 
-def register_system_tools(mcp: FastMCP, ctx, interaction_service):
+def register_system_tools(mcp: FastMCP, ctx, interaction_service, shell_service):
     @mcp.tool(structured_output=True)
-    def perform_system_action(
+    async def perform_system_action(
         serial: str | None = Field(default=None, description="Target device serial"),
         action: str = Field(description="BACK, HOME, RECENT_APPS"),
     ) -> str:
         """Perform a global Android system action."""
         try:
-            return ctx.run_for_device(
+            return await ctx.run_for_device_async(
                 serial,
-                lambda s: interaction_service.system_action(s.u2_device, action),
+                lambda s: interaction_service.system_action(s.u2_device, action, ui_state=s.ui_state),
                 requires_ui_lock=True,
             )
         except Exception as error:
             raise to_tool_error(error) from error
+
+    @mcp.tool(structured_output=True)
+    async def run_shell_commands(
+        serial: str | None = Field(default=None, description="Target device serial"),
+        commands: list[str] = Field(
+            description="Shell commands run in order, e.g. [\"getprop ro.build.id\", \"df -h\"]"
+        ),
+        timeout_s: float = Field(default=30.0, description="Timeout in seconds for each command"),
+        max_output_bytes: int = Field(
+            default=65536, description="Per-command cap for stdout and stderr; the middle of longer output is omitted"
+        ),
+        stream_output: bool = Field(
+            default=False,
+            description="Also send output as progress notifications while commands run (needs a progress token)",
+        ),
+        mcp_context: Context | None = None,
+    ) -> list[ShellCommandResult]:
+        """Run shell commands on a device over a persistent shell and return each exit code and output."""
+        progress = _ShellProgress(mcp_context) if stream_output and mcp_context is not None else None
+        try:
+
+            def operation(session):
+                results = shell_service.run(
+                    session,
+                    commands,
+                    timeout_s=timeout_s,
+                    max_output_bytes=max_output_bytes,
+                    on_output=progress.push if progress is not None else None,
+                )
+                return [ShellCommandResult(**vars(result)) for result in results]
+
+            # Never retried: the batch is sent in one write, so commands that already ran would run again.
+            if progress is None:
+                return await ctx.run_for_device_async(serial, operation, requires_ui_lock=False, retry=False)
+            async with progress:
+                return await ctx.run_for_device_async(serial, operation, requires_ui_lock=False, retry=False)
+        except Exception as error:
+            raise to_tool_error(error) from error
+
+
+class _ShellProgress:
+    """Forwards shell output chunks from the worker thread to the client as progress notifications.
+
+    Chunks are decoded incrementally per command and stream so a multi-byte character split across
+    reads is not mangled, then sent in order by one task on the event loop. ``progress`` counts the
+    output bytes seen so far.
+    """
+
+    def __init__(self, mcp_context: Context):
+        self._context = mcp_context
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._decoders: dict[tuple[int, str], codecs.IncrementalDecoder] = {}
+        self._sent_bytes = 0
+        self._task: asyncio.Task | None = None
+
+    def push(self, index: int, kind: str, chunk: bytes) -> None:
+        """Called from the worker thread for every output chunk."""
+        self._sent_bytes += len(chunk)
+        decoder = self._decoders.get((index, kind))
+        if decoder is None:
+            decoder = self._decoders[(index, kind)] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        text = decoder.decode(chunk)
+        if text:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (self._sent_bytes, f"[{index}:{kind}] {text}"))
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._send())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # Chunks scheduled by the worker before it returned are already queued ahead of the sentinel.
+        self._queue.put_nowait(None)
+        await self._task
+
+    async def _send(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            sent_bytes, message = item
+            try:
+                await self._context.report_progress(progress=sent_bytes, message=message)
+            except Exception:
+                # A client that went away must not fail the command it started.
+                pass
@@ -2,12 +2,13 @@ from mcp.server.fastmcp import FastMCP
 from pydantic import Field
 
 from errors import to_tool_error
-from shared.validators import parse_returned_attributes
+from orchestration.scheduler import TaskPriority
+from shared.validators import parse_returned_attributes, validate_dump_format
 
 
 def register_ui_tools(mcp: FastMCP, ctx, hierarchy_service, selector_service):
     @mcp.tool(structured_output=True)
-    def get_ui_dump(
+    async def get_ui_dump(
         serial: str | None = Field(default=None, description="Target device serial"),
         returned_attributes: str = Field(
             description=(
@@ -15,27 +16,75 @@ def register_ui_tools(mcp: FastMCP, ctx, hierarchy_service, selector_service):
                 "Example: text,resource-id,bounds,class"
             )
         ),
+        compressed: bool = Field(
+            default=False,
+            description="Ask uiautomator for a compressed dump without layout-only container nodes",
+        ),
+        force_refresh: bool = Field(
+            default=False,
+            description="Always dump the device instead of reusing a snapshot taken since the last input action",
+        ),
+        output_format: str = Field(
+            default="xml",
+            description=(
+                "xml, or compact: a JSON table of visible, meaningful nodes with stable ids and parent ids, "
+                "string cells indexing into a shared string table"
+            ),
+        ),
+        max_bytes: int = Field(default=65536, description="compact only: cap on the response size in bytes"),
+        since_token: str | None = Field(
+            default=None,
+            description=(
+                "Snapshot token from a previous dump; returns only nodes added, removed or modified since then "
+                "(pruned like the compact format when output_format is compact)"
+            ),
+        ),
+        include_token: bool = Field(
+            default=False,
+            description="xml only: add the snapshot token as a snapshot-token attribute of the root element",
+        ),
     ) -> str:
         """Get filtered XML hierarchy from the current device screen."""
         try:
             attributes_to_keep = parse_returned_attributes(returned_attributes)
+            normalized_format = validate_dump_format(output_format)
 
             def operation(session):
-                return hierarchy_service.get_filtered_dump(session.u2_device, attributes_to_keep)
+                return hierarchy_service.render_dump(
+                    session.u2_device,
+                    attributes_to_keep,
+                    output_format=normalized_format,
+                    compressed=compressed,
+                    ui_state=session.ui_state,
+                    force_refresh=force_refresh,
+                    max_bytes=max_bytes,
+                    since_token=since_token,
+                    include_token=include_token,
+                )
 
-            return ctx.run_for_device(serial, operation, requires_ui_lock=True)
+            return await ctx.run_for_device_async(serial, operation, requires_ui_lock=True)
         except Exception as error:
             raise to_tool_error(error) from error
 
     @mcp.tool(structured_output=True)
-    def click_ui_element(
+    async def click_ui_element(
         serial: str | None = Field(default=None, description="Target device serial"),
         text: str | None = Field(default=None, description="Element text selector"),
         resource_id: str | None = Field(default=None, description="Element resource-id selector"),
         content_desc: str | None = Field(default=None, description="Element content-desc selector"),
+        class_name: str | None = Field(default=None, description="Element class selector, e.g. android.widget.Button"),
+        xpath: str | None = Field(
+            default=None,
+            description="XPath subset, e.g. //Button[@clickable='true' and contains(@text,'Sign')][1]",
+        ),
+        index: int | None = Field(default=None, description="Pick the n-th (0-based) matching element"),
+        regex: bool = Field(
+            default=False,
+            description="Treat text, resource_id, content_desc and class_name as full-match regular expressions",
+        ),
         timeout_s: float = Field(default=10.0, description="Selector wait timeout in seconds"),
     ) -> str:
-        """Click a UI element selected by exactly one selector."""
+        """Click the center of a UI element matched by all given selectors."""
         try:
             def operation(session):
                 return selector_service.click(
@@ -43,9 +92,16 @@ def register_ui_tools(mcp: FastMCP, ctx, hierarchy_service, selector_service):
                     text=text,
                     resource_id=resource_id,
                     content_desc=content_desc,
+                    class_name=class_name,
+                    xpath=xpath,
+                    index=index,
+                    regex=regex,
                     timeout_s=timeout_s,
+                    ui_state=session.ui_state,
                 )
 
-            return ctx.run_for_device(serial, operation, requires_ui_lock=True)
+            return await ctx.run_for_device_async(
+                serial, operation, requires_ui_lock=True, priority=TaskPriority.LOW
+            )
         except Exception as error:
             raise to_tool_error(error) from error
@@ -1,18 +1,31 @@
 from mcp.server.fastmcp import FastMCP
 
 from adb.client import AdbClientProvider
+from adb.device_inventory import DeviceInventory
 from adb.device_manager import DeviceManager
+from adb.logcat_archive import LogcatArchive, LogcatArchiver
 from adb.logcat_service import LogcatService
 from adb.screen_service import ScreenService
+from adb.shell_service import ShellService
+from adb.wire_client import AdbConnectionPool
+from app.action_runner import ActionRunner
 from app.context import AppContext
+from app.instrumented_server import InstrumentedFastMCP, register_metrics_route
+from app.tool_handlers.action_tools import register_action_tools
 from app.tool_handlers.device_tools import register_device_tools
 from app.tool_handlers.input_tools import register_input_tools
 from app.tool_handlers.log_tools import register_log_tools
 from app.tool_handlers.screen_tools import register_screen_tools
 from app.tool_handlers.system_tools import register_system_tools
 from app.tool_handlers.ui_tools import register_ui_tools
+from orchestration.circuit_breaker import DeviceCircuitBreaker
 from orchestration.executor import DeviceExecutor
+from orchestration.fanout import FanOutRunner
+from orchestration.health_monitor import SessionHealthMonitor
 from orchestration.session_manager import DeviceSessionManager
+from orchestration.session_reaper import SessionReaper
+from orchestration.session_warmer import SessionWarmer
+from shared.metrics import LatencyMetrics
 from ui.hierarchy_service import HierarchyService
 from ui.interaction_service import InteractionService
 from ui.selector_service import SelectorService
@@ -23,16 +36,64 @@ def create_mcp_server(
     default_serial: str | None,
     max_workers: int,
     port: int,
+    max_inflight_per_device: int = 2,
     session_ttl_s: float = 900.0,
+    session_reap_interval_s: float = 30.0,
+    max_sessions: int = 0,
     healthcheck_interval_s: float = 5.0,
+    healthcheck_enabled: bool = True,
+    healthcheck_concurrency: int = 4,
     connect_retries: int = 2,
     connect_backoff_s: float = 0.25,
+    circuit_failure_threshold: int = 3,
+    circuit_reset_timeout_s: float = 15.0,
+    circuit_max_reset_timeout_s: float = 120.0,
+    device_info_ttl_s: float = 30.0,
+    track_devices: bool = True,
+    screenshot_mode: str = "raw",
+    screenshot_cache_mb: float = 8.0,
+    frame_grabber_interval_s: float = 0.0,
+    frame_grabber_ring_size: int = 3,
+    frame_grabber_idle_timeout_s: float = 30.0,
+    logcat_streaming: bool = True,
+    logcat_buffer_lines: int = 20000,
+    logcat_archive_dir: str | None = None,
+    logcat_archive_segment_mb: float = 16.0,
+    logcat_archive_retention_mb: float = 1024.0,
+    logcat_archive_retention_hours: float = 72.0,
+    hierarchy_snapshot_max_age_s: float = 2.0,
+    precreate_sessions_on_attach: bool = False,
+    warm_sessions_on_startup: bool = False,
+    warm_serials: tuple[str, ...] = (),
+    warm_concurrency: int = 4,
+    fanout_max_concurrency: int = 8,
+    fanout_device_timeout_s: float = 120.0,
+    shell_channels_per_device: int = 2,
+    shell_channel_idle_timeout_s: float = 300.0,
+    adb_server_host: str = "127.0.0.1",
+    adb_server_port: int = 5037,
+    adb_connection_pool: bool = True,
+    adb_pool_idle_per_device: int = 2,
+    adb_pool_max_connections: int = 64,
+    metrics_path: str | None = "/metrics",
 ) -> FastMCP:
-    mcp = FastMCP(name="MCP Android Server", port=port)
+    metrics = LatencyMetrics()
+    mcp = InstrumentedFastMCP(name="MCP Android Server", port=port, metrics=metrics)
+    if metrics_path:
+        register_metrics_route(mcp, metrics, metrics_path)
 
-    adb_provider = AdbClientProvider()
-    device_manager = DeviceManager(adb_provider)
-    u2_provider = U2ClientProvider()
+    adb_pool = None
+    if adb_connection_pool:
+        adb_pool = AdbConnectionPool(
+            adb_server_host,
+            adb_server_port,
+            max_idle_per_serial=adb_pool_idle_per_device,
+            max_connections=adb_pool_max_connections,
+        )
+    adb_provider = AdbClientProvider(pool=adb_pool, host=adb_server_host, port=adb_server_port)
+    inventory = DeviceInventory(adb_provider) if track_devices else None
+    device_manager = DeviceManager(adb_provider, info_ttl_s=device_info_ttl_s, inventory=inventory)
+    u2_provider = U2ClientProvider(adb_provider)
 
     session_manager = DeviceSessionManager(
         device_manager,
@@ -40,17 +101,83 @@ def create_mcp_server(
         default_serial=default_serial,
         session_ttl_s=session_ttl_s,
         healthcheck_interval_s=healthcheck_interval_s,
+        healthcheck_enabled=healthcheck_enabled,
         connect_retries=connect_retries,
         connect_backoff_s=connect_backoff_s,
+        screenshot_cache_bytes=int(screenshot_cache_mb * 1024 * 1024),
+        max_sessions=max_sessions,
     )
-    executor = DeviceExecutor(max_workers=max_workers)
-    ctx = AppContext(session_manager=session_manager, executor=executor)
-
-    register_device_tools(mcp, ctx, device_manager)
-    register_log_tools(mcp, ctx, LogcatService())
-    register_screen_tools(mcp, ctx, ScreenService())
-    register_ui_tools(mcp, ctx, HierarchyService(), SelectorService())
-    register_input_tools(mcp, ctx, InteractionService())
-    register_system_tools(mcp, ctx, InteractionService())
+    session_reaper = SessionReaper(session_manager, interval_s=session_reap_interval_s)
+    session_warmer = SessionWarmer(
+        session_manager,
+        device_manager,
+        serials=list(warm_serials),
+        max_concurrency=warm_concurrency,
+        on_attach=precreate_sessions_on_attach,
+    )
+    circuit_breaker = DeviceCircuitBreaker(
+        failure_threshold=circuit_failure_threshold,
+        reset_timeout_s=circuit_reset_timeout_s,
+        max_reset_timeout_s=circuit_max_reset_timeout_s,
+    )
+    health_monitor = SessionHealthMonitor(
+        session_manager, max_concurrency=healthcheck_concurrency, circuit_breaker=circuit_breaker
+    )
+    executor = DeviceExecutor(max_workers=max_workers, per_device_limit=max_inflight_per_device)
+    ctx = AppContext(session_manager=session_manager, executor=executor, circuit_breaker=circuit_breaker)
+    fanout_runner = FanOutRunner(
+        ctx, device_manager, max_concurrency=fanout_max_concurrency, device_timeout_s=fanout_device_timeout_s
+    )
+
+    archiver = None
+    if logcat_archive_dir:
+        archive = LogcatArchive(
+            logcat_archive_dir,
+            segment_max_bytes=int(logcat_archive_segment_mb * 1024 * 1024),
+            retention_bytes=int(logcat_archive_retention_mb * 1024 * 1024),
+            retention_age_s=logcat_archive_retention_hours * 3600,
+        )
+        archiver = LogcatArchiver(archive, device_manager, buffer_lines=logcat_buffer_lines)
+
+    if inventory is not None:
+        inventory.add_listener(adb_provider.handle_device_event)
+        inventory.add_listener(device_manager.handle_device_event)
+        inventory.add_listener(session_manager.handle_device_event)
+        inventory.add_listener(circuit_breaker.handle_device_event)
+        inventory.add_listener(session_warmer.handle_device_event)
+        if archiver is not None:
+            inventory.add_listener(archiver.handle_device_event)
+        inventory.start()
+    if archiver is not None:
+        archiver.start()
+    if healthcheck_enabled:
+        health_monitor.start()
+    session_reaper.start()
+    if warm_sessions_on_startup:
+        session_warmer.start()
+
+    screen_service = ScreenService(
+        capture_mode=screenshot_mode,
+        frame_grabber_interval_s=frame_grabber_interval_s,
+        frame_grabber_ring_size=frame_grabber_ring_size,
+        frame_grabber_idle_timeout_s=frame_grabber_idle_timeout_s,
+    )
+
+    logcat_service = LogcatService(streaming=logcat_streaming, buffer_lines=logcat_buffer_lines, archiver=archiver)
+    hierarchy_service = HierarchyService(snapshot_max_age_s=hierarchy_snapshot_max_age_s)
+    selector_service = SelectorService(hierarchy_service)
+    interaction_service = InteractionService()
+    shell_service = ShellService(
+        max_channels=shell_channels_per_device, idle_timeout_s=shell_channel_idle_timeout_s
+    )
+    action_runner = ActionRunner(interaction_service, selector_service, hierarchy_service, screen_service)
+
+    register_device_tools(mcp, ctx, device_manager, fanout_runner, adb_provider, session_warmer, metrics)
+    register_log_tools(mcp, ctx, logcat_service)
+    register_screen_tools(mcp, ctx, screen_service)
+    register_ui_tools(mcp, ctx, hierarchy_service, selector_service)
+    register_input_tools(mcp, ctx, interaction_service)
+    register_system_tools(mcp, ctx, interaction_service, shell_service)
+    register_action_tools(mcp, ctx, action_runner, fanout_runner)
 
     return mcp
@@ -3,16 +3,59 @@ import os
 from dataclasses import dataclass
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass(frozen=True)
 class Settings:
     mode: str
     port: int
     default_serial: str | None
     max_workers: int
+    max_inflight_per_device: int
     session_ttl_s: float
+    session_reap_interval_s: float
+    max_sessions: int
     healthcheck_interval_s: float
+    disable_healthcheck: bool
+    healthcheck_concurrency: int
     connect_retries: int
     connect_backoff_s: float
+    circuit_failure_threshold: int
+    circuit_reset_timeout_s: float
+    circuit_max_reset_timeout_s: float
+    device_info_ttl_s: float
+    track_devices: bool
+    screenshot_mode: str
+    screenshot_cache_mb: float
+    frame_grabber_interval_s: float
+    frame_grabber_ring_size: int
+    frame_grabber_idle_timeout_s: float
+    logcat_streaming: bool
+    logcat_buffer_lines: int
+    logcat_archive_dir: str | None
+    hierarchy_snapshot_max_age_s: float
+    logcat_archive_segment_mb: float
+    logcat_archive_retention_mb: float
+    logcat_archive_retention_hours: float
+    precreate_sessions_on_attach: bool
+    warm_sessions_on_startup: bool
+    warm_serials: tuple[str, ...]
+    warm_concurrency: int
+    fanout_max_concurrency: int
+    fanout_device_timeout_s: float
+    shell_channels_per_device: int
+    shell_channel_idle_timeout_s: float
+    adb_server_host: str
+    adb_server_port: int
+    adb_connection_pool: bool
+    adb_pool_idle_per_device: int
+    adb_pool_max_connections: int
+    metrics_path: str | None
 
 
 def parse_args() -> Settings:
@@ -44,6 +87,13 @@ def parse_args() -> Settings:
         default=int(os.getenv("MCP_MAX_WORKERS", "8")),
         help="Worker threads for parallel tool execution",
     )
+    parser.add_argument(
+        "--max-inflight-per-device",
+        dest="max_inflight_per_device",
+        type=int,
+        default=int(os.getenv("MCP_MAX_INFLIGHT_PER_DEVICE", "2")),
+        help="Maximum worker threads a single device may occupy at once",
+    )
     parser.add_argument(
         "--session-ttl-s",
         dest="session_ttl_s",
@@ -51,12 +101,40 @@ def parse_args() -> Settings:
         default=float(os.getenv("MCP_SESSION_TTL_S", "900")),
         help="Evict cached sessions after this inactivity TTL in seconds (<=0 disables TTL eviction)",
     )
+    parser.add_argument(
+        "--session-reap-interval-s",
+        dest="session_reap_interval_s",
+        type=float,
+        default=float(os.getenv("MCP_SESSION_REAP_INTERVAL_S", "30")),
+        help="Close sessions past their TTL in the background every N seconds (<=0 disables the reaper)",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        dest="max_sessions",
+        type=int,
+        default=int(os.getenv("MCP_MAX_SESSIONS", "0")),
+        help="Maximum cached device sessions; the least recently used idle session is evicted (0 = unlimited)",
+    )
     parser.add_argument(
         "--healthcheck-interval-s",
         dest="healthcheck_interval_s",
         type=float,
         default=float(os.getenv("MCP_HEALTHCHECK_INTERVAL_S", "5")),
-        help="Minimum interval in seconds between cached session health checks (<=0 checks every time)",
+        help="Interval in seconds between background health checks of cached sessions (0 = check on every call)",
+    )
+    parser.add_argument(
+        "--disable-healthcheck",
+        dest="disable_healthcheck",
+        action="store_true",
+        default=_env_flag("MCP_DISABLE_HEALTHCHECK", False),
+        help="Turn off background session health checks (and circuit breaker probes)",
+    )
+    parser.add_argument(
+        "--healthcheck-concurrency",
+        dest="healthcheck_concurrency",
+        type=int,
+        default=int(os.getenv("MCP_HEALTHCHECK_CONCURRENCY", "4")),
+        help="Maximum number of concurrent background session health probes",
     )
     parser.add_argument(
         "--connect-retries",
@@ -72,24 +150,303 @@ def parse_args() -> Settings:
         default=float(os.getenv("MCP_CONNECT_BACKOFF_S", "0.25")),
         help="Base backoff in seconds between session creation retries",
     )
+    parser.add_argument(
+        "--circuit-failure-threshold",
+        dest="circuit_failure_threshold",
+        type=int,
+        default=int(os.getenv("MCP_CIRCUIT_FAILURE_THRESHOLD", "3")),
+        help="Consecutive device failures that open a device's circuit breaker (0 disables the breaker)",
+    )
+    parser.add_argument(
+        "--circuit-reset-timeout-s",
+        dest="circuit_reset_timeout_s",
+        type=float,
+        default=float(os.getenv("MCP_CIRCUIT_RESET_TIMEOUT_S", "15")),
+        help="Seconds an open circuit fails calls fast before the device is probed again",
+    )
+    parser.add_argument(
+        "--circuit-max-reset-timeout-s",
+        dest="circuit_max_reset_timeout_s",
+        type=float,
+        default=float(os.getenv("MCP_CIRCUIT_MAX_RESET_TIMEOUT_S", "120")),
+        help="Upper bound for the reset timeout, which doubles after every failed probe",
+    )
+    parser.add_argument(
+        "--device-info-ttl-s",
+        dest="device_info_ttl_s",
+        type=float,
+        default=float(os.getenv("MCP_DEVICE_INFO_TTL_S", "30")),
+        help="Cache device metadata for this many seconds (<=0 disables caching)",
+    )
+    parser.add_argument(
+        "--track-devices",
+        dest="track_devices",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("MCP_TRACK_DEVICES", True),
+        help="Keep an in-memory device inventory current with adb track-devices",
+    )
+    parser.add_argument(
+        "--precreate-sessions-on-attach",
+        dest="precreate_sessions_on_attach",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("MCP_PRECREATE_SESSIONS_ON_ATTACH", False),
+        help="Create a device session in the background as soon as a device attaches",
+    )
+    parser.add_argument(
+        "--warm-sessions-on-startup",
+        dest="warm_sessions_on_startup",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("MCP_WARM_SESSIONS_ON_STARTUP", False),
+        help="Connect attached devices (or --warm-serials) in parallel in the background at startup",
+    )
+    parser.add_argument(
+        "--warm-serials",
+        dest="warm_serials",
+        default=os.getenv("MCP_WARM_SERIALS", ""),
+        help="Comma-separated serials to warm instead of every attached device",
+    )
+    parser.add_argument(
+        "--warm-concurrency",
+        dest="warm_concurrency",
+        type=int,
+        default=int(os.getenv("MCP_WARM_CONCURRENCY", "4")),
+        help="Maximum number of devices connected at once while warming sessions",
+    )
+    parser.add_argument(
+        "--screenshot-mode",
+        dest="screenshot_mode",
+        choices=["raw", "png"],
+        default=os.getenv("MCP_SCREENSHOT_MODE", "raw"),
+        help="Capture raw framebuffers and encode on the host (raw) or use device-encoded PNGs (png)",
+    )
+    parser.add_argument(
+        "--screenshot-cache-mb",
+        dest="screenshot_cache_mb",
+        type=float,
+        default=float(os.getenv("MCP_SCREENSHOT_CACHE_MB", "8")),
+        help="Per-session budget in MiB for encoded screenshots of unchanged frames (<=0 disables the cache)",
+    )
+    parser.add_argument(
+        "--frame-grabber-interval-s",
+        dest="frame_grabber_interval_s",
+        type=float,
+        default=float(os.getenv("MCP_FRAME_GRABBER_INTERVAL_S", "0")),
+        help="Capture frames in the background every N seconds per active session (<=0 disables the grabber)",
+    )
+    parser.add_argument(
+        "--frame-grabber-ring-size",
+        dest="frame_grabber_ring_size",
+        type=int,
+        default=int(os.getenv("MCP_FRAME_GRABBER_RING_SIZE", "3")),
+        help="Number of most recent background frames kept per session",
+    )
+    parser.add_argument(
+        "--frame-grabber-idle-timeout-s",
+        dest="frame_grabber_idle_timeout_s",
+        type=float,
+        default=float(os.getenv("MCP_FRAME_GRABBER_IDLE_TIMEOUT_S", "30")),
+        help="Stop background capture after this many seconds without screenshot requests",
+    )
+    parser.add_argument(
+        "--logcat-streaming",
+        dest="logcat_streaming",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("MCP_LOGCAT_STREAMING", True),
+        help="Follow logcat per device in the background and answer log queries from memory",
+    )
+    parser.add_argument(
+        "--logcat-buffer-lines",
+        dest="logcat_buffer_lines",
+        type=int,
+        default=int(os.getenv("MCP_LOGCAT_BUFFER_LINES", "20000")),
+        help="Number of parsed logcat records kept in memory per device",
+    )
+    parser.add_argument(
+        "--hierarchy-snapshot-max-age-s",
+        dest="hierarchy_snapshot_max_age_s",
+        type=float,
+        default=float(os.getenv("MCP_HIERARCHY_SNAPSHOT_MAX_AGE_S", "2")),
+        help="Reuse a UI hierarchy dump for this many seconds unless an input action ran (<=0 disables reuse)",
+    )
+    parser.add_argument(
+        "--logcat-archive-dir",
+        dest="logcat_archive_dir",
+        default=os.getenv("MCP_LOGCAT_ARCHIVE_DIR"),
+        help="Archive logcat of every attached device to compressed segments in this directory (unset disables)",
+    )
+    parser.add_argument(
+        "--logcat-archive-segment-mb",
+        dest="logcat_archive_segment_mb",
+        type=float,
+        default=float(os.getenv("MCP_LOGCAT_ARCHIVE_SEGMENT_MB", "16")),
+        help="Start a new archive segment once the current one reaches this many MiB",
+    )
+    parser.add_argument(
+        "--logcat-archive-retention-mb",
+        dest="logcat_archive_retention_mb",
+        type=float,
+        default=float(os.getenv("MCP_LOGCAT_ARCHIVE_RETENTION_MB", "1024")),
+        help="Delete the oldest archive segments of a device beyond this many MiB (<=0 disables)",
+    )
+    parser.add_argument(
+        "--logcat-archive-retention-hours",
+        dest="logcat_archive_retention_hours",
+        type=float,
+        default=float(os.getenv("MCP_LOGCAT_ARCHIVE_RETENTION_HOURS", "72")),
+        help="Delete archive segments last written more than this many hours ago (<=0 disables)",
+    )
+    parser.add_argument(
+        "--fanout-max-concurrency",
+        dest="fanout_max_concurrency",
+        type=int,
+        default=int(os.getenv("MCP_FANOUT_MAX_CONCURRENCY", "8")),
+        help="Maximum device calls in flight across all multi-device tool calls",
+    )
+    parser.add_argument(
+        "--fanout-device-timeout-s",
+        dest="fanout_device_timeout_s",
+        type=float,
+        default=float(os.getenv("MCP_FANOUT_DEVICE_TIMEOUT_S", "120")),
+        help="Default per-device timeout in seconds for multi-device tool calls (<=0 disables it)",
+    )
+    parser.add_argument(
+        "--shell-channels-per-device",
+        dest="shell_channels_per_device",
+        type=int,
+        default=int(os.getenv("MCP_SHELL_CHANNELS_PER_DEVICE", "2")),
+        help="Maximum persistent shell channels kept open per device session",
+    )
+    parser.add_argument(
+        "--shell-channel-idle-timeout-s",
+        dest="shell_channel_idle_timeout_s",
+        type=float,
+        default=float(os.getenv("MCP_SHELL_CHANNEL_IDLE_TIMEOUT_S", "300")),
+        help="Reopen a persistent shell channel that has been idle for longer than this many seconds",
+    )
+    parser.add_argument(
+        "--adb-server-host",
+        dest="adb_server_host",
+        default=os.getenv("ANDROID_ADB_SERVER_HOST", "127.0.0.1"),
+        help="Host of the adb server used by every adb and uiautomator2 client",
+    )
+    parser.add_argument(
+        "--adb-server-port",
+        dest="adb_server_port",
+        type=int,
+        default=int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037")),
+        help="Port of the adb server used by every adb and uiautomator2 client",
+    )
+    parser.add_argument(
+        "--adb-connection-pool",
+        dest="adb_connection_pool",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("MCP_ADB_CONNECTION_POOL", True),
+        help="Talk to the adb server over pooled, pre-handshaked connections instead of adbutils",
+    )
+    parser.add_argument(
+        "--adb-pool-idle-per-device",
+        dest="adb_pool_idle_per_device",
+        type=int,
+        default=int(os.getenv("MCP_ADB_POOL_IDLE_PER_DEVICE", "2")),
+        help="Pre-handshaked adb transport connections kept ready per recently used device (0 disables)",
+    )
+    parser.add_argument(
+        "--adb-pool-max-connections",
+        dest="adb_pool_max_connections",
+        type=int,
+        default=int(os.getenv("MCP_ADB_POOL_MAX_CONNECTIONS", "64")),
+        help="Maximum adb server connections (idle and in use) opened through the pool",
+    )
+    parser.add_argument(
+        "--metrics-path",
+        dest="metrics_path",
+        default=os.getenv("MCP_METRICS_PATH", "/metrics"),
+        help="HTTP path serving Prometheus latency metrics in streamable-http/sse mode (empty disables it)",
+    )
     args = parser.parse_args()
 
     if args.port <= 0:
         raise ValueError("Port must be > 0")
     if args.max_workers <= 0:
         raise ValueError("max-workers must be > 0")
+    if args.max_inflight_per_device <= 0:
+        raise ValueError("max-inflight-per-device must be > 0")
+    if args.healthcheck_interval_s < 0:
+        raise ValueError("healthcheck-interval-s must be >= 0 (use --disable-healthcheck to turn checks off)")
+    if args.healthcheck_concurrency <= 0:
+        raise ValueError("healthcheck-concurrency must be > 0")
+    if args.frame_grabber_ring_size <= 0:
+        raise ValueError("frame-grabber-ring-size must be > 0")
+    if args.logcat_buffer_lines <= 0:
+        raise ValueError("logcat-buffer-lines must be > 0")
+    if args.logcat_archive_segment_mb <= 0:
+        raise ValueError("logcat-archive-segment-mb must be > 0")
+    if args.fanout_max_concurrency <= 0:
+        raise ValueError("fanout-max-concurrency must be > 0")
+    if args.shell_channels_per_device <= 0:
+        raise ValueError("shell-channels-per-device must be > 0")
+    if args.adb_server_port <= 0:
+        raise ValueError("adb-server-port must be > 0")
+    if args.adb_pool_idle_per_device < 0:
+        raise ValueError("adb-pool-idle-per-device must be >= 0")
+    if args.adb_pool_max_connections <= 0:
+        raise ValueError("adb-pool-max-connections must be > 0")
+    if args.warm_concurrency <= 0:
+        raise ValueError("warm-concurrency must be > 0")
+    if args.max_sessions < 0:
+        raise ValueError("max-sessions must be >= 0")
     if args.connect_retries < 0:
         raise ValueError("connect-retries must be >= 0")
     if args.connect_backoff_s < 0:
         raise ValueError("connect-backoff-s must be >= 0")
+    if args.circuit_failure_threshold < 0:
+        raise ValueError("circuit-failure-threshold must be >= 0")
+    if args.circuit_reset_timeout_s < 0:
+        raise ValueError("circuit-reset-timeout-s must be >= 0")
 
     return Settings(
         mode=args.mode,
         port=args.port,
         default_serial=args.default_serial,
         max_workers=args.max_workers,
+        max_inflight_per_device=args.max_inflight_per_device,
         session_ttl_s=args.session_ttl_s,
+        session_reap_interval_s=args.session_reap_interval_s,
+        max_sessions=args.max_sessions,
         healthcheck_interval_s=args.healthcheck_interval_s,
+        disable_healthcheck=args.disable_healthcheck,
+        healthcheck_concurrency=args.healthcheck_concurrency,
         connect_retries=args.connect_retries,
         connect_backoff_s=args.connect_backoff_s,
+        circuit_failure_threshold=args.circuit_failure_threshold,
+        circuit_reset_timeout_s=args.circuit_reset_timeout_s,
+        circuit_max_reset_timeout_s=args.circuit_max_reset_timeout_s,
+        device_info_ttl_s=args.device_info_ttl_s,
+        track_devices=args.track_devices,
+        screenshot_mode=args.screenshot_mode,
+        screenshot_cache_mb=args.screenshot_cache_mb,
+        frame_grabber_interval_s=args.frame_grabber_interval_s,
+        frame_grabber_ring_size=args.frame_grabber_ring_size,
+        frame_grabber_idle_timeout_s=args.frame_grabber_idle_timeout_s,
+        logcat_streaming=args.logcat_streaming,
+        logcat_buffer_lines=args.logcat_buffer_lines,
+        logcat_archive_dir=args.logcat_archive_dir,
+        hierarchy_snapshot_max_age_s=args.hierarchy_snapshot_max_age_s,
+        logcat_archive_segment_mb=args.logcat_archive_segment_mb,
+        logcat_archive_retention_mb=args.logcat_archive_retention_mb,
+        logcat_archive_retention_hours=args.logcat_archive_retention_hours,
+        precreate_sessions_on_attach=args.precreate_sessions_on_attach,
+        warm_sessions_on_startup=args.warm_sessions_on_startup,
+        warm_serials=tuple(serial.strip() for serial in args.warm_serials.split(",") if serial.strip()),
+        warm_concurrency=args.warm_concurrency,
+        fanout_max_concurrency=args.fanout_max_concurrency,
+        fanout_device_timeout_s=args.fanout_device_timeout_s,
+        shell_channels_per_device=args.shell_channels_per_device,
+        shell_channel_idle_timeout_s=args.shell_channel_idle_timeout_s,
+        adb_server_host=args.adb_server_host,
+        adb_server_port=args.adb_server_port,
+        adb_connection_pool=args.adb_connection_pool,
+        adb_pool_idle_per_device=args.adb_pool_idle_per_device,
+        adb_pool_max_connections=args.adb_pool_max_connections,
+        metrics_path=args.metrics_path or None,
     )
@@ -1,3 +1,7 @@
+import importlib
+from enum import Enum
+from functools import lru_cache
+
 try:
     from mcp.server.fastmcp.exceptions import ToolError
 except Exception:  # pragma: no cover - Fallback for local unit-test environments.
@@ -13,6 +17,10 @@ class DeviceResolutionError(McpAndroidError):
     """Raised when a target device cannot be resolved."""
 
 
+class DeviceUnavailableError(DeviceResolutionError):
+    """Raised without contacting the device while its circuit breaker is open."""
+
+
 class ValidationError(McpAndroidError):
     """Raised when tool parameters are invalid."""
 
@@ -21,6 +29,96 @@ class UiElementNotFoundError(McpAndroidError):
     """Raised when a UI selector does not match any element."""
 
 
+class ErrorKind(str, Enum):
+    """Failure classes that decide whether a call is retried and whether it counts against the device."""
+
+    CALLER = "caller"
+    DEVICE_UNAVAILABLE = "device_unavailable"
+    CONNECTION = "connection"
+    TIMEOUT = "timeout"
+    UNKNOWN = "unknown"
+
+    @property
+    def retryable(self) -> bool:
+        """Only a broken connection is worth one retry on a fresh session."""
+        return self is ErrorKind.CONNECTION
+
+    @property
+    def device_fault(self) -> bool:
+        return self in {ErrorKind.DEVICE_UNAVAILABLE, ErrorKind.CONNECTION, ErrorKind.TIMEOUT}
+
+
+# Most severe first: a batch that hit several failures reports the first kind found here.
+_SEVERITY = (
+    ErrorKind.DEVICE_UNAVAILABLE,
+    ErrorKind.CONNECTION,
+    ErrorKind.TIMEOUT,
+    ErrorKind.UNKNOWN,
+    ErrorKind.CALLER,
+)
+
+# Failure reasons the adb server reports for a device that is not usable right now.
+_ADB_DEVICE_STATES = ("not found", "offline", "unauthorized", "no devices")
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """Map an exception raised by a device operation onto an ``ErrorKind``."""
+    library = _library_errors()
+    if isinstance(error, (ValidationError, UiElementNotFoundError, ToolError) + library["caller"]):
+        return ErrorKind.CALLER
+    if isinstance(error, DeviceResolutionError):
+        return ErrorKind.DEVICE_UNAVAILABLE
+    if isinstance(error, (TimeoutError,) + library["timeout"]):
+        return ErrorKind.TIMEOUT
+    if isinstance(error, library["adb"]):
+        text = str(error).lower()
+        if any(state in text for state in _ADB_DEVICE_STATES):
+            return ErrorKind.DEVICE_UNAVAILABLE
+        return ErrorKind.CONNECTION
+    if isinstance(error, (OSError,) + library["connection"]):
+        return ErrorKind.CONNECTION
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return ErrorKind.CALLER
+    return ErrorKind.UNKNOWN
+
+
+def worst_error_kind(kinds) -> ErrorKind | None:
+    """Return the most severe of ``kinds`` (``None`` when empty)."""
+    found = {ErrorKind(kind) for kind in kinds if kind is not None}
+    return next((kind for kind in _SEVERITY if kind in found), None)
+
+
+@lru_cache(maxsize=1)
+def _library_errors() -> dict[str, tuple[type[BaseException], ...]]:
+    """Collect exception types of the device libraries that are installed, resolved on first use."""
+    return {
+        "caller": _optional_exceptions("uiautomator2.exceptions", "UiObjectNotFoundError", "XPathElementNotFoundError"),
+        "timeout": _optional_exceptions("adbutils.errors", "AdbTimeout")
+        + _optional_exceptions("requests.exceptions", "Timeout"),
+        "adb": _optional_exceptions("adbutils.errors", "AdbError")
+        + _optional_exceptions("adb.wire_client", "AdbWireError"),
+        "connection": _optional_exceptions("adb.shell_channel", "ShellChannelError")
+        + _optional_exceptions(
+            "uiautomator2.exceptions",
+            "ConnectError",
+            "GatewayError",
+            "HTTPError",
+            "SessionBrokenError",
+            "UiAutomationNotConnectedError",
+            "LaunchUiAutomationError",
+        ),
+    }
+
+
+def _optional_exceptions(module_name: str, *names: str) -> tuple[type[BaseException], ...]:
+    try:
+        module = importlib.import_module(module_name)
+    except Exception:
+        return ()
+    found = (getattr(module, name, None) for name in names)
+    return tuple(item for item in found if isinstance(item, type) and issubclass(item, BaseException))
+
+
 def to_tool_error(error: Exception) -> ToolError:
     if isinstance(error, ToolError):
         return error
@@ -7,11 +7,47 @@ def run() -> None:
     mcp = create_mcp_server(
         default_serial=settings.default_serial,
         max_workers=settings.max_workers,
+        max_inflight_per_device=settings.max_inflight_per_device,
         port=settings.port,
         session_ttl_s=settings.session_ttl_s,
+        session_reap_interval_s=settings.session_reap_interval_s,
+        max_sessions=settings.max_sessions,
         healthcheck_interval_s=settings.healthcheck_interval_s,
+        healthcheck_enabled=not settings.disable_healthcheck,
+        healthcheck_concurrency=settings.healthcheck_concurrency,
         connect_retries=settings.connect_retries,
         connect_backoff_s=settings.connect_backoff_s,
+        circuit_failure_threshold=settings.circuit_failure_threshold,
+        circuit_reset_timeout_s=settings.circuit_reset_timeout_s,
+        circuit_max_reset_timeout_s=settings.circuit_max_reset_timeout_s,
+        device_info_ttl_s=settings.device_info_ttl_s,
+        track_devices=settings.track_devices,
+        screenshot_mode=settings.screenshot_mode,
+        screenshot_cache_mb=settings.screenshot_cache_mb,
+        frame_grabber_interval_s=settings.frame_grabber_interval_s,
+        frame_grabber_ring_size=settings.frame_grabber_ring_size,
+        frame_grabber_idle_timeout_s=settings.frame_grabber_idle_timeout_s,
+        logcat_streaming=settings.logcat_streaming,
+        logcat_buffer_lines=settings.logcat_buffer_lines,
+        logcat_archive_dir=settings.logcat_archive_dir,
+        hierarchy_snapshot_max_age_s=settings.hierarchy_snapshot_max_age_s,
+        logcat_archive_segment_mb=settings.logcat_archive_segment_mb,
+        logcat_archive_retention_mb=settings.logcat_archive_retention_mb,
+        logcat_archive_retention_hours=settings.logcat_archive_retention_hours,
+        precreate_sessions_on_attach=settings.precreate_sessions_on_attach,
+        warm_sessions_on_startup=settings.warm_sessions_on_startup,
+        warm_serials=settings.warm_serials,
+        warm_concurrency=settings.warm_concurrency,
+        fanout_max_concurrency=settings.fanout_max_concurrency,
+        fanout_device_timeout_s=settings.fanout_device_timeout_s,
+        shell_channels_per_device=settings.shell_channels_per_device,
+        shell_channel_idle_timeout_s=settings.shell_channel_idle_timeout_s,
+        adb_server_host=settings.adb_server_host,
+        adb_server_port=settings.adb_server_port,
+        adb_connection_pool=settings.adb_connection_pool,
+        adb_pool_idle_per_device=settings.adb_pool_idle_per_device,
+        adb_pool_max_connections=settings.adb_pool_max_connections,
+        metrics_path=settings.metrics_path,
     )
 
     if settings.mode == "stdio":
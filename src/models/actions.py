@@ -0,0 +1,73 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class ActionStep(BaseModel):
+    action: Literal["tap", "swipe", "send_text", "system_action", "click", "wait", "screenshot", "dump"] = Field(
+        description="Step type; each type reads only its own fields below"
+    )
+    x: int | None = Field(default=None, description="tap: x coordinate")
+    y: int | None = Field(default=None, description="tap: y coordinate")
+    x1: int | None = Field(default=None, description="swipe: start x")
+    y1: int | None = Field(default=None, description="swipe: start y")
+    x2: int | None = Field(default=None, description="swipe: end x")
+    y2: int | None = Field(default=None, description="swipe: end y")
+    duration_ms: int | None = Field(default=None, description="swipe: duration in milliseconds (default 300)")
+    text_to_send: str | None = Field(default=None, description="send_text: text to type")
+    clear_existing: bool | None = Field(default=None, description="send_text: clear the field first")
+    system_action: str | None = Field(default=None, description="system_action: BACK, HOME, RECENT_APPS")
+    text: str | None = Field(default=None, description="click/wait: element text selector")
+    resource_id: str | None = Field(default=None, description="click/wait: element resource-id selector")
+    content_desc: str | None = Field(default=None, description="click/wait: element content-desc selector")
+    class_name: str | None = Field(default=None, description="click/wait: element class selector")
+    xpath: str | None = Field(default=None, description="click/wait: XPath selector")
+    index: int | None = Field(default=None, description="click/wait: n-th (0-based) matching element")
+    regex: bool | None = Field(default=None, description="click/wait: treat selector values as regular expressions")
+    timeout_s: float | None = Field(default=None, description="click/wait: selector timeout in seconds (default 10)")
+    seconds: float | None = Field(default=None, description="wait: sleep duration when no selector is given")
+    scale_factor: float | None = Field(default=None, description="screenshot: scale factor (default 0.4)")
+    returned_attributes: str | None = Field(default=None, description="dump: comma-separated attributes")
+    output_format: str | None = Field(default=None, description="dump: xml or compact")
+    compressed: bool | None = Field(default=None, description="dump: request uiautomator's compressed dump")
+    force_refresh: bool | None = Field(default=None, description="dump: bypass the session snapshot")
+    max_bytes: int | None = Field(default=None, description="dump: compact response size cap")
+    since_token: str | None = Field(default=None, description="dump: return a diff against this snapshot token")
+    include_token: bool | None = Field(default=None, description="dump: add the snapshot token to XML output")
+
+
+class ActionStepResult(BaseModel):
+    index: int = Field(description="Position of the step in the request")
+    action: str = Field(description="Step type")
+    status: Literal["ok", "error", "skipped"] = Field(description="Outcome of the step")
+    result: Any = Field(default=None, description="Step output; screenshots are base64-encoded PNG")
+    error: str | None = Field(default=None, description="Error message if the step failed")
+    error_kind: str | None = Field(
+        default=None, description="Failure class: caller, device_unavailable, connection, timeout or unknown"
+    )
+    duration_ms: float | None = Field(default=None, description="Time spent on the step")
+
+
+class ActionRunResult(BaseModel):
+    steps: list[ActionStepResult] = Field(description="Per-step outcomes in request order")
+    completed: int = Field(description="Number of steps that succeeded")
+    failed: int = Field(description="Number of steps that failed")
+    skipped: int = Field(description="Number of steps skipped after a failure")
+    error_kind: str | None = Field(default=None, description="Most severe failure class among failed steps")
+    total_ms: float = Field(description="Time spent running all steps, excluding queueing")
+
+
+class DeviceActionRunResult(BaseModel):
+    serial: str = Field(description="Device serial")
+    status: Literal["ok", "error", "timeout"] = Field(description="Outcome of the script on this device")
+    result: ActionRunResult | None = Field(default=None, description="Per-step outcomes if the script ran")
+    error: str | None = Field(default=None, description="Error message if the device call failed or timed out")
+    duration_ms: float = Field(description="Time spent on this device, including queueing")
+
+
+class FanOutActionRunResult(BaseModel):
+    results: list[DeviceActionRunResult] = Field(description="Per-device outcomes in target order")
+    succeeded: int = Field(description="Number of devices that ran the script")
+    failed: int = Field(description="Number of devices whose call failed")
+    timed_out: int = Field(description="Number of devices that exceeded the per-device timeout")
+    total_ms: float = Field(description="Wall time for the whole fan-out")
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class LogcatPage(BaseModel):
+    lines: list[str] = Field(description="Log lines written since the cursor, oldest first")
+    cursor: str = Field(description="Opaque cursor to pass to the next call to receive only newer lines")
+    has_more: bool = Field(description="More matching lines are available after this page")
+    reset: bool = Field(description="The cursor belonged to a previous log reader; lines restart from the buffer tail")
+    missed_records: bool = Field(description="Some records after the cursor were evicted before they were read")
+
+
+class LogcatSearchResult(BaseModel):
+    lines: list[str] = Field(description="Archived log lines matching the search, oldest first")
+    truncated: bool = Field(description="More lines matched than max_results; narrow the search to see them")
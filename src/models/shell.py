@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class ShellCommandResult(BaseModel):
+    command: str = Field(description="Command as sent")
+    exit_code: int | None = Field(description="Exit status; null if the command timed out")
+    stdout: str = Field(description="Standard output (merged with stderr on devices without shell protocol v2)")
+    stderr: str = Field(description="Standard error")
+    output_bytes: int = Field(description="Total bytes the command wrote, including any omitted from the response")
+    truncated: bool = Field(description="The middle of the output was omitted to stay within max_output_bytes")
+    timed_out: bool = Field(description="The command exceeded timeout_s; commands after it were not run")
+    duration_ms: float = Field(description="Time from the previous command finishing to this one finishing")
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+
+from errors import DeviceUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class _Circuit:
+    state: str = CLOSED
+    failures: int = 0
+    trips: int = 0
+    retry_at: float = 0.0
+    last_error: str | None = None
+    rejected: int = 0
+
+
+class DeviceCircuitBreaker:
+    """Per-device circuit breaker that fails calls fast while a device keeps failing.
+
+    ``failure_threshold`` consecutive device failures open a device's circuit. While open, calls
+    raise ``DeviceUnavailableError`` without touching the device. Once ``reset_timeout_s`` has
+    passed the circuit goes half-open and admits a single trial: a background probe claimed via
+    ``claim_probes`` or, when nothing probes, the next call. Success closes the circuit; failure
+    reopens it with the timeout doubled up to ``max_reset_timeout_s``.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_s: float = 15.0, max_reset_timeout_s: float = 120.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_s = max(0.0, reset_timeout_s)
+        self._max_reset_timeout_s = max(self._reset_timeout_s, max_reset_timeout_s)
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._failure_threshold > 0
+
+    def allow(self, serial: str, now: float | None = None) -> None:
+        """Raise ``DeviceUnavailableError`` unless a call on ``serial`` may proceed."""
+        if not self.enabled:
+            return
+        current = monotonic() if now is None else now
+        with self._lock:
+            circuit = self._circuits.get(serial)
+            if circuit is None or circuit.state == CLOSED:
+                return
+            if circuit.state == OPEN and current >= circuit.retry_at:
+                circuit.state = HALF_OPEN
+                return
+            circuit.rejected += 1
+            wait_s = max(0.0, circuit.retry_at - current)
+            raise DeviceUnavailableError(
+                f"Device {serial} is unavailable after {circuit.failures} consecutive failures "
+                f"(last error: {circuit.last_error}); next probe in {wait_s:.1f}s"
+            )
+
+    def record_success(self, serial: str) -> None:
+        with self._lock:
+            self._circuits.pop(serial, None)
+
+    def record_failure(self, serial: str, error: BaseException | str, now: float | None = None) -> None:
+        if not self.enabled:
+            return
+        current = monotonic() if now is None else now
+        with self._lock:
+            circuit = self._circuits.setdefault(serial, _Circuit())
+            circuit.failures += 1
+            circuit.last_error = str(error)
+            if circuit.state == HALF_OPEN or circuit.failures >= self._failure_threshold:
+                self._trip(circuit, current)
+
+    def release(self, serial: str) -> None:
+        """End a half-open trial that neither proved nor disproved the device (e.g. a bad request)."""
+        with self._lock:
+            circuit = self._circuits.get(serial)
+            if circuit is not None and circuit.state == HALF_OPEN:
+                circuit.state = OPEN
+
+    def claim_probes(self, now: float | None = None) -> list[str]:
+        """Move open circuits whose timeout elapsed to half-open and return their serials for probing."""
+        current = monotonic() if now is None else now
+        with self._lock:
+            due = [
+                serial
+                for serial, circuit in self._circuits.items()
+                if circuit.state == OPEN and current >= circuit.retry_at
+            ]
+            for serial in due:
+                self._circuits[serial].state = HALF_OPEN
+            return due
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        """A re-attached or detached device starts over with a closed circuit."""
+        with self._lock:
+            self._circuits.pop(serial, None)
+
+    def state(self, serial: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(serial)
+            return CLOSED if circuit is None else circuit.state
+
+    def stats(self, now: float | None = None) -> dict:
+        current = monotonic() if now is None else now
+        with self._lock:
+            devices = {
+                serial: {
+                    "state": circuit.state,
+                    "failures": circuit.failures,
+                    "trips": circuit.trips,
+                    "rejected": circuit.rejected,
+                    "retry_in_s": round(max(0.0, circuit.retry_at - current), 3) if circuit.state == OPEN else None,
+                    "last_error": circuit.last_error,
+                }
+                for serial, circuit in sorted(self._circuits.items())
+            }
+        return {
+            "failure_threshold": self._failure_threshold,
+            "reset_timeout_s": self._reset_timeout_s,
+            "devices": devices,
+        }
+
+    def _trip(self, circuit: _Circuit, now: float) -> None:
+        circuit.state = OPEN
+        timeout_s = min(self._reset_timeout_s * (2**circuit.trips), self._max_reset_timeout_s)
+        circuit.trips += 1
+        circuit.retry_at = now + timeout_s
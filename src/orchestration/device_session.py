@@ -1,7 +1,16 @@
 from dataclasses import dataclass, field
-from threading import RLock
+import logging
+from threading import Lock, RLock
 import time
 
+from shared.lru_cache import ByteLRUCache
+from ui.ui_state import UiStateTracker
+
+logger = logging.getLogger(__name__)
+
+# Attributes under which uiautomator2 releases keep the client's requests.Session.
+_U2_HTTP_SESSION_ATTRIBUTES = ("_reqsess", "http")
+
 
 @dataclass
 class DeviceSession:
@@ -13,16 +22,89 @@ class DeviceSession:
     last_used_at: float = field(default_factory=time.monotonic)
     last_health_check_at: float = 0.0
     consecutive_failures: int = 0
+    healthy: bool = True
+    screenshot_cache: ByteLRUCache | None = None
+    frame_grabber: object | None = None
+    logcat_reader: object | None = None
+    shell_pool: object | None = None
+    ui_state: UiStateTracker = field(default_factory=UiStateTracker)
+    in_flight: int = 0
+    _usage_lock: Lock = field(default_factory=Lock, repr=False)
+    _close_when_idle: bool = field(default=False, repr=False)
+    _closed: bool = field(default=False, repr=False)
 
     def touch(self, now: float | None = None) -> None:
         self.last_used_at = time.monotonic() if now is None else now
 
+    def begin_call(self) -> None:
+        """Mark a call as queued or running on this session so it is not reaped or evicted meanwhile."""
+        with self._usage_lock:
+            self.in_flight += 1
+
+    def end_call(self) -> None:
+        with self._usage_lock:
+            self.in_flight -= 1
+            close_now = self._close_when_idle and self.in_flight == 0
+        self.touch()
+        if close_now:
+            self.close()
+
+    def close_when_idle(self) -> bool:
+        """Close now if no call is in flight, otherwise when the last one ends; True if closed now."""
+        with self._usage_lock:
+            if self.in_flight > 0:
+                self._close_when_idle = True
+                return False
+        self.close()
+        return True
+
+    def close(self) -> None:
+        """Stop background workers and release caches owned by this session."""
+        with self._usage_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self.frame_grabber is not None:
+            self.frame_grabber.stop()
+        if self.logcat_reader is not None:
+            self.logcat_reader.stop()
+        if self.shell_pool is not None:
+            self.shell_pool.close()
+        if self.screenshot_cache is not None:
+            self.screenshot_cache.clear()
+        _close_u2_client(self.u2_device)
+
     def mark_health_ok(self, now: float | None = None) -> None:
         current = time.monotonic() if now is None else now
         self.last_health_check_at = current
         self.consecutive_failures = 0
+        self.healthy = True
 
     def mark_health_failure(self, now: float | None = None) -> None:
         current = time.monotonic() if now is None else now
         self.last_health_check_at = current
         self.consecutive_failures += 1
+        self.healthy = False
+
+
+def _close_u2_client(u2_device) -> None:
+    """Close the uiautomator2 client and its HTTP session instead of leaving their sockets to the GC.
+
+    The on-device uiautomator server is left running; a new session reconnects to it.
+    """
+    targets = [u2_device]
+    for name in _U2_HTTP_SESSION_ATTRIBUTES:
+        try:
+            http_session = getattr(u2_device, name, None)
+        except Exception:
+            continue
+        if http_session is not None and all(http_session is not target for target in targets):
+            targets.append(http_session)
+    for target in targets:
+        close = getattr(target, "close", None)
+        if not callable(close):
+            continue
+        try:
+            close()
+        except Exception as error:
+            logger.debug("Closing uiautomator2 client resource %r failed: %s", target, error)
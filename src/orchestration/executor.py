@@ -1,19 +1,112 @@
-from concurrent.futures import ThreadPoolExecutor
-from contextlib import nullcontext
+import asyncio
+import time
+from concurrent.futures import Future
+from contextvars import copy_context
+from functools import partial
+
+from orchestration.scheduler import FairScheduler, TaskPriority
+from shared.metrics import DEVICE_CALL, QUEUE_WAIT, UI_LOCK_WAIT, record_phase, timed_phase
 
 
 class DeviceExecutor:
-    """Runs operations in a thread pool and serializes UI operations per device."""
+    """Runs operations on a fair-queuing worker pool and serializes UI operations per device."""
+
+    def __init__(self, max_workers: int = 8, per_device_limit: int = 2):
+        self._scheduler = FairScheduler(max_workers=max_workers, per_device_limit=per_device_limit)
+
+    def submit(
+        self,
+        session,
+        func,
+        requires_ui_lock: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        leased: bool = False,
+    ) -> Future:
+        """Queue ``func(session)``; ``leased`` means the caller already counted the call in flight.
+
+        Either way the session's ``end_call`` runs once the call finishes.
+        """
+        serial = session.serial
+        submitted_at = time.perf_counter()
+
+        def task():
+            record_phase(QUEUE_WAIT, time.perf_counter() - submitted_at, serial)
+            if not requires_ui_lock:
+                with timed_phase(DEVICE_CALL, serial):
+                    return func(session)
+            lock_requested_at = time.perf_counter()
+            with session.ui_lock:
+                record_phase(UI_LOCK_WAIT, time.perf_counter() - lock_requested_at, serial)
+                with timed_phase(DEVICE_CALL, serial):
+                    return func(session)
 
-    def __init__(self, max_workers: int = 8):
-        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        # Tasks run in a copy of the caller's context so phase timings reach the tool call's metrics.
+        task = partial(copy_context().run, task)
 
-    def run(self, session, func, requires_ui_lock: bool = False):
-        lock_context = session.ui_lock if requires_ui_lock else nullcontext()
+        # Sessions count queued and running calls so the reaper never closes one mid-call.
+        begin_call = getattr(session, "begin_call", None)
+        if begin_call is None:
+            return self._scheduler.submit(session.serial, task, priority=priority, exclusive=requires_ui_lock)
+        if not leased:
+            begin_call()
+        try:
+            future = self._scheduler.submit(session.serial, task, priority=priority, exclusive=requires_ui_lock)
+        except BaseException:
+            session.end_call()
+            raise
+        future.add_done_callback(lambda _: session.end_call())
+        return future
+
+    def run(
+        self,
+        session,
+        func,
+        requires_ui_lock: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        leased: bool = False,
+    ):
+        return self.submit(session, func, requires_ui_lock=requires_ui_lock, priority=priority, leased=leased).result()
+
+    async def run_async(
+        self,
+        session,
+        func,
+        requires_ui_lock: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        leased: bool = False,
+    ):
+        """Await ``func(session)`` on the worker pool without blocking the event loop."""
+        future = self.submit(session, func, requires_ui_lock=requires_ui_lock, priority=priority, leased=leased)
+        return await asyncio.wrap_future(future)
+
+    async def call_async(
+        self,
+        func,
+        *args,
+        key: str | None = None,
+        priority: TaskPriority = TaskPriority.HIGH,
+        phase: str | None = DEVICE_CALL,
+    ):
+        """Await a blocking call that needs no session (discovery, session setup) on the worker pool.
+
+        ``key`` queues the call with a device's tasks so it counts towards that device's in-flight limit.
+        ``phase`` names the metrics phase the call's run time is recorded under (``None`` when
+        ``func`` records its own phases).
+        """
+        submitted_at = time.perf_counter()
 
         def task():
-            with lock_context:
-                return func(session)
+            record_phase(QUEUE_WAIT, time.perf_counter() - submitted_at, key)
+            if phase is None:
+                return func(*args)
+            with timed_phase(phase, key):
+                return func(*args)
+
+        future = self._scheduler.submit(key, partial(copy_context().run, task), priority=priority)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return self._scheduler.stats()
 
-        future = self._pool.submit(task)
-        return future.result()
+    def shutdown(self) -> None:
+        self._scheduler.shutdown()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+from errors import ValidationError
+from orchestration.scheduler import TaskPriority
+
+ONLINE_STATE = "device"
+
+
+class FanOutRunner:
+    """Runs one device operation on many serials concurrently and aggregates the outcomes.
+
+    Every device call goes through ``AppContext.run_for_device_async`` and therefore through the
+    ``DeviceExecutor``. ``max_concurrency`` caps device calls in flight across all fan-out
+    requests; a device that exceeds ``device_timeout_s`` is reported as timed out while the
+    others keep running.
+    """
+
+    def __init__(self, ctx, device_manager, max_concurrency: int = 8, device_timeout_s: float = 120.0):
+        self._ctx = ctx
+        self._device_manager = device_manager
+        self._max_concurrency = max(1, max_concurrency)
+        self._device_timeout_s = device_timeout_s
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+
+    def resolve_targets(
+        self,
+        serials: list[str] | None = None,
+        all_online: bool = False,
+        model: str | None = None,
+    ) -> list[str]:
+        """Return the target serials in a stable order.
+
+        ``serials`` are used as given (deduplicated). ``all_online`` selects every device in the
+        ``device`` state, and ``model`` keeps online devices whose model contains the given text
+        (case-insensitive), narrowing ``serials`` when both are passed.
+        """
+        if not serials and not all_online and not model:
+            raise ValidationError("Provide serials, all_online=true or a model filter")
+
+        targets = list(dict.fromkeys(serials or []))
+        if all_online or model:
+            needle = model.casefold() if model else None
+            online = [
+                device.serial
+                for device in self._device_manager.list_devices()
+                if device.state == ONLINE_STATE
+                and (needle is None or needle in (device.model or "").casefold())
+            ]
+            if targets:
+                online_set = set(online)
+                targets = [serial for serial in targets if serial in online_set]
+            else:
+                targets = online
+
+        if not targets:
+            raise ValidationError("No online devices match the requested targets")
+        return targets
+
+    async def run(
+        self,
+        serials: list[str],
+        operation,
+        requires_ui_lock: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        max_concurrency: int | None = None,
+        timeout_s: float | None = None,
+    ) -> dict:
+        """Run ``operation(session)`` on every serial; failures are reported per device, never raised.
+
+        A timed-out device call is abandoned, not interrupted: its worker finishes in the background.
+        """
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValidationError("max_concurrency must be > 0")
+        if timeout_s is not None and timeout_s <= 0:
+            raise ValidationError("timeout_s must be > 0")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        request_limit = asyncio.Semaphore(min(max_concurrency or self._max_concurrency, self._max_concurrency))
+        timeout_s = timeout_s or self._device_timeout_s
+        started_at = time.perf_counter()
+
+        async def run_one(serial: str) -> dict:
+            async with request_limit, self._semaphore:
+                device_started_at = time.perf_counter()
+                self._in_flight += 1
+                try:
+                    result = await asyncio.wait_for(
+                        self._ctx.run_for_device_async(
+                            serial, operation, requires_ui_lock=requires_ui_lock, priority=priority
+                        ),
+                        timeout=timeout_s if timeout_s > 0 else None,
+                    )
+                except asyncio.TimeoutError:
+                    outcome = {"status": "timeout", "error": f"Timed out after {timeout_s:g}s"}
+                except Exception as error:
+                    outcome = {"status": "error", "error": str(error)}
+                else:
+                    outcome = {"status": "ok", "result": result}
+                finally:
+                    self._in_flight -= 1
+                outcome.update(serial=serial, duration_ms=_elapsed_ms(device_started_at))
+                return outcome
+
+        results = await asyncio.gather(*(run_one(serial) for serial in serials))
+        return {
+            "results": results,
+            "succeeded": sum(1 for result in results if result["status"] == "ok"),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "timed_out": sum(1 for result in results if result["status"] == "timeout"),
+            "total_ms": _elapsed_ms(started_at),
+        }
+
+    def stats(self) -> dict:
+        return {"max_concurrency": self._max_concurrency, "in_flight": self._in_flight}
+
+
+def _elapsed_ms(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000, 3)
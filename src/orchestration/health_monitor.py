@@ -0,0 +1,116 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from time import monotonic
+
+
+class SessionHealthMonitor:
+    """Probes cached sessions in the background so tool calls only read ``DeviceSession.healthy``."""
+
+    def __init__(
+        self,
+        session_manager,
+        interval_s: float | None = None,
+        max_concurrency: int = 4,
+        jitter_ratio: float = 0.2,
+        circuit_breaker=None,
+    ):
+        self._session_manager = session_manager
+        self._circuit_breaker = circuit_breaker
+        self._interval_s = session_manager.healthcheck_interval_s if interval_s is None else interval_s
+        self._jitter_ratio = min(max(jitter_ratio, 0.0), 1.0)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="health-probe")
+        self._next_probe_at: dict[int, float] = {}
+        self._in_flight: set[int] = set()
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._interval_s > 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = Thread(target=self._run, name="session-health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._lock:
+            self._thread = None
+
+    def run_once(self, force: bool = False, wait: bool = True) -> int:
+        """Submit probes for every due session (all sessions if ``force``) and return how many were submitted.
+
+        Devices whose circuit breaker is ready for a trial get a reconnect probe as well.
+        """
+        current = monotonic()
+        futures = []
+        circuit_probes = self._circuit_breaker.claim_probes(current) if self._circuit_breaker is not None else []
+
+        sessions = self._session_manager.cached_sessions()
+        with self._lock:
+            live_keys = {id(session) for session in sessions}
+            for key in list(self._next_probe_at):
+                if key not in live_keys:
+                    del self._next_probe_at[key]
+
+            due = []
+            for session in sessions:
+                key = id(session)
+                if key in self._in_flight:
+                    continue
+                next_probe_at = self._next_probe_at.setdefault(key, self._initial_probe_at(session))
+                if force or current >= next_probe_at:
+                    self._in_flight.add(key)
+                    due.append(session)
+
+        for session in due:
+            futures.append(self._pool.submit(self._probe, session))
+        for serial in circuit_probes:
+            futures.append(self._pool.submit(self._probe_circuit, serial))
+
+        if wait:
+            for future in futures:
+                future.result()
+        return len(due) + len(circuit_probes)
+
+    def _probe(self, session) -> None:
+        key = id(session)
+        try:
+            self._session_manager.probe_session(session)
+        except Exception:
+            session.mark_health_failure()
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+                self._next_probe_at[key] = monotonic() + self._jittered_interval()
+
+    def _probe_circuit(self, serial: str) -> None:
+        try:
+            session = self._session_manager.get_session(serial)
+            if not self._session_manager.probe_session(session):
+                raise RuntimeError("session health probe failed")
+        except Exception as error:
+            self._circuit_breaker.record_failure(serial, error)
+        else:
+            self._circuit_breaker.record_success(serial)
+
+    def _initial_probe_at(self, session) -> float:
+        # Spread the first probe of freshly cached sessions over one interval.
+        return session.created_at + self._interval_s * random.random()
+
+    def _jittered_interval(self) -> float:
+        spread = self._interval_s * self._jitter_ratio
+        return self._interval_s + random.uniform(-spread, spread)
+
+    def _run(self) -> None:
+        tick_s = min(1.0, max(self._interval_s / 4, 0.05))
+        while not self._stop_event.wait(tick_s):
+            self.run_once(wait=False)
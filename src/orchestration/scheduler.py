@@ -0,0 +1,198 @@
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from threading import Condition, Thread
+from time import monotonic
+
+
+class TaskPriority(IntEnum):
+    """Dispatch classes; lower values are dispatched first."""
+
+    HIGH = 0  # Cheap status and log reads.
+    NORMAL = 1  # Regular device calls (input, screenshots, dumps).
+    LOW = 2  # Long UI waits such as selector polling.
+
+
+@dataclass
+class _Task:
+    key: str | None
+    func: object
+    future: Future
+    priority: TaskPriority
+    exclusive: bool
+    enqueued_at: float = field(default_factory=monotonic)
+
+
+@dataclass
+class _KeyStats:
+    in_flight: int = 0
+    completed: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+    def record_wait(self, wait_s: float) -> None:
+        self.total_wait_s += wait_s
+        self.max_wait_s = max(self.max_wait_s, wait_s)
+
+
+class FairScheduler:
+    """Worker pool with per-device queues, round-robin dispatch and per-device in-flight limits.
+
+    Tasks are grouped by key (a device serial, or ``None`` for host-level work). Higher priority
+    classes are always dispatched first; within a class, devices take turns. Exclusive tasks
+    (UI operations) are never dispatched while another exclusive task for the same device is
+    running, so they cannot tie up workers waiting on a device's ``ui_lock``.
+    """
+
+    def __init__(self, max_workers: int = 8, per_device_limit: int = 2):
+        self._per_device_limit = max(1, per_device_limit)
+        self._condition = Condition()
+        self._queues: dict[str | None, dict[TaskPriority, deque[_Task]]] = {}
+        self._ring: deque[str | None] = deque()
+        self._exclusive_busy: set[str | None] = set()
+        self._stats: dict[str | None, _KeyStats] = {}
+        self._priority_waits = {priority: _KeyStats() for priority in TaskPriority}
+        self._shutdown = False
+        self._workers = [
+            Thread(target=self._work, name=f"device-worker-{index}", daemon=True)
+            for index in range(max(1, max_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        key: str | None,
+        func,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        exclusive: bool = False,
+    ) -> Future:
+        task = _Task(key=key, func=func, future=Future(), priority=TaskPriority(priority), exclusive=exclusive)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+            queues = self._queues.get(key)
+            if queues is None:
+                queues = {level: deque() for level in TaskPriority}
+                self._queues[key] = queues
+                self._ring.append(key)
+            queues[task.priority].append(task)
+            self._condition.notify()
+        return task.future
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            devices = {}
+            for key in set(self._queues) | set(self._stats):
+                key_stats = self._stats.get(key, _KeyStats())
+                queued = sum(len(queue) for queue in self._queues.get(key, {}).values())
+                devices["<host>" if key is None else key] = {
+                    "queued": queued,
+                    "in_flight": key_stats.in_flight,
+                    "completed": key_stats.completed,
+                    "avg_wait_ms": _average_ms(key_stats),
+                    "max_wait_ms": round(key_stats.max_wait_s * 1000, 3),
+                }
+            priorities = {}
+            for priority, priority_stats in self._priority_waits.items():
+                priorities[priority.name] = {
+                    "queued": sum(len(queues[priority]) for queues in self._queues.values()),
+                    "in_flight": priority_stats.in_flight,
+                    "completed": priority_stats.completed,
+                    "avg_wait_ms": _average_ms(priority_stats),
+                    "max_wait_ms": round(priority_stats.max_wait_s * 1000, 3),
+                }
+            return {
+                "workers": len(self._workers),
+                "per_device_limit": self._per_device_limit,
+                "queued": sum(device["queued"] for device in devices.values()),
+                "in_flight": sum(device["in_flight"] for device in devices.values()),
+                "devices": dict(sorted(devices.items())),
+                "priorities": priorities,
+            }
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                task = self._take_next_locked()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    task = self._take_next_locked()
+
+            started = task.future.set_running_or_notify_cancel()
+            result = error = None
+            if started:
+                try:
+                    result = task.func()
+                except BaseException as task_error:
+                    error = task_error
+
+            # Release the device slot before resolving the future so callers observe consistent stats.
+            with self._condition:
+                key_stats = self._stats[task.key]
+                key_stats.in_flight -= 1
+                key_stats.completed += 1
+                priority_stats = self._priority_waits[task.priority]
+                priority_stats.in_flight -= 1
+                priority_stats.completed += 1
+                if task.exclusive:
+                    self._exclusive_busy.discard(task.key)
+                self._condition.notify_all()
+
+            if started:
+                if error is not None:
+                    task.future.set_exception(error)
+                else:
+                    task.future.set_result(result)
+
+    def _take_next_locked(self) -> _Task | None:
+        for priority in TaskPriority:
+            for key in list(self._ring):
+                if key is not None and self._stats.get(key, _KeyStats()).in_flight >= self._per_device_limit:
+                    continue
+                task = self._pop_eligible_locked(key, priority)
+                if task is None:
+                    continue
+
+                self._ring.remove(key)
+                if any(self._queues[key].values()):
+                    self._ring.append(key)
+                else:
+                    del self._queues[key]
+
+                wait_s = monotonic() - task.enqueued_at
+                key_stats = self._stats.setdefault(key, _KeyStats())
+                key_stats.in_flight += 1
+                key_stats.record_wait(wait_s)
+                priority_stats = self._priority_waits[priority]
+                priority_stats.in_flight += 1
+                priority_stats.record_wait(wait_s)
+                if task.exclusive:
+                    self._exclusive_busy.add(key)
+                return task
+        return None
+
+    def _pop_eligible_locked(self, key: str | None, priority: TaskPriority) -> _Task | None:
+        queue = self._queues[key][priority]
+        exclusive_blocked = key in self._exclusive_busy
+        for index, task in enumerate(queue):
+            if task.exclusive and exclusive_blocked:
+                continue
+            del queue[index]
+            return task
+        return None
+
+
+def _average_ms(stats: _KeyStats) -> float:
+    dispatched = stats.completed + stats.in_flight
+    if dispatched == 0:
+        return 0.0
+    return round(stats.total_wait_s / dispatched * 1000, 3)
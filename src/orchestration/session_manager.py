@@ -1,8 +1,11 @@
+from concurrent.futures import Future
 from threading import Lock
-from time import monotonic, sleep
+from time import monotonic, perf_counter, sleep
 
-from errors import DeviceResolutionError
+from errors import DeviceResolutionError, classify_error
 from orchestration.device_session import DeviceSession
+from shared.lru_cache import ByteLRUCache
+from shared.metrics import RESOLVE, SESSION, record_phase, timed_phase
 
 
 class DeviceSessionManager:
@@ -17,17 +20,31 @@ class DeviceSessionManager:
         healthcheck_interval_s: float = 5.0,
         connect_retries: int = 2,
         connect_backoff_s: float = 0.25,
+        screenshot_cache_bytes: int = 8 * 1024 * 1024,
+        max_sessions: int = 0,
+        healthcheck_enabled: bool = True,
     ):
         self._device_manager = device_manager
         self._u2_client_provider = u2_client_provider
         self._default_serial = default_serial
         self._session_ttl_s = session_ttl_s
         self._healthcheck_interval_s = healthcheck_interval_s
+        # An interval of 0 keeps its original meaning: probe the session on every call, inline.
+        self._healthcheck_every_call = healthcheck_enabled and healthcheck_interval_s <= 0
         self._connect_retries = connect_retries
         self._connect_backoff_s = connect_backoff_s
+        self._screenshot_cache_bytes = screenshot_cache_bytes
+        self._max_sessions = max(0, max_sessions)
+        self._evictions = {"idle": 0, "lru": 0, "unhealthy": 0, "detached": 0}
+        self._skipped_in_flight = 0
         self._sessions: dict[str, DeviceSession] = {}
+        self._pending: dict[str, Future] = {}
         self._lock = Lock()
 
+    @property
+    def healthcheck_interval_s(self) -> float:
+        return self._healthcheck_interval_s
+
     def resolve_serial(self, serial: str | None) -> str:
         serials = self._device_manager.list_serials()
 
@@ -44,55 +61,211 @@ class DeviceSessionManager:
             raise DeviceResolutionError("No connected Android devices found")
         raise DeviceResolutionError("Multiple devices connected. Please specify serial")
 
+    def resolves_in_memory(self) -> bool:
+        """True when ``resolve_serial`` needs no adb round trip and may run on the event loop."""
+        return self._device_manager.inventory_synced()
+
     def get_session(self, serial: str | None) -> DeviceSession:
+        started_at = perf_counter()
         resolved_serial = self.resolve_serial(serial)
-        with self._lock:
-            session = self._sessions.get(resolved_serial)
-            now = monotonic()
+        record_phase(RESOLVE, perf_counter() - started_at, resolved_serial)
+        return self.session_for(resolved_serial)
 
-            if session and self._is_expired(session, now):
-                self._sessions.pop(resolved_serial, None)
-                session = None
+    def session_for(self, resolved_serial: str, lease: bool = False) -> DeviceSession:
+        """Like ``get_session`` for a serial already returned by ``resolve_serial``.
 
-            if session is None:
-                session = self._create_session_with_retry(resolved_serial)
-                self._sessions[resolved_serial] = session
+        With ``lease`` the session is returned with a call already counted in flight, taken under
+        the manager lock so it cannot be reaped or evicted before the call is queued. The caller
+        hands it to ``DeviceExecutor`` with ``leased=True``, or calls ``end_call`` itself.
+        """
+        with timed_phase(SESSION, resolved_serial):
+            session = self._get_cached_session(resolved_serial, lease) or self._get_or_create_session(
+                resolved_serial, lease
+            )
+            if self._healthcheck_every_call and session.healthy:
+                self.probe_session(session)
+            if not session.healthy:
+                self._discard_session(resolved_serial, session)
+                if lease:
+                    session.end_call()
+                session = self._get_or_create_session(resolved_serial, lease)
+        return session
 
-            if self._needs_health_check(session, now) and not self._is_session_healthy(session, now):
-                self._sessions.pop(resolved_serial, None)
-                session = self._create_session_with_retry(resolved_serial)
-                self._sessions[resolved_serial] = session
-
-            session.touch(now)
-            return session
+    def lease_session(self, resolved_serial: str) -> DeviceSession:
+        return self.session_for(resolved_serial, lease=True)
 
     def clear_session(self, serial: str) -> bool:
+        """Drop ``serial``'s session; calls still running on it finish before it is closed."""
         with self._lock:
-            return self._sessions.pop(serial, None) is not None
+            session = self._sessions.pop(serial, None)
+        if session is None:
+            return False
+        session.close_when_idle()
+        return True
 
     def active_sessions(self) -> list[str]:
         with self._lock:
             return sorted(self._sessions.keys())
 
-    def should_retry_after_error(self, error: Exception) -> bool:
-        if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+    def session_stats(self, now: float | None = None) -> dict:
+        """Describe cached sessions and how many were evicted, by reason."""
+        current = monotonic() if now is None else now
+        with self._lock:
+            sessions = [
+                {
+                    "serial": serial,
+                    "idle_s": round(max(0.0, current - session.last_used_at), 3),
+                    "in_flight": session.in_flight,
+                    "healthy": session.healthy,
+                }
+                for serial, session in sorted(self._sessions.items())
+            ]
+            return {
+                "sessions": sessions,
+                "max_sessions": self._max_sessions,
+                "session_ttl_s": self._session_ttl_s,
+                "evictions": dict(self._evictions),
+                "skipped_in_flight": self._skipped_in_flight,
+            }
+
+    def reap_idle(self, now: float | None = None) -> list[str]:
+        """Close sessions idle for longer than the TTL and any LRU sessions still over ``max_sessions``.
+
+        Sessions with calls in flight are skipped.
+        """
+        current = monotonic() if now is None else now
+        reaped = []
+        with self._lock:
+            for serial, session in list(self._sessions.items()):
+                if not self._is_expired(session, current):
+                    continue
+                if session.in_flight > 0:
+                    self._skipped_in_flight += 1
+                    continue
+                del self._sessions[serial]
+                self._evictions["idle"] += 1
+                reaped.append(session)
+            reaped += self._evict_over_limit_locked(keep=None)
+        for session in reaped:
+            session.close_when_idle()
+        return [session.serial for session in reaped]
+
+    def cached_sessions(self) -> list[DeviceSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def probe_session(self, session: DeviceSession, now: float | None = None) -> bool:
+        """Run adb and uiautomator2 health probes and record the outcome on the session."""
+        adb_healthy = self._check_adb_health(session.adb_device)
+        u2_healthy = self._check_u2_health(session.u2_device)
+
+        if adb_healthy and u2_healthy:
+            session.mark_health_ok(now)
             return True
 
-        error_text = str(error).lower()
-        transient_markers = (
-            "device offline",
-            "connection reset",
-            "connection aborted",
-            "connection refused",
-            "transport",
-            "socket",
-            "rpc",
-            "uiautomator",
-            "adb",
-            "timed out",
-            "timeout",
-        )
-        return any(marker in error_text for marker in transient_markers)
+        session.mark_health_failure(now)
+        return False
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        """React to hotplug events: drop sessions of detached devices (``SessionWarmer`` handles attaches)."""
+        if not present and self.clear_session(serial):
+            with self._lock:
+                self._evictions["detached"] += 1
+
+    def should_retry_after_error(self, error: Exception) -> bool:
+        """Retry on a fresh session only when the connection broke; timeouts and bad requests would fail again."""
+        return classify_error(error).retryable
+
+    def _get_cached_session(self, serial: str, lease: bool = False) -> DeviceSession | None:
+        with self._lock:
+            session = self._sessions.get(serial)
+            if session is None:
+                return None
+            if session.in_flight > 0 or not self._is_expired(session, monotonic()):
+                self._hand_out_locked(session, lease)
+                return session
+            self._sessions.pop(serial, None)
+            self._evictions["idle"] += 1
+        session.close_when_idle()
+        return None
+
+    def _discard_session(self, serial: str, session: DeviceSession) -> None:
+        with self._lock:
+            if self._sessions.get(serial) is not session:
+                return
+            self._sessions.pop(serial, None)
+            self._evictions["unhealthy"] += 1
+        session.close_when_idle()
+
+    def _get_or_create_session(self, serial: str, lease: bool = False) -> DeviceSession:
+        """Create a session for ``serial`` once, sharing the in-progress result with concurrent callers.
+
+        Only the per-serial creation is serialized; the global lock is held for dictionary updates only,
+        so a slow connect on one device never blocks session lookups for other devices.
+        """
+        with self._lock:
+            session = self._sessions.get(serial)
+            if session is not None:
+                self._hand_out_locked(session, lease)
+                return session
+            pending = self._pending.get(serial)
+            is_owner = pending is None
+            if is_owner:
+                pending = Future()
+                self._pending[serial] = pending
+
+        if not is_owner:
+            session = pending.result()
+            if not lease:
+                return session
+            # Lease the shared session only if it is still cached; it may have been evicted meanwhile.
+            return self._get_or_create_session(serial, lease)
+
+        try:
+            session = self._create_session_with_retry(serial)
+        except BaseException as error:
+            with self._lock:
+                self._pending.pop(serial, None)
+            pending.set_exception(error)
+            raise
+
+        with self._lock:
+            self._pending.pop(serial, None)
+            self._hand_out_locked(session, lease)
+            self._sessions[serial] = session
+            evicted = self._evict_over_limit_locked(keep=session)
+        for old_session in evicted:
+            old_session.close_when_idle()
+        pending.set_result(session)
+        return session
+
+    @staticmethod
+    def _hand_out_locked(session: DeviceSession, lease: bool) -> None:
+        # Under the manager lock, so the reaper cannot expire or evict the session before it is returned.
+        session.touch()
+        if lease:
+            session.begin_call()
+
+    def _evict_over_limit_locked(self, keep: DeviceSession | None) -> list[DeviceSession]:
+        """Pick least recently used sessions beyond ``max_sessions``; busy sessions are never evicted."""
+        if self._max_sessions <= 0:
+            return []
+        evicted = []
+        while len(self._sessions) > self._max_sessions:
+            candidates = [
+                session
+                for session in self._sessions.values()
+                if session is not keep and session.in_flight == 0
+            ]
+            if not candidates:
+                # Every other session is busy; allow the pool to run over its limit until one frees up.
+                self._skipped_in_flight += 1
+                break
+            victim = min(candidates, key=lambda session: session.last_used_at)
+            del self._sessions[victim.serial]
+            self._evictions["lru"] += 1
+            evicted.append(victim)
+        return evicted
 
     def _create_session_with_retry(self, serial: str) -> DeviceSession:
         attempts = max(1, self._connect_retries + 1)
@@ -102,7 +275,12 @@ class DeviceSessionManager:
             try:
                 adb_device = self._device_manager.get_device(serial)
                 u2_device = self._u2_client_provider.connect(serial)
-                return DeviceSession(serial=serial, adb_device=adb_device, u2_device=u2_device)
+                return DeviceSession(
+                    serial=serial,
+                    adb_device=adb_device,
+                    u2_device=u2_device,
+                    screenshot_cache=self._new_screenshot_cache(),
+                )
             except Exception as error:
                 last_error = error
                 if attempt < attempts - 1:
@@ -111,25 +289,14 @@ class DeviceSessionManager:
 
         raise DeviceResolutionError(f"Unable to create session for {serial}: {last_error}") from last_error
 
+    def _new_screenshot_cache(self) -> ByteLRUCache | None:
+        if self._screenshot_cache_bytes <= 0:
+            return None
+        return ByteLRUCache(self._screenshot_cache_bytes)
+
     def _is_expired(self, session: DeviceSession, now: float) -> bool:
         return self._session_ttl_s > 0 and (now - session.last_used_at) > self._session_ttl_s
 
-    def _needs_health_check(self, session: DeviceSession, now: float) -> bool:
-        if self._healthcheck_interval_s <= 0:
-            return True
-        return (now - session.last_health_check_at) >= self._healthcheck_interval_s
-
-    def _is_session_healthy(self, session: DeviceSession, now: float) -> bool:
-        adb_healthy = self._check_adb_health(session.adb_device)
-        u2_healthy = self._check_u2_health(session.u2_device)
-
-        if adb_healthy and u2_healthy:
-            session.mark_health_ok(now)
-            return True
-
-        session.mark_health_failure(now)
-        return False
-
     @staticmethod
     def _check_adb_health(adb_device) -> bool:
         get_state = getattr(adb_device, "get_state", None)
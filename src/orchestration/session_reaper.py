@@ -0,0 +1,47 @@
+import logging
+from threading import Event, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+    """Periodically closes idle sessions so abandoned devices release their clients and caches."""
+
+    def __init__(self, session_manager, interval_s: float = 30.0):
+        self._session_manager = session_manager
+        self._interval_s = interval_s
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._interval_s > 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = Thread(target=self._run, name="session-reaper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._lock:
+            self._thread = None
+
+    def run_once(self) -> list[str]:
+        reaped = self._session_manager.reap_idle()
+        if reaped:
+            logger.info("Closed idle sessions: %s", ", ".join(reaped))
+        return reaped
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval_s):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Session reaper pass failed")
@@ -0,0 +1,149 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class WarmupStatus:
+    state: str = PENDING
+    error: str | None = None
+    duration_ms: float | None = None
+    updated_at: float = 0.0
+    attempts: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "duration_ms": self.duration_ms,
+            "age_s": round(time.monotonic() - self.updated_at, 3),
+            "attempts": self.attempts,
+        }
+
+
+class SessionWarmer:
+    """Creates device sessions ahead of the first tool call and reports their readiness.
+
+    Warming a device creates its session and runs one health probe, which makes uiautomator2
+    start its on-device server. Devices are warmed in parallel, at most ``max_concurrency`` at
+    a time. A tool call that arrives while its device is still warming shares the in-progress
+    connect instead of starting another one. ``serials`` restricts warming to a fixed list.
+    """
+
+    def __init__(
+        self,
+        session_manager,
+        device_manager,
+        serials: list[str] | None = None,
+        max_concurrency: int = 4,
+        on_attach: bool = False,
+    ):
+        self._session_manager = session_manager
+        self._device_manager = device_manager
+        self._serials = list(serials) if serials else None
+        self._on_attach = on_attach
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="session-warmer")
+        self._statuses: dict[str, WarmupStatus] = {}
+        self._futures = {}
+        self._lock = Lock()
+
+    def start(self) -> None:
+        """Warm all target devices in the background."""
+        self._pool.submit(self._warm_targets)
+
+    def warm(self, serials: list[str] | None = None, wait_s: float = 0.0) -> dict:
+        """Warm ``serials`` (default: the configured list or every attached device) and return their status.
+
+        With ``wait_s`` the call blocks up to that long for the warm-ups to finish.
+        """
+        futures = self.submit(serials)
+        if wait_s > 0 and futures:
+            wait(futures.values(), timeout=wait_s)
+        return self.status(list(futures))
+
+    def submit(self, serials: list[str] | None = None) -> dict:
+        """Start warming ``serials`` (default as in ``warm``) and return each device's warm-up future.
+
+        Async callers wait on the futures themselves rather than blocking a worker thread in ``warm``.
+        """
+        return {serial: self._submit(serial) for serial in serials or self._targets()}
+
+    def handle_device_event(self, serial: str, present: bool) -> None:
+        if not present:
+            with self._lock:
+                self._statuses.pop(serial, None)
+            return
+        if self._on_attach and (self._serials is None or serial in self._serials):
+            self._submit(serial)
+
+    def status(self, serials: list[str] | None = None) -> dict:
+        with self._lock:
+            names = sorted(self._statuses) if serials is None else serials
+            return {
+                serial: self._statuses[serial].as_dict() if serial in self._statuses else {"state": "unknown"}
+                for serial in names
+            }
+
+    def stop(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _targets(self) -> list[str]:
+        if self._serials is not None:
+            return list(self._serials)
+        return self._device_manager.list_serials()
+
+    def _warm_targets(self) -> None:
+        try:
+            targets = self._targets()
+        except Exception as error:
+            logger.warning("Session warm-up could not list devices: %s", error)
+            return
+        for serial in targets:
+            self._submit(serial)
+
+    def _submit(self, serial: str):
+        with self._lock:
+            future = self._futures.get(serial)
+            if future is not None and not future.done():
+                return future
+            status = self._statuses.setdefault(serial, WarmupStatus())
+            status.state = PENDING
+            status.updated_at = time.monotonic()
+            future = self._pool.submit(self._warm, serial)
+            self._futures[serial] = future
+            return future
+
+    def _warm(self, serial: str) -> None:
+        started_at = time.perf_counter()
+        self._update(serial, state=WARMING, error=None)
+        try:
+            session = self._session_manager.get_session(serial)
+            if not self._session_manager.probe_session(session):
+                raise RuntimeError("session health probe failed")
+        except Exception as error:
+            logger.warning("Warm-up failed for %s: %s", serial, error)
+            self._update(serial, state=FAILED, error=str(error), started_at=started_at)
+        else:
+            self._update(serial, state=READY, error=None, started_at=started_at)
+
+    def _update(self, serial: str, state: str, error: str | None, started_at: float | None = None) -> None:
+        with self._lock:
+            status = self._statuses.get(serial)
+            if status is None:
+                return  # The device detached while warming.
+            status.state = state
+            status.error = error
+            status.updated_at = time.monotonic()
+            if state == WARMING:
+                status.attempts += 1
+            if started_at is not None:
+                status.duration_ms = round((time.perf_counter() - started_at) * 1000, 3)
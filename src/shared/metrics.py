@@ -0,0 +1,264 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+RESOLVE = "resolve"
+SESSION = "session"
+QUEUE_WAIT = "queue_wait"
+UI_LOCK_WAIT = "ui_lock_wait"
+DEVICE_CALL = "device_call"
+SERIALIZE = "serialize"
+PHASES = (RESOLVE, SESSION, QUEUE_WAIT, UI_LOCK_WAIT, DEVICE_CALL, SERIALIZE)
+
+DEFAULT_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_current_call: ContextVar["CallTimings | None"] = ContextVar("mcp_call_timings", default=None)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS_S):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return ``(upper_bound, count <= bound)`` pairs, ending with ``+inf``."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self._counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the ``q`` quantile by linear interpolation inside its bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        previous = 0
+        for bound, cumulative in self.cumulative():
+            if cumulative >= rank:
+                if bound == float("inf"):
+                    return self.buckets[-1] if self.buckets else lower
+                in_bucket = cumulative - previous
+                return lower + (bound - lower) * ((rank - previous) / in_bucket if in_bucket else 0.0)
+            lower, previous = bound, cumulative
+        return lower
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 6),
+            "avg_ms": round(self.sum / self.count * 1000, 3) if self.count else None,
+            "p50_ms": _ms(self.quantile(0.5)),
+            "p90_ms": _ms(self.quantile(0.9)),
+            "p99_ms": _ms(self.quantile(0.99)),
+        }
+
+
+class CallTimings:
+    """Phase durations collected while one tool call runs, keyed by device serial."""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started_at = time.perf_counter()
+        self.handler_done_at: float | None = None
+        self._phases: dict[tuple[str | None, str], float] = {}
+        self._lock = Lock()
+
+    def add(self, phase: str, seconds: float, serial: str | None = None) -> None:
+        with self._lock:
+            key = (serial, phase)
+            self._phases[key] = self._phases.get(key, 0.0) + max(0.0, seconds)
+
+    def phases(self) -> dict[str, float]:
+        """Phase totals across all devices the call touched."""
+        totals: dict[str, float] = {}
+        with self._lock:
+            for (_, phase), seconds in self._phases.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def device_phases(self) -> dict[str, dict[str, float]]:
+        devices: dict[str, dict[str, float]] = {}
+        with self._lock:
+            for (serial, phase), seconds in self._phases.items():
+                if serial is not None:
+                    devices.setdefault(serial, {})[phase] = seconds
+        return devices
+
+
+def current_call() -> CallTimings | None:
+    return _current_call.get()
+
+
+def record_phase(phase: str, seconds: float, serial: str | None = None) -> None:
+    """Add ``seconds`` to ``phase`` of the tool call running in this context (no-op outside one)."""
+    call = _current_call.get()
+    if call is not None:
+        call.add(phase, seconds, serial)
+
+
+@contextmanager
+def timed_phase(phase: str, serial: str | None = None):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started_at, serial)
+
+
+class LatencyMetrics:
+    """Aggregates tool call latency into per-tool and per-device histograms, in total and per phase.
+
+    ``track_call`` opens a ``CallTimings`` in a context variable; the session manager and the
+    executor add phase durations to it through ``record_phase``. Worker threads see the call
+    because the executor runs tasks in a copy of the submitting context.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS_S):
+        self._buckets = buckets
+        self._tool_calls: dict[tuple[str, str], Histogram] = {}
+        self._tool_phases: dict[tuple[str, str], Histogram] = {}
+        self._device_calls: dict[str, Histogram] = {}
+        self._device_phases: dict[tuple[str, str], Histogram] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def track_call(self, tool: str):
+        """Time a tool call; nested use (a call already tracked in this context) is a no-op."""
+        call = _current_call.get()
+        if call is not None:
+            yield call
+            return
+        call = CallTimings(tool)
+        token = _current_call.set(call)
+        status = "ok"
+        try:
+            yield call
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _current_call.reset(token)
+            self.observe(call, status, time.perf_counter() - call.started_at)
+
+    def observe(self, call: CallTimings, status: str, total_s: float) -> None:
+        if call.handler_done_at is not None:
+            call.add(SERIALIZE, time.perf_counter() - call.handler_done_at)
+        phases = call.phases()
+        devices = call.device_phases()
+        with self._lock:
+            self._histogram(self._tool_calls, (call.tool, status)).observe(total_s)
+            for phase, seconds in phases.items():
+                self._histogram(self._tool_phases, (call.tool, phase)).observe(seconds)
+            for serial, device_phases in devices.items():
+                self._histogram(self._device_calls, serial).observe(sum(device_phases.values()))
+                for phase, seconds in device_phases.items():
+                    self._histogram(self._device_phases, (serial, phase)).observe(seconds)
+
+    def snapshot(self) -> dict:
+        """Summaries (count, average and estimated p50/p90/p99) per tool and per device."""
+        with self._lock:
+            tools: dict[str, dict] = {}
+            for (tool, status), histogram in sorted(self._tool_calls.items()):
+                entry = tools.setdefault(tool, {"calls": 0, "errors": 0, "total": None, "phases": {}})
+                entry["calls"] += histogram.count
+                if status == "error":
+                    entry["errors"] += histogram.count
+            for tool, entry in tools.items():
+                merged = self._merge(h for (name, _), h in self._tool_calls.items() if name == tool)
+                entry["total"] = merged.summary()
+                entry["phases"] = _phase_summaries(self._tool_phases, tool)
+            devices = {
+                serial: {"total": histogram.summary(), "phases": _phase_summaries(self._device_phases, serial)}
+                for serial, histogram in sorted(self._device_calls.items())
+            }
+        return {"tools": tools, "devices": devices}
+
+    def render_prometheus(self) -> str:
+        """Render all histograms in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            _render(
+                lines,
+                "mcp_tool_call_duration_seconds",
+                "Tool call latency from request to serialized result.",
+                [({"tool": tool, "status": status}, h) for (tool, status), h in sorted(self._tool_calls.items())],
+            )
+            _render(
+                lines,
+                "mcp_tool_phase_duration_seconds",
+                "Time a tool call spent in each phase, summed over the devices it touched.",
+                [({"tool": tool, "phase": phase}, h) for (tool, phase), h in sorted(self._tool_phases.items())],
+            )
+            _render(
+                lines,
+                "mcp_device_call_duration_seconds",
+                "Per-device time of a tool call, summed over its phases.",
+                [({"serial": serial}, h) for serial, h in sorted(self._device_calls.items())],
+            )
+            _render(
+                lines,
+                "mcp_device_phase_duration_seconds",
+                "Per-device time a tool call spent in each phase.",
+                [
+                    ({"serial": serial, "phase": phase}, h)
+                    for (serial, phase), h in sorted(self._device_phases.items())
+                ],
+            )
+        return "\n".join(lines) + "\n"
+
+    def _histogram(self, table: dict, key) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self._buckets)
+        return histogram
+
+    def _merge(self, histograms) -> Histogram:
+        merged = Histogram(self._buckets)
+        for histogram in histograms:
+            merged._counts = [a + b for a, b in zip(merged._counts, histogram._counts)]
+            merged.count += histogram.count
+            merged.sum += histogram.sum
+        return merged
+
+
+def _phase_summaries(table: dict, owner: str) -> dict:
+    found = {phase: histogram for (name, phase), histogram in table.items() if name == owner}
+    ordered = [phase for phase in PHASES if phase in found] + sorted(set(found) - set(PHASES))
+    return {phase: found[phase].summary() for phase in ordered}
+
+
+def _render(lines: list[str], name: str, help_text: str, series: list[tuple[dict, Histogram]]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in series:
+        for bound, count in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def _labels(labels: dict) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
@@ -16,3 +16,41 @@ def image_to_png_bytes(image: PILImage.Image, scale_factor: float = 1.0) -> byte
     buffer = io.BytesIO()
     output_image.save(buffer, format="PNG")
     return buffer.getvalue()
+
+
+def png_bytes_to_image(data: bytes) -> PILImage.Image:
+    image = PILImage.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def raw_frame_to_png_bytes(frame, scale_factor: float = 1.0) -> bytes:
+    """Encode a parsed raw framebuffer (see ``adb.framebuffer``) as an RGB PNG in a single pass."""
+    if scale_factor <= 0:
+        raise ValueError("scale_factor must be > 0")
+
+    # RGBA and RGBX buffers are mapped in place instead of being copied into a new image.
+    mode = "RGBA" if frame.rawmode == "BGRA" else frame.rawmode
+    image = PILImage.frombuffer(mode, (frame.width, frame.height), frame.pixels, "raw", frame.rawmode, 0, 1)
+
+    if scale_factor != 1.0:
+        width = max(1, int(frame.width * scale_factor))
+        height = max(1, int(frame.height * scale_factor))
+        image = fast_downscale(image, (width, height))
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def fast_downscale(image: PILImage.Image, size: tuple[int, int]) -> PILImage.Image:
+    """Shrink by the largest integer box-reduce factor first, then resample the remainder."""
+    factor = min(image.width // size[0], image.height // size[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != size:
+        image = image.resize(size, PILImage.Resampling.BILINEAR)
+    return image
@@ -18,6 +18,16 @@ def validate_log_level(level: str) -> str:
     return normalized
 
 
+UI_DUMP_FORMATS = ("xml", "compact")
+
+
+def validate_dump_format(output_format: str) -> str:
+    normalized = output_format.lower().strip()
+    if normalized not in UI_DUMP_FORMATS:
+        raise ValidationError(f"Invalid output_format: {output_format}. Allowed values: {', '.join(UI_DUMP_FORMATS)}")
+    return normalized
+
+
 def parse_returned_attributes(returned_attributes: str) -> list[str]:
     attrs = [attribute.strip() for attribute in returned_attributes.split(",") if attribute.strip()]
     if not attrs:
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import re
+from collections import deque
+from dataclasses import dataclass
+from xml.parsers import expat
+
+COMPACT_FORMAT = "compact-v1"
+DIFF_FORMAT = "diff-v1"
+# Attributes emitted as indexes into the response's string table.
+INTERNED_ATTRIBUTES = frozenset({"text", "resource-id", "class", "package", "content-desc", "hint"})
+INTEGER_ATTRIBUTES = frozenset({"index", "drawing-order"})
+# A node with any of these set (or any label) is kept when wrapper nodes are collapsed.
+INTERACTIVE_ATTRIBUTES = ("clickable", "long-clickable", "scrollable", "checkable")
+LABEL_ATTRIBUTES = ("text", "content-desc", "resource-id", "hint")
+
+_BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+@dataclass(frozen=True)
+class UiNode:
+    id: str
+    parent_id: str | None
+    depth: int
+    # Class names and uiautomator indexes from the root, e.g. "FrameLayout[0]/TextView[1]".
+    class_path: str
+    attributes: dict[str, str]
+    bounds: tuple[int, int, int, int] | None
+
+    @property
+    def has_area(self) -> bool:
+        return self.bounds is not None and self.bounds[2] > self.bounds[0] and self.bounds[3] > self.bounds[1]
+
+    @property
+    def is_visible(self) -> bool:
+        return self.attributes.get("visible-to-user", "true") != "false" and self.has_area
+
+    @property
+    def is_wrapper(self) -> bool:
+        """Layout-only container: not interactive and without any label."""
+        return not any(self.attributes.get(name) == "true" for name in INTERACTIVE_ATTRIBUTES) and not any(
+            self.attributes.get(name) for name in LABEL_ATTRIBUTES
+        )
+
+
+def parse_hierarchy_nodes(xml_dump: str | bytes) -> list[UiNode]:
+    """Parse a uiautomator dump into nodes in document order with ids stable across dumps.
+
+    A node's id is derived from its class path and resource-id, so the same element gets the
+    same id in consecutive dumps as long as the layout above it is unchanged.
+    """
+    nodes: list[UiNode] = []
+    stack: list[UiNode] = []
+    seen_ids: dict[str, int] = {}
+
+    def start_element(tag, attributes):
+        if tag != "node":
+            return
+        parent = stack[-1] if stack else None
+        class_name = attributes.get("class", "").rsplit(".", 1)[-1] or "node"
+        step = f"{class_name}[{attributes.get('index', '0')}]"
+        class_path = f"{parent.class_path}/{step}" if parent is not None else step
+        digest = hashlib.blake2b(
+            f"{class_path}|{attributes.get('resource-id', '')}".encode(), digest_size=5
+        ).hexdigest()
+        duplicates = seen_ids.get(digest, 0)
+        seen_ids[digest] = duplicates + 1
+        node = UiNode(
+            id=digest if duplicates == 0 else f"{digest}~{duplicates}",
+            parent_id=parent.id if parent is not None else None,
+            depth=len(stack),
+            class_path=class_path,
+            attributes=attributes,
+            bounds=parse_bounds(attributes.get("bounds", "")),
+        )
+        nodes.append(node)
+        stack.append(node)
+
+    def end_element(tag):
+        if tag == "node":
+            stack.pop()
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.Parse(xml_dump, True)
+    return nodes
+
+
+def parse_bounds(text: str) -> tuple[int, int, int, int] | None:
+    match = _BOUNDS_PATTERN.fullmatch(text)
+    if match is None:
+        return None
+    return tuple(int(value) for value in match.groups())
+
+
+def prune_nodes(nodes: list[UiNode]) -> tuple[list[UiNode], dict]:
+    """Drop invisible or zero-area subtrees and collapse wrapper nodes into their nearest kept ancestor."""
+    kept: list[UiNode] = []
+    # Maps every visited node id to the id its children should point at.
+    parent_for: dict[str | None, str | None] = {None: None}
+    hidden = collapsed = 0
+
+    for node in nodes:
+        if node.parent_id not in parent_for:
+            hidden += 1  # Descendant of a hidden subtree.
+            continue
+        if not node.is_visible:
+            hidden += 1
+            continue
+        new_parent = parent_for[node.parent_id]
+        if node.is_wrapper:
+            collapsed += 1
+            parent_for[node.id] = new_parent
+            continue
+        parent_for[node.id] = node.id
+        if new_parent != node.parent_id:
+            node = UiNode(
+                id=node.id,
+                parent_id=new_parent,
+                depth=node.depth,
+                class_path=node.class_path,
+                attributes=node.attributes,
+                bounds=node.bounds,
+            )
+        kept.append(node)
+
+    return kept, {"hidden": hidden, "collapsed": collapsed}
+
+
+def encode_compact(nodes: list[UiNode], attributes: list[str], max_bytes: int = 0) -> dict:
+    """Encode nodes as a table whose string cells index into a shared string table.
+
+    With ``max_bytes`` > 0, rows are emitted in document order until the serialized response
+    would exceed the cap; parents therefore always precede their children.
+    """
+    pruned, pruned_counts = prune_nodes(nodes)
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+    rows = []
+    # Envelope keys and metadata are small; reserve room for them up front.
+    size = 256 + sum(len(name) + 3 for name in attributes)
+    truncated = False
+
+    for node in pruned:
+        row: list = [node.id, node.parent_id]
+        added_size = 0
+        new_strings: dict[str, int] = {}
+        for name in attributes:
+            value = node.attributes.get(name, "")
+            if name not in INTERNED_ATTRIBUTES:
+                row.append(node_value(node, name))
+            elif not value:
+                row.append(None)
+            else:
+                string_id = string_ids.get(value, new_strings.get(value))
+                if string_id is None:
+                    string_id = len(strings) + len(new_strings)
+                    new_strings[value] = string_id
+                    added_size += len(json.dumps(value, ensure_ascii=False).encode()) + 1
+                row.append(string_id)
+        added_size += len(json.dumps(row, separators=(",", ":"))) + 1
+
+        if max_bytes > 0 and size + added_size > max_bytes:
+            truncated = True
+            break
+        size += added_size
+        string_ids.update(new_strings)
+        strings.extend(new_strings)
+        rows.append(row)
+
+    return {
+        "format": COMPACT_FORMAT,
+        "columns": ["id", "parent"] + list(attributes),
+        "strings": strings,
+        "nodes": rows,
+        "total_nodes": len(pruned),
+        "returned_nodes": len(rows),
+        "truncated": truncated,
+        "pruned": pruned_counts,
+    }
+
+
+def node_value(node: UiNode, name: str):
+    """JSON value of one attribute: bounds as a list, integers, 0/1 booleans or plain strings."""
+    value = node.attributes.get(name, "")
+    if name == "bounds":
+        return list(node.bounds) if node.bounds is not None else None
+    if name in INTEGER_ATTRIBUTES:
+        return int(value) if value.lstrip("-").isdigit() else None
+    if name in INTERNED_ATTRIBUTES:
+        return value or None
+    return 1 if value == "true" else 0
+
+
+def diff_nodes(base: list[UiNode], current: list[UiNode], attributes: list[str]) -> dict:
+    """Return nodes added, removed and modified between two parsed snapshots.
+
+    Nodes are matched on class path, resource-id and bounds first; nodes left over are then
+    matched on class path and resource-id alone, so a moved element is reported as modified.
+    Only the requested ``attributes`` (and the parent link) are compared.
+    """
+    pairs: list[tuple[UiNode, UiNode]] = []
+    unmatched_base = list(base)
+    unmatched_current = list(current)
+    for key in (_strict_identity, _loose_identity):
+        candidates: dict[tuple, deque[UiNode]] = {}
+        for node in unmatched_base:
+            candidates.setdefault(key(node), deque()).append(node)
+        leftover = []
+        for node in unmatched_current:
+            bucket = candidates.get(key(node))
+            if bucket:
+                pairs.append((bucket.popleft(), node))
+            else:
+                leftover.append(node)
+        unmatched_current = leftover
+        paired = {id(old) for old, _ in pairs}
+        unmatched_base = [node for node in unmatched_base if id(node) not in paired]
+
+    modified = []
+    for old, new in pairs:
+        changes = {name: node_value(new, name) for name in attributes if node_value(old, name) != node_value(new, name)}
+        if old.parent_id != new.parent_id:
+            changes["parent"] = new.parent_id
+        if old.id != new.id:
+            changes["previous_id"] = old.id
+        if changes:
+            modified.append({"id": new.id, **changes})
+
+    return {
+        "format": DIFF_FORMAT,
+        "added": [_node_row(node, attributes) for node in unmatched_current],
+        "removed": [node.id for node in unmatched_base],
+        "modified": modified,
+        "unchanged": len(pairs) - len(modified),
+    }
+
+
+def _node_row(node: UiNode, attributes: list[str]) -> dict:
+    return {"id": node.id, "parent": node.parent_id, **{name: node_value(node, name) for name in attributes}}
+
+
+def _strict_identity(node: UiNode) -> tuple:
+    return node.class_path, node.attributes.get("resource-id", ""), node.bounds
+
+
+def _loose_identity(node: UiNode) -> tuple:
+    return node.class_path, node.attributes.get("resource-id", "")
@@ -1,18 +1,206 @@
-import xml.etree.ElementTree as ET
+import json
+from time import monotonic
+from xml.parsers import expat
+
+from errors import ValidationError
+from ui.hierarchy_nodes import diff_nodes, encode_compact, prune_nodes
+from ui.ui_state import HierarchySnapshot, UiStateTracker
+
+_CDATA_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"))
+_ATTRIBUTE_ESCAPES = _CDATA_ESCAPES + (("\"", "&quot;"), ("\r", "&#13;"), ("\n", "&#10;"), ("\t", "&#09;"))
 
 
 class HierarchyService:
     """Retrieves and filters uiautomator hierarchy dumps."""
 
-    @staticmethod
-    def get_filtered_dump(u2_device, attributes_to_keep: list[str]) -> str:
-        xml_dump = u2_device.dump_hierarchy(compressed=False)
-        root = ET.fromstring(xml_dump)
+    def __init__(self, snapshot_max_age_s: float = 2.0):
+        self._snapshot_max_age_s = snapshot_max_age_s
+
+    def render_dump(
+        self,
+        u2_device,
+        attributes_to_keep: list[str],
+        output_format: str = "xml",
+        compressed: bool = False,
+        ui_state: UiStateTracker | None = None,
+        force_refresh: bool = False,
+        max_bytes: int = 65536,
+        since_token: str | None = None,
+        include_token: bool = False,
+    ) -> str:
+        """Return a dump as filtered XML, compact JSON or, given ``since_token``, a diff.
+
+        Compact and diff output always carry the snapshot token; XML only with ``include_token``.
+        """
+        if since_token:
+            return self.get_dump_diff(
+                u2_device,
+                attributes_to_keep,
+                since_token,
+                ui_state=ui_state,
+                prune=output_format == "compact",
+                compressed=compressed,
+                force_refresh=force_refresh,
+            )
+        if output_format == "compact":
+            return self.get_compact_dump(
+                u2_device,
+                attributes_to_keep,
+                compressed=compressed,
+                ui_state=ui_state,
+                force_refresh=force_refresh,
+                max_bytes=max_bytes,
+            )
+        return self.get_filtered_dump(
+            u2_device,
+            attributes_to_keep,
+            compressed=compressed,
+            ui_state=ui_state,
+            force_refresh=force_refresh,
+            include_token=include_token,
+        )
+
+    def get_filtered_dump(
+        self,
+        u2_device,
+        attributes_to_keep: list[str],
+        compressed: bool = False,
+        ui_state: UiStateTracker | None = None,
+        force_refresh: bool = False,
+        include_token: bool = False,
+    ) -> str:
+        """Return the filtered XML; ``include_token`` adds ``snapshot-token`` to the root element."""
+        snapshot = self.get_snapshot(u2_device, compressed=compressed, ui_state=ui_state, force_refresh=force_refresh)
+        root_attributes = {"snapshot-token": snapshot.token} if include_token and ui_state is not None else None
+        return filter_hierarchy_xml(snapshot.xml, attributes_to_keep, root_attributes=root_attributes)
+
+    def get_compact_dump(
+        self,
+        u2_device,
+        attributes_to_keep: list[str],
+        compressed: bool = False,
+        ui_state: UiStateTracker | None = None,
+        force_refresh: bool = False,
+        max_bytes: int = 65536,
+    ) -> str:
+        """Return visible, meaningful nodes as an interned JSON table capped at ``max_bytes``."""
+        if max_bytes <= 0:
+            raise ValidationError("max_bytes must be > 0")
+        snapshot = self.get_snapshot(u2_device, compressed=compressed, ui_state=ui_state, force_refresh=force_refresh)
+        compact = encode_compact(snapshot.nodes, attributes_to_keep, max_bytes=max_bytes)
+        if ui_state is not None:
+            compact["token"] = snapshot.token
+        return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+    def get_dump_diff(
+        self,
+        u2_device,
+        attributes_to_keep: list[str],
+        since_token: str,
+        ui_state: UiStateTracker,
+        prune: bool = False,
+        compressed: bool = False,
+        force_refresh: bool = False,
+    ) -> str:
+        """Return nodes added, removed and modified since the snapshot identified by ``since_token``.
+
+        If that snapshot is no longer in the session's history, ``reset`` is set and every
+        current node is reported as added.
+        """
+        if ui_state is None:
+            raise ValidationError("Hierarchy diffs require a device session")
+        base = ui_state.snapshot_by_token(since_token)
+        snapshot = self.get_snapshot(u2_device, compressed=compressed, ui_state=ui_state, force_refresh=force_refresh)
+
+        current_nodes = prune_nodes(snapshot.nodes)[0] if prune else snapshot.nodes
+        if base is None:
+            base_nodes = []
+        else:
+            base_nodes = prune_nodes(base.nodes)[0] if prune else base.nodes
+        diff = diff_nodes(base_nodes, current_nodes, attributes_to_keep)
+        diff.update(base_token=since_token, token=snapshot.token, reset=base is None)
+        return json.dumps(diff, ensure_ascii=False, separators=(",", ":"))
+
+    def get_snapshot(
+        self,
+        u2_device,
+        compressed: bool = False,
+        ui_state: UiStateTracker | None = None,
+        force_refresh: bool = False,
+    ) -> HierarchySnapshot:
+        """Return a recent hierarchy snapshot, dumping the device only when the cached one is stale.
+
+        A snapshot is reused while no input action has bumped ``ui_state`` and it is younger than
+        ``snapshot_max_age_s``, which bounds staleness from changes the server did not cause.
+        """
+        if ui_state is not None and not force_refresh and self._snapshot_max_age_s > 0:
+            snapshot = ui_state.snapshot(compressed, self._snapshot_max_age_s)
+            if snapshot is not None:
+                return snapshot
+
+        generation = ui_state.generation if ui_state is not None else 0
+        captured_at = monotonic()
+        xml_dump = u2_device.dump_hierarchy(compressed=compressed)
+        if ui_state is None:
+            return HierarchySnapshot(xml=xml_dump, compressed=compressed, generation=0, captured_at=captured_at)
+        return ui_state.store(xml_dump, compressed, generation, captured_at)
+
+
+def filter_hierarchy_xml(xml_dump: str | bytes, attributes_to_keep, root_attributes: dict | None = None) -> str:
+    """Strip all but ``attributes_to_keep`` from every node in a single streaming pass.
+
+    The output is identical to parsing the dump with ElementTree, deleting attributes and
+    serializing it again, without building the tree. ``root_attributes`` are appended to the
+    root element.
+    """
+    keep = frozenset(attributes_to_keep)
+    parts: list[str] = []
+    extra_root_attributes = dict(root_attributes or {})
+    # True while the last start tag is still open, i.e. might turn out to be an empty element.
+    open_tag = False
+
+    def start_element(tag, attributes):
+        nonlocal open_tag
+        if open_tag:
+            parts.append(">")
+        parts.append("<" + tag)
+        for index in range(0, len(attributes), 2):
+            name = attributes[index]
+            if name in keep:
+                parts.append(f' {name}="{_escape(attributes[index + 1], _ATTRIBUTE_ESCAPES)}"')
+        if extra_root_attributes:
+            for name, value in extra_root_attributes.items():
+                parts.append(f' {name}="{_escape(value, _ATTRIBUTE_ESCAPES)}"')
+            extra_root_attributes.clear()
+        open_tag = True
+
+    def end_element(tag):
+        nonlocal open_tag
+        if open_tag:
+            parts.append(" />")
+            open_tag = False
+        else:
+            parts.append(f"</{tag}>")
+
+    def character_data(data):
+        nonlocal open_tag
+        if open_tag:
+            parts.append(">")
+            open_tag = False
+        parts.append(_escape(data, _CDATA_ESCAPES))
+
+    parser = expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    parser.Parse(xml_dump, True)
+    return "".join(parts)
 
-        for node in root.iter():
-            existing_attrs = list(node.attrib)
-            for attribute in existing_attrs:
-                if attribute not in attributes_to_keep:
-                    del node.attrib[attribute]
 
-        return ET.tostring(root, encoding="unicode")
+def _escape(value: str, escapes) -> str:
+    for character, replacement in escapes:
+        if character in value:
+            value = value.replace(character, replacement)
+    return value
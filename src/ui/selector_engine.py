@@ -0,0 +1,321 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from errors import ValidationError
+from ui.hierarchy_nodes import UiNode
+
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<op>//|/|\[|\]|\(|\)|,|!=|=|@|\*)|(?P<number>\d+)|'(?P<squote>[^']*)'|\"(?P<dquote>[^\"]*)\""
+    r"|(?P<name>[A-Za-z_][\w.$-]*))"
+)
+_STRING_FUNCTIONS = {
+    "contains": lambda value, argument: argument in value,
+    "starts-with": lambda value, argument: value.startswith(argument),
+    "ends-with": lambda value, argument: value.endswith(argument),
+    "matches": lambda value, argument: re.search(argument, value) is not None,
+}
+
+
+@dataclass(frozen=True)
+class _Token:
+    kind: str
+    value: str
+
+
+@dataclass(frozen=True)
+class _Step:
+    descendant: bool
+    name: str
+    # Each predicate is either a 1-based position or a callable taking a node.
+    predicates: tuple
+
+
+class XPathSelector:
+    """Evaluates a subset of XPath against parsed hierarchy nodes on the host.
+
+    Supported: ``/`` and ``//`` steps whose names match the full or short class name (``*`` and
+    ``node`` match any), positional predicates, ``@attr = 'v'``, ``!=``, ``contains``,
+    ``starts-with``, ``ends-with``, ``matches`` (regex), ``text()``, ``and``, ``or``, ``not()``.
+    As in XPath, positions count matching siblings, so ``//X[1]`` is the first ``X`` under
+    each parent rather than the first in the document.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._tokens = _tokenize(expression)
+        self._position = 0
+        self._steps = self._parse_path()
+
+    def select(self, nodes: list[UiNode]) -> list[UiNode]:
+        children: dict[str | None, list[UiNode]] = {}
+        for node in nodes:
+            children.setdefault(node.parent_id, []).append(node)
+        order = {node.id: position for position, node in enumerate(nodes)}
+
+        context: list[str | None] = [None]
+        steps = list(self._steps)
+        if steps and not steps[0].descendant and steps[0].name == "hierarchy" and not steps[0].predicates:
+            steps.pop(0)  # "/hierarchy" is the virtual root every dump starts with.
+
+        for step in steps:
+            selected: dict[str, UiNode] = {}
+            # "//X" is "/descendant-or-self::node()/X": it selects children of every node below the context.
+            parents = _descendant_or_self_ids(children, context) if step.descendant else context
+            for parent_id in parents:
+                candidates = [node for node in children.get(parent_id, []) if _name_matches(step.name, node)]
+                for predicate in step.predicates:
+                    if isinstance(predicate, int):
+                        candidates = candidates[predicate - 1 : predicate] if predicate > 0 else []
+                    else:
+                        candidates = [node for node in candidates if predicate(node)]
+                for node in candidates:
+                    selected[node.id] = node
+            context = sorted(selected, key=order.__getitem__)
+            if not context:
+                return []
+        selected_ids = set(context)
+        return [node for node in nodes if node.id in selected_ids]
+
+    def _parse_path(self) -> tuple[_Step, ...]:
+        steps = []
+        while self._peek() is not None:
+            axis = self._next()
+            if axis.value not in {"/", "//"}:
+                raise self._error(f"expected '/' or '//' but found {axis.value!r}")
+            name = self._next()
+            if name.kind != "name" and name.value != "*":
+                raise self._error("expected a class name or '*'")
+            predicates = []
+            while self._accept("["):
+                token = self._peek()
+                if token is not None and token.kind == "number":
+                    predicates.append(int(self._next().value))
+                else:
+                    predicates.append(self._parse_or())
+                self._expect("]")
+            steps.append(_Step(descendant=axis.value == "//", name=name.value, predicates=tuple(predicates)))
+        if not steps:
+            raise self._error("empty expression")
+        return tuple(steps)
+
+    def _parse_or(self):
+        terms = [self._parse_and()]
+        while self._accept_name("or"):
+            terms.append(self._parse_and())
+        return terms[0] if len(terms) == 1 else lambda node: any(term(node) for term in terms)
+
+    def _parse_and(self):
+        terms = [self._parse_unary()]
+        while self._accept_name("and"):
+            terms.append(self._parse_unary())
+        return terms[0] if len(terms) == 1 else lambda node: all(term(node) for term in terms)
+
+    def _parse_unary(self):
+        if self._accept("("):
+            expression = self._parse_or()
+            self._expect(")")
+            return expression
+        token = self._peek()
+        if token is not None and token.kind == "name" and token.value in {"not", *_STRING_FUNCTIONS}:
+            function_name = self._next().value
+            self._expect("(")
+            if function_name == "not":
+                inner = self._parse_or()
+                self._expect(")")
+                return lambda node: not inner(node)
+            attribute = self._parse_attribute()
+            self._expect(",")
+            argument = self._parse_string()
+            self._expect(")")
+            if function_name == "matches":
+                _compile_regex(argument)
+            check = _STRING_FUNCTIONS[function_name]
+            return lambda node: check(node.attributes.get(attribute, ""), argument)
+
+        attribute = self._parse_attribute()
+        if self._accept("="):
+            expected = self._parse_string()
+            return lambda node: node.attributes.get(attribute, "") == expected
+        if self._accept("!="):
+            unexpected = self._parse_string()
+            return lambda node: node.attributes.get(attribute, "") != unexpected
+        return lambda node: bool(node.attributes.get(attribute))
+
+    def _parse_attribute(self) -> str:
+        if self._accept("@"):
+            token = self._next()
+            if token.kind != "name":
+                raise self._error("expected an attribute name after '@'")
+            return token.value
+        if self._accept_name("text"):
+            self._expect("(")
+            self._expect(")")
+            return "text"
+        raise self._error("expected '@attribute' or 'text()'")
+
+    def _parse_string(self) -> str:
+        token = self._next()
+        if token.kind != "string":
+            raise self._error("expected a quoted string")
+        return token.value
+
+    def _peek(self) -> _Token | None:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> _Token:
+        token = self._peek()
+        if token is None:
+            raise self._error("unexpected end of expression")
+        self._position += 1
+        return token
+
+    def _accept(self, value: str) -> bool:
+        token = self._peek()
+        if token is not None and token.kind == "op" and token.value == value:
+            self._position += 1
+            return True
+        return False
+
+    def _accept_name(self, value: str) -> bool:
+        token = self._peek()
+        if token is not None and token.kind == "name" and token.value == value:
+            self._position += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        if not self._accept(value):
+            raise self._error(f"expected {value!r}")
+
+    def _error(self, message: str) -> ValidationError:
+        return ValidationError(f"Invalid xpath {self.expression!r}: {message}")
+
+
+@dataclass(frozen=True)
+class UiSelector:
+    """Conjunction of element criteria resolved against a hierarchy snapshot.
+
+    With ``regex`` set, ``text``, ``resource_id``, ``content_desc`` and ``class_name`` are
+    regular expressions that must match the whole attribute value. ``index`` picks the n-th
+    (0-based) matching element.
+    """
+
+    text: str | None = None
+    resource_id: str | None = None
+    content_desc: str | None = None
+    class_name: str | None = None
+    xpath: str | None = None
+    index: int | None = None
+    regex: bool = False
+
+    def __post_init__(self):
+        if not any([self.text, self.resource_id, self.content_desc, self.class_name, self.xpath]):
+            raise ValidationError(
+                "At least one selector must be provided: text, resource_id, content_desc, class_name, xpath"
+            )
+        if self.index is not None and self.index < 0:
+            raise ValidationError("index must be >= 0")
+        if self.regex:
+            for value in self._attribute_criteria().values():
+                _compile_regex(value)
+        if self.xpath:
+            compile_xpath(self.xpath)
+
+    @property
+    def label(self) -> str:
+        parts = [
+            f"{name}={value}"
+            for name, value in (
+                ("text", self.text),
+                ("resource_id", self.resource_id),
+                ("content_desc", self.content_desc),
+                ("class_name", self.class_name),
+                ("xpath", self.xpath),
+                ("index", self.index),
+            )
+            if value is not None and value != ""
+        ]
+        return ", ".join(parts) + (" (regex)" if self.regex else "")
+
+    def select(self, nodes: list[UiNode]) -> list[UiNode]:
+        """Return matching elements that occupy screen area, in document order."""
+        candidates = compile_xpath(self.xpath).select(nodes) if self.xpath else nodes
+        criteria = self._attribute_criteria()
+        if self.regex:
+            patterns = [(attribute, re.compile(value)) for attribute, value in criteria.items()]
+
+            def matches_criteria(node):
+                return all(pattern.fullmatch(node.attributes.get(attribute, "")) for attribute, pattern in patterns)
+        else:
+
+            def matches_criteria(node):
+                return all(node.attributes.get(attribute, "") == value for attribute, value in criteria.items())
+
+        matches = [node for node in candidates if node.has_area and matches_criteria(node)]
+        if self.index is not None:
+            return matches[self.index : self.index + 1]
+        return matches
+
+    def _attribute_criteria(self) -> dict[str, str]:
+        criteria = {
+            "text": self.text,
+            "resource-id": self.resource_id,
+            "content-desc": self.content_desc,
+            "class": self.class_name,
+        }
+        return {attribute: value for attribute, value in criteria.items() if value}
+
+
+@lru_cache(maxsize=256)
+def compile_xpath(expression: str) -> XPathSelector:
+    return XPathSelector(expression)
+
+
+def _tokenize(expression: str) -> list[_Token]:
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValidationError(f"Invalid xpath {expression!r}: unexpected character at {position}")
+        position = match.end()
+        if match.group("op") is not None:
+            tokens.append(_Token("op", match.group("op")))
+        elif match.group("number") is not None:
+            tokens.append(_Token("number", match.group("number")))
+        elif match.group("squote") is not None or match.group("dquote") is not None:
+            value = match.group("squote") if match.group("squote") is not None else match.group("dquote")
+            tokens.append(_Token("string", value))
+        elif match.group("name") is not None:
+            tokens.append(_Token("name", match.group("name")))
+    return tokens
+
+
+def _descendant_or_self_ids(children: dict, context: list[str | None]) -> list[str | None]:
+    result = []
+    seen = set()
+    stack = list(reversed(context))
+    while stack:
+        node_id = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        result.append(node_id)
+        stack.extend(reversed([node.id for node in children.get(node_id, [])]))
+    return result
+
+
+def _name_matches(name: str, node: UiNode) -> bool:
+    if name in {"*", "node"}:
+        return True
+    class_name = node.attributes.get("class", "")
+    return class_name == name or class_name.rsplit(".", 1)[-1] == name
+
+
+def _compile_regex(pattern: str):
+    try:
+        return re.compile(pattern)
+    except re.error as error:
+        raise ValidationError(f"Invalid regular expression {pattern!r}: {error}") from error
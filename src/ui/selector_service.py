@@ -1,40 +1,75 @@
-from errors import UiElementNotFoundError, ValidationError
+import time
+
+from errors import UiElementNotFoundError
+from ui.hierarchy_nodes import UiNode
+from ui.interaction_service import invalidates_ui
+from ui.selector_engine import UiSelector
 
 
 class SelectorService:
-    """Finds UI elements by selector and performs high-level actions."""
+    """Finds UI elements by selector and performs high-level actions.
+
+    Selectors are resolved on the host against hierarchy snapshots, so a click costs one dump
+    (often served from the session's snapshot) and one coordinate tap. While the element is
+    missing, the dump is polled with exponential backoff until ``timeout_s``.
+    """
+
+    def __init__(self, hierarchy_service, poll_initial_s: float = 0.1, poll_max_s: float = 1.0, sleep=time.sleep):
+        self._hierarchy_service = hierarchy_service
+        self._poll_initial_s = poll_initial_s
+        self._poll_max_s = poll_max_s
+        self._sleep = sleep
+
+    def find(self, u2_device, selector: UiSelector, timeout_s: float = 10.0, ui_state=None) -> UiNode:
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        delay = self._poll_initial_s
+        # Without session state every lookup dumps the device anyway.
+        force_refresh = ui_state is None
+        while True:
+            snapshot = self._hierarchy_service.get_snapshot(u2_device, ui_state=ui_state, force_refresh=force_refresh)
+            matches = selector.select(snapshot.nodes)
+            # Shell commands bump the generation without taking the UI lock, so the screen may have
+            # changed while this snapshot was matched; never act on a match from an older generation.
+            current = ui_state is None or snapshot.generation == ui_state.generation
+            if matches and current:
+                return matches[0]
+            if not force_refresh:
+                # The first lookup may have used a cached snapshot; confirm against a fresh dump.
+                force_refresh = True
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise UiElementNotFoundError(f"UI element not found for selector {selector.label}")
+            if current:
+                self._sleep(min(delay, remaining))
+                delay = min(delay * 2, self._poll_max_s)
 
-    @staticmethod
     def click(
+        self,
         u2_device,
         text: str | None = None,
         resource_id: str | None = None,
         content_desc: str | None = None,
+        class_name: str | None = None,
+        xpath: str | None = None,
+        index: int | None = None,
+        regex: bool = False,
         timeout_s: float = 10.0,
+        ui_state=None,
     ) -> str:
-        selectors = [bool(text), bool(resource_id), bool(content_desc)]
-        if sum(selectors) != 1:
-            raise ValidationError("Exactly one selector must be provided: text, resource_id, content_desc")
-
-        if text:
-            obj = u2_device(text=text)
-            selector_label = f"text={text}"
-        elif resource_id:
-            obj = u2_device(resourceId=resource_id)
-            selector_label = f"resource_id={resource_id}"
-        else:
-            obj = u2_device(description=content_desc)
-            selector_label = f"content_desc={content_desc}"
-
-        found = False
-        if hasattr(obj, "wait"):
-            found = bool(obj.wait(timeout=timeout_s))
-        elif hasattr(obj, "exists"):
-            exists = obj.exists
-            found = bool(exists() if callable(exists) else exists)
-
-        if not found:
-            raise UiElementNotFoundError(f"UI element not found for selector {selector_label}")
-
-        obj.click()
-        return f"Clicked element with selector {selector_label}"
+        selector = UiSelector(
+            text=text,
+            resource_id=resource_id,
+            content_desc=content_desc,
+            class_name=class_name,
+            xpath=xpath,
+            index=index,
+            regex=regex,
+        )
+        node = self.find(u2_device, selector, timeout_s=timeout_s, ui_state=ui_state)
+        left, top, right, bottom = node.bounds
+        x, y = (left + right) // 2, (top + bottom) // 2
+        with invalidates_ui(ui_state):
+            u2_device.click(x, y)
+        return f"Clicked element with selector {selector.label} at ({x}, {y})"
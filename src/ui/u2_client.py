@@ -2,8 +2,16 @@ import uiautomator2 as u2
 
 
 class U2ClientProvider:
-    """Creates uiautomator2 device connections."""
+    """Creates uiautomator2 device connections.
 
-    @staticmethod
-    def connect(serial: str):
-        return u2.connect(serial)
+    With an ``adb_provider`` devices are connected through its adbutils client, so uiautomator2
+    talks to the configured adb server instead of the library default.
+    """
+
+    def __init__(self, adb_provider=None):
+        self._adb_provider = adb_provider
+
+    def connect(self, serial: str):
+        if self._adb_provider is None:
+            return u2.connect(serial)
+        return u2.connect(self._adb_provider.adbutils_device(serial))
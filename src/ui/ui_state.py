@@ -0,0 +1,86 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from threading import Lock
+from time import monotonic
+
+from ui.hierarchy_nodes import UiNode, parse_hierarchy_nodes
+
+
+@dataclass(frozen=True)
+class HierarchySnapshot:
+    xml: str
+    compressed: bool
+    generation: int
+    captured_at: float
+
+    @cached_property
+    def token(self) -> str:
+        """Content-derived identifier clients pass back to request a diff against this snapshot."""
+        return hashlib.blake2b(self.xml.encode(), digest_size=8).hexdigest()
+
+    @cached_property
+    def nodes(self) -> list[UiNode]:
+        """Parsed nodes, computed once per snapshot and shared by every reader."""
+        return parse_hierarchy_nodes(self.xml)
+
+
+class UiStateTracker:
+    """Tracks a session's UI generation and the hierarchy snapshots taken in it.
+
+    Input actions ``bump`` the generation, which invalidates every snapshot taken before them.
+    """
+
+    def __init__(self, history_size: int = 8):
+        self._generation = 0
+        self._snapshots: dict[bool, HierarchySnapshot] = {}
+        # Recent snapshots by token, kept across generations as bases for diffs.
+        self._history: OrderedDict[str, HierarchySnapshot] = OrderedDict()
+        self._history_size = max(1, history_size)
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def bump(self) -> int:
+        with self._lock:
+            self._generation += 1
+            self._snapshots.clear()
+            return self._generation
+
+    def snapshot(self, compressed: bool, max_age_s: float, now: float | None = None) -> HierarchySnapshot | None:
+        """Return the current-generation snapshot if it is at most ``max_age_s`` old."""
+        current = monotonic() if now is None else now
+        with self._lock:
+            snapshot = self._snapshots.get(compressed)
+            if snapshot is None or current - snapshot.captured_at > max_age_s:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return snapshot
+
+    def store(self, xml: str, compressed: bool, generation: int, captured_at: float) -> HierarchySnapshot:
+        """Keep a dump taken at ``generation`` unless an action has bumped the generation since."""
+        snapshot = HierarchySnapshot(xml=xml, compressed=compressed, generation=generation, captured_at=captured_at)
+        token = snapshot.token
+        with self._lock:
+            if generation == self._generation:
+                self._snapshots[compressed] = snapshot
+            self._history[token] = snapshot
+            self._history.move_to_end(token)
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+        return snapshot
+
+    def snapshot_by_token(self, token: str) -> HierarchySnapshot | None:
+        with self._lock:
+            return self._history.get(token)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"generation": self._generation, "snapshot_hits": self._hits, "snapshot_misses": self._misses}
@@ -0,0 +1,121 @@
+import base64
+import unittest
+from types import SimpleNamespace
+
+from app.action_runner import ActionRunner
+from errors import ValidationError
+from ui.hierarchy_service import HierarchyService
+from ui.interaction_service import InteractionService
+from ui.selector_service import SelectorService
+from ui.ui_state import UiStateTracker
+
+SCREEN = """<hierarchy rotation="0">
+  <node index="0" text="" resource-id="com.example:id/email" class="android.widget.EditText" clickable="true"
+        bounds="[0,0][1000,100]" />
+</hierarchy>
+"""
+
+
+class FakeU2Device:
+    def __init__(self):
+        self.calls = []
+
+    def click(self, x, y):
+        self.calls.append(("click", x, y))
+
+    def swipe(self, x1, y1, x2, y2, duration):
+        self.calls.append(("swipe", x1, y1, x2, y2, duration))
+
+    def send_keys(self, text, clear=False):
+        self.calls.append(("send_keys", text, clear))
+
+    def press(self, key):
+        self.calls.append(("press", key))
+
+    def dump_hierarchy(self, compressed=False):
+        self.calls.append(("dump",))
+        return SCREEN
+
+
+class FakeScreenService:
+    def __init__(self):
+        self.frame_grabbers = []
+
+    def capture_png_bytes(self, device, scale_factor=0.4, cache=None, frame_grabber=None):
+        self.frame_grabbers.append(frame_grabber)
+        return b"\x89PNG"
+
+
+class ActionRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        hierarchy_service = HierarchyService(snapshot_max_age_s=60.0)
+        self.runner = ActionRunner(
+            InteractionService(),
+            SelectorService(hierarchy_service, sleep=self.sleeps.append),
+            hierarchy_service,
+            FakeScreenService(),
+            sleep=self.sleeps.append,
+        )
+        self.device = FakeU2Device()
+        self.session = SimpleNamespace(
+            u2_device=self.device, adb_device=object(), ui_state=UiStateTracker(), screenshot_cache=None
+        )
+
+    def test_runs_steps_in_order_with_results_and_timings(self):
+        result = self.runner.run(
+            self.session,
+            [
+                {"action": "click", "resource_id": "com.example:id/email"},
+                {"action": "send_text", "text_to_send": "me@example.com"},
+                {"action": "wait", "seconds": 0.25},
+                {"action": "system_action", "system_action": "BACK"},
+                {"action": "screenshot"},
+            ],
+        )
+
+        self.assertEqual((result["completed"], result["failed"], result["skipped"]), (5, 0, 0))
+        self.assertEqual(
+            self.device.calls,
+            [("dump",), ("click", 500, 50), ("send_keys", "me@example.com", False), ("press", "back")],
+        )
+        self.assertEqual(self.sleeps, [0.25])
+        self.assertEqual(base64.b64decode(result["steps"][4]["result"]["data"]), b"\x89PNG")
+        self.assertTrue(all(step["duration_ms"] >= 0 for step in result["steps"]))
+        self.assertEqual(self.session.ui_state.generation, 3)
+
+    def test_stop_on_error_skips_remaining_steps(self):
+        steps = [
+            {"action": "tap", "x": 1},
+            {"action": "tap", "x": 1, "y": 2},
+        ]
+        stopped = self.runner.run(self.session, steps)
+        self.assertEqual([step["status"] for step in stopped["steps"]], ["error", "skipped"])
+        self.assertIn("requires 'y'", stopped["steps"][0]["error"])
+        self.assertEqual((stopped["steps"][0]["error_kind"], stopped["error_kind"]), ("caller", "caller"))
+
+        continued = self.runner.run(self.session, steps, stop_on_error=False)
+        self.assertEqual([step["status"] for step in continued["steps"]], ["error", "ok"])
+
+    def test_dump_and_wait_for_selector(self):
+        result = self.runner.run(
+            self.session,
+            [
+                {"action": "wait", "class_name": "android.widget.EditText", "timeout_s": 1},
+                {"action": "dump", "returned_attributes": "resource-id", "output_format": "compact"},
+            ],
+        )
+        self.assertEqual(result["completed"], 2)
+        self.assertIn("com.example:id/email", result["steps"][1]["result"])
+        self.assertEqual(self.device.calls, [("dump",)])
+
+    def test_invalid_scripts_are_rejected_before_running(self):
+        with self.assertRaises(ValidationError):
+            self.runner.run(self.session, [])
+        with self.assertRaises(ValidationError):
+            self.runner.run(self.session, [{"action": "tap", "x": 1, "y": 1}, {"action": "reboot"}])
+        self.assertEqual(self.device.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
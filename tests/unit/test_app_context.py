@@ -1,7 +1,12 @@
+import asyncio
 import unittest
 from types import SimpleNamespace
 
+from adb.shell_channel import ShellChannelError
 from app.context import AppContext
+from errors import DeviceUnavailableError, ValidationError
+from orchestration.circuit_breaker import OPEN, DeviceCircuitBreaker
+from shared.metrics import RESOLVE, LatencyMetrics
 
 
 class FakeSessionManager:
@@ -10,8 +15,10 @@ class FakeSessionManager:
         self.get_calls = 0
         self.clear_calls = 0
         self.retryable = True
+        self.in_memory = True
+        self.resolve_calls = 0
 
-    def get_session(self, serial):
+    def lease_session(self, serial):
         session = self.sessions[min(self.get_calls, len(self.sessions) - 1)]
         self.get_calls += 1
         return session
@@ -23,17 +30,42 @@ class FakeSessionManager:
     def should_retry_after_error(self, error):
         return self.retryable
 
+    def resolve_serial(self, serial):
+        self.resolve_calls += 1
+        return serial or "A"
+
+    def resolves_in_memory(self):
+        return self.in_memory
+
 
 class FakeExecutor:
     def __init__(self):
         self.calls = 0
+        self.offloaded = []
 
-    def run(self, session, operation, requires_ui_lock=False):
+    def run(self, session, operation, requires_ui_lock=False, priority=None, leased=False):
         self.calls += 1
         if self.calls == 1:
             raise RuntimeError("uiautomator transport error")
         return operation(session)
 
+    async def run_async(self, session, operation, requires_ui_lock=False, priority=None, leased=False):
+        return self.run(session, operation, requires_ui_lock=requires_ui_lock)
+
+    async def call_async(self, func, *args, key=None, priority=None, phase=None):
+        self.offloaded.append(func.__name__)
+        return func(*args)
+
+
+class FailingExecutor(FakeExecutor):
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+    def run(self, session, operation, requires_ui_lock=False, priority=None, leased=False):
+        self.calls += 1
+        raise self.error
+
 
 class AppContextTest(unittest.TestCase):
     def test_run_for_device_retries_once_on_transient_error(self):
@@ -58,6 +90,105 @@ class AppContextTest(unittest.TestCase):
         self.assertEqual(executor.calls, 1)
         self.assertEqual(session_manager.clear_calls, 0)
 
+    def test_run_for_device_async_retries_once_on_transient_error(self):
+        session_manager = FakeSessionManager()
+        executor = FakeExecutor()
+        ctx = AppContext(session_manager=session_manager, executor=executor)
+
+        result = asyncio.run(ctx.run_for_device_async("A", lambda s: f"ok:{s.serial}"))
+
+        self.assertEqual(result, "ok:A")
+        self.assertEqual(executor.calls, 2)
+        self.assertEqual(session_manager.get_calls, 2)
+        self.assertEqual(session_manager.clear_calls, 1)
+
+    def test_operations_that_must_not_repeat_are_not_retried_but_still_reach_the_breaker(self):
+        session_manager = FakeSessionManager()
+        executor = FailingExecutor(ShellChannelError("shell channel closed mid-batch"))
+        breaker = DeviceCircuitBreaker(failure_threshold=1)
+        ctx = AppContext(session_manager=session_manager, executor=executor, circuit_breaker=breaker)
+
+        with self.assertRaises(ShellChannelError):
+            asyncio.run(ctx.run_for_device_async("A", lambda s: s.serial, retry=False))
+
+        self.assertEqual(executor.calls, 1)
+        self.assertEqual(session_manager.clear_calls, 0)
+        self.assertEqual(breaker.state("A"), OPEN)
+
+    def test_device_failures_open_the_circuit_and_later_calls_fail_fast(self):
+        session_manager = FakeSessionManager()
+        session_manager.retryable = False
+        executor = FailingExecutor(TimeoutError("wait timed out"))
+        breaker = DeviceCircuitBreaker(failure_threshold=2, reset_timeout_s=60.0)
+        ctx = AppContext(session_manager=session_manager, executor=executor, circuit_breaker=breaker)
+
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                asyncio.run(ctx.run_for_device_async(None, lambda s: s.serial))
+        self.assertEqual(breaker.state("A"), OPEN)
+
+        with self.assertRaises(DeviceUnavailableError):
+            asyncio.run(ctx.run_for_device_async("A", lambda s: s.serial))
+        self.assertEqual(executor.calls, 2)
+        self.assertEqual(session_manager.get_calls, 2)
+
+    def test_serial_resolution_runs_off_the_loop_unless_the_inventory_is_synced(self):
+        session_manager = FakeSessionManager()
+        executor = FakeExecutor()
+        executor.calls = 1
+        ctx = AppContext(session_manager=session_manager, executor=executor, circuit_breaker=DeviceCircuitBreaker())
+
+        asyncio.run(ctx.run_for_device_async(None, lambda s: s.serial))
+        self.assertNotIn("_admit", executor.offloaded)
+
+        session_manager.in_memory = False
+        asyncio.run(ctx.run_for_device_async(None, lambda s: s.serial))
+        self.assertIn("_admit", executor.offloaded)
+
+    def test_serial_is_resolved_once_and_timed_under_the_resolved_serial(self):
+        session_manager = FakeSessionManager()
+        executor = FakeExecutor()
+        executor.calls = 1
+        ctx = AppContext(session_manager=session_manager, executor=executor)
+        metrics = LatencyMetrics()
+
+        async def call():
+            with metrics.track_call("tool") as timings:
+                await ctx.run_for_device_async(None, lambda s: s.serial)
+                return timings
+
+        timings = asyncio.run(call())
+
+        self.assertEqual(session_manager.resolve_calls, 1)
+        self.assertEqual(list(timings.device_phases()), ["A"])
+        self.assertIn(RESOLVE, timings.device_phases()["A"])
+
+    def test_caller_errors_do_not_count_against_the_device(self):
+        session_manager = FakeSessionManager()
+        session_manager.retryable = False
+        breaker = DeviceCircuitBreaker(failure_threshold=1)
+        ctx = AppContext(
+            session_manager=session_manager,
+            executor=FailingExecutor(ValidationError("bad selector")),
+            circuit_breaker=breaker,
+        )
+
+        with self.assertRaises(ValidationError):
+            ctx.run_for_device("A", lambda s: s.serial)
+        self.assertEqual(breaker.stats()["devices"], {})
+
+    def test_device_faults_reported_in_the_result_count_against_the_device(self):
+        session_manager = FakeSessionManager()
+        executor = FakeExecutor()
+        executor.calls = 1
+        breaker = DeviceCircuitBreaker(failure_threshold=1)
+        ctx = AppContext(session_manager=session_manager, executor=executor, circuit_breaker=breaker)
+
+        result = ctx.run_for_device("A", lambda s: {"failed": 2, "error_kind": "connection"})
+
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual(breaker.state("A"), OPEN)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from adb.shell_channel import ShellChannelError
+from adb.wire_client import AdbWireError
+from errors import (
+    DeviceResolutionError,
+    DeviceUnavailableError,
+    ErrorKind,
+    UiElementNotFoundError,
+    ValidationError,
+    classify_error,
+)
+from orchestration.circuit_breaker import CLOSED, HALF_OPEN, OPEN, DeviceCircuitBreaker
+
+
+class ClassifyErrorTest(unittest.TestCase):
+    def test_classifies_by_exception_type(self):
+        cases = [
+            (ValidationError("bad selector"), ErrorKind.CALLER),
+            (UiElementNotFoundError("no match"), ErrorKind.CALLER),
+            (DeviceResolutionError("Unable to create session for A"), ErrorKind.DEVICE_UNAVAILABLE),
+            (AdbWireError("device 'A' not found"), ErrorKind.DEVICE_UNAVAILABLE),
+            (AdbWireError("adb server closed the connection"), ErrorKind.CONNECTION),
+            (ShellChannelError("Shell channel is closed"), ErrorKind.CONNECTION),
+            (ConnectionResetError(), ErrorKind.CONNECTION),
+            (TimeoutError("wait timed out"), ErrorKind.TIMEOUT),
+            (RuntimeError("adb rpc timeout in message only"), ErrorKind.UNKNOWN),
+        ]
+        for error, kind in cases:
+            with self.subTest(error=repr(error)):
+                self.assertEqual(classify_error(error), kind)
+
+    def test_only_connection_errors_are_retryable(self):
+        self.assertEqual([kind for kind in ErrorKind if kind.retryable], [ErrorKind.CONNECTION])
+        self.assertFalse(ErrorKind.CALLER.device_fault)
+        self.assertTrue(ErrorKind.TIMEOUT.device_fault)
+
+
+class DeviceCircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_threshold_and_fails_fast(self):
+        breaker = DeviceCircuitBreaker(failure_threshold=2, reset_timeout_s=10.0)
+        breaker.record_failure("A", TimeoutError("slow"), now=0.0)
+        breaker.allow("A", now=0.0)
+        breaker.record_failure("A", TimeoutError("slow"), now=1.0)
+
+        self.assertEqual(breaker.state("A"), OPEN)
+        with self.assertRaisesRegex(DeviceUnavailableError, "2 consecutive failures"):
+            breaker.allow("A", now=5.0)
+        breaker.allow("B", now=5.0)
+        self.assertEqual(breaker.stats(now=5.0)["devices"]["A"]["rejected"], 1)
+
+    def test_success_resets_failure_count(self):
+        breaker = DeviceCircuitBreaker(failure_threshold=2)
+        breaker.record_failure("A", "boom", now=0.0)
+        breaker.record_success("A")
+        breaker.record_failure("A", "boom", now=1.0)
+        self.assertEqual(breaker.state("A"), CLOSED)
+
+    def test_probe_claims_half_open_trial_and_backs_off_on_failure(self):
+        breaker = DeviceCircuitBreaker(failure_threshold=1, reset_timeout_s=10.0, max_reset_timeout_s=15.0)
+        breaker.record_failure("A", "offline", now=0.0)
+
+        self.assertEqual(breaker.claim_probes(now=5.0), [])
+        self.assertEqual(breaker.claim_probes(now=10.0), ["A"])
+        self.assertEqual(breaker.state("A"), HALF_OPEN)
+        with self.assertRaises(DeviceUnavailableError):
+            breaker.allow("A", now=10.0)
+
+        breaker.record_failure("A", "still offline", now=10.0)
+        self.assertEqual(breaker.state("A"), OPEN)
+        self.assertEqual(breaker.stats(now=10.0)["devices"]["A"]["retry_in_s"], 15.0)
+
+        self.assertEqual(breaker.claim_probes(now=25.0), ["A"])
+        breaker.record_success("A")
+        self.assertEqual(breaker.state("A"), CLOSED)
+
+    def test_call_becomes_the_trial_and_release_reopens(self):
+        breaker = DeviceCircuitBreaker(failure_threshold=1, reset_timeout_s=1.0)
+        breaker.record_failure("A", "offline", now=0.0)
+
+        breaker.allow("A", now=2.0)
+        self.assertEqual(breaker.state("A"), HALF_OPEN)
+        breaker.release("A")
+        self.assertEqual(breaker.state("A"), OPEN)
+        breaker.allow("A", now=2.0)
+
+    def test_disabled_breaker_never_opens_and_reattach_resets(self):
+        disabled = DeviceCircuitBreaker(failure_threshold=0)
+        disabled.record_failure("A", "offline")
+        disabled.allow("A")
+
+        breaker = DeviceCircuitBreaker(failure_threshold=1)
+        breaker.record_failure("A", "offline")
+        breaker.handle_device_event("A", present=True)
+        self.assertEqual(breaker.state("A"), CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from threading import Event
+
+from adb.device_inventory import DeviceInventory
+
+
+class FakeTrackingProvider:
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.done = Event()
+
+    def track_devices(self):
+        yield from self.snapshots
+        self.done.set()
+        Event().wait()
+
+
+class DeviceInventoryTest(unittest.TestCase):
+    def test_inventory_not_synced_before_first_snapshot(self):
+        inventory = DeviceInventory(FakeTrackingProvider([]))
+        self.assertFalse(inventory.is_synced())
+        self.assertEqual(inventory.serials(), [])
+
+    def test_inventory_lists_only_online_devices(self):
+        inventory = DeviceInventory(FakeTrackingProvider([]))
+        inventory.apply_snapshot({"A": "device", "B": "unauthorized", "C": "offline"})
+        self.assertTrue(inventory.is_synced())
+        self.assertEqual(inventory.serials(), ["A"])
+        self.assertTrue(inventory.contains("A"))
+        self.assertFalse(inventory.contains("B"))
+
+    def test_inventory_notifies_attach_and_detach(self):
+        events = []
+        inventory = DeviceInventory(FakeTrackingProvider([]))
+        inventory.add_listener(lambda serial, present: events.append((serial, present)))
+
+        inventory.apply_snapshot({"A": "device"})
+        inventory.apply_snapshot({"A": "device", "B": "device"})
+        inventory.apply_snapshot({"B": "offline"})
+
+        self.assertEqual(events, [("A", True), ("B", True), ("A", False), ("B", False)])
+
+    def test_inventory_listener_errors_do_not_stop_notifications(self):
+        events = []
+        inventory = DeviceInventory(FakeTrackingProvider([]))
+
+        def failing_listener(serial, present):
+            raise RuntimeError("boom")
+
+        inventory.add_listener(failing_listener)
+        inventory.add_listener(lambda serial, present: events.append(serial))
+        inventory.apply_snapshot({"A": "device"})
+        self.assertEqual(events, ["A"])
+
+    def test_inventory_watcher_applies_tracked_snapshots(self):
+        provider = FakeTrackingProvider([{"A": "device"}, {"A": "device", "B": "device"}])
+        inventory = DeviceInventory(provider)
+        inventory.start()
+        try:
+            self.assertTrue(provider.done.wait(1.0))
+            self.assertEqual(inventory.serials(), ["A", "B"])
+        finally:
+            inventory.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import threading
+import time
+import unittest
+
+from adb.device_manager import DeviceManager
+
+
+class FakeDevice:
+    def __init__(self, serial, model="Pixel 8", version="14", fail_shell=False, delay_s=0.0):
+        self.serial = serial
+        self.model = model
+        self.version = version
+        self.fail_shell = fail_shell
+        self.delay_s = delay_s
+        self.shell_calls = 0
+        self.threads = set()
+        self.state = "device"
+
+    def get_state(self):
+        return self.state
+
+    def shell(self, command):
+        self.shell_calls += 1
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay_s)
+        if self.fail_shell:
+            raise RuntimeError("closed")
+        return f"model={self.model}\nandroid_version={self.version}\nnoise line\nother=ignored\n"
+
+
+class FakeClientProvider:
+    def __init__(self, devices):
+        self.devices = {device.serial: device for device in devices}
+
+    def list_devices(self):
+        return list(self.devices.values())
+
+    def get_device(self, serial):
+        return self.devices[serial]
+
+
+class FakeInventory:
+    def __init__(self, states):
+        self.states_by_serial = states
+
+    def is_synced(self):
+        return True
+
+    def serials(self):
+        return sorted(serial for serial, state in self.states_by_serial.items() if state == "device")
+
+    def states(self):
+        return dict(self.states_by_serial)
+
+
+class DeviceManagerTest(unittest.TestCase):
+    def test_properties_are_parsed_from_one_shell_round_trip(self):
+        device = FakeDevice("A", model="SM-G991B = Galaxy")
+        manager = DeviceManager(FakeClientProvider([device]))
+
+        info = manager.get_device_info("A")
+
+        self.assertEqual((info.model, info.android_version, info.state), ("SM-G991B = Galaxy", "14", "device"))
+        self.assertEqual(device.shell_calls, 1)
+
+    def test_failed_probe_falls_back_to_empty_metadata(self):
+        manager = DeviceManager(FakeClientProvider([FakeDevice("A", fail_shell=True)]))
+        info = manager.get_device_info("A")
+        self.assertEqual((info.serial, info.model, info.android_version), ("A", None, None))
+
+    def test_devices_are_probed_concurrently(self):
+        devices = [FakeDevice(serial, delay_s=0.1) for serial in "ABCD"]
+        manager = DeviceManager(FakeClientProvider(devices), max_workers=4)
+
+        started_at = time.monotonic()
+        infos = manager.list_devices()
+
+        self.assertLess(time.monotonic() - started_at, 0.3)
+        self.assertEqual([info.serial for info in infos], ["A", "B", "C", "D"])
+        self.assertEqual(len(set().union(*(device.threads for device in devices))), 4)
+
+    def test_cache_hits_expire_and_prune_detached_devices(self):
+        a, b = FakeDevice("A"), FakeDevice("B")
+        provider = FakeClientProvider([a, b])
+        manager = DeviceManager(provider, info_ttl_s=0.05)
+
+        manager.list_devices()
+        manager.list_devices()
+        self.assertEqual((a.shell_calls, b.shell_calls), (1, 1))
+
+        time.sleep(0.08)
+        manager.get_device_info("A")
+        self.assertEqual(a.shell_calls, 2)
+
+        del provider.devices["B"]
+        manager.list_devices()
+        self.assertIsNone(manager.get_device_info("B"))
+        self.assertEqual(b.shell_calls, 1)
+
+    def test_state_is_read_live_while_properties_are_cached(self):
+        device = FakeDevice("A")
+        manager = DeviceManager(FakeClientProvider([device]))
+        manager.get_device_info("A")
+
+        device.state = "unauthorized"
+        info = manager.list_devices()[0]
+
+        self.assertEqual((info.state, info.model), ("unauthorized", "Pixel 8"))
+        self.assertEqual(device.shell_calls, 1)
+
+    def test_state_comes_from_a_synced_inventory(self):
+        device = FakeDevice("A")
+        inventory = FakeInventory({"A": "device"})
+        manager = DeviceManager(FakeClientProvider([device]), inventory=inventory)
+        manager.list_devices()
+
+        device.state = "offline"  # Not asked: the inventory answers.
+        self.assertEqual(manager.list_devices()[0].state, "device")
+        self.assertEqual(device.shell_calls, 1)
+
+    def test_zero_ttl_disables_the_cache(self):
+        device = FakeDevice("A")
+        manager = DeviceManager(FakeClientProvider([device]), info_ttl_s=0)
+        manager.get_device_info("A")
+        manager.get_device_info("A")
+        self.assertEqual(device.shell_calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import unittest
+from threading import RLock
+from types import SimpleNamespace
+
+from orchestration.device_session import DeviceSession
+from orchestration.executor import DeviceExecutor
+
+
+class DeviceExecutorTest(unittest.TestCase):
+    def test_run_async_runs_on_worker_thread(self):
+        executor = DeviceExecutor(max_workers=2)
+        session = SimpleNamespace(serial="A", ui_lock=RLock())
+
+        async def main():
+            return await executor.run_async(session, lambda s: (s.serial, threading.current_thread().name))
+
+        serial, thread_name = asyncio.run(main())
+        self.assertEqual(serial, "A")
+        self.assertNotEqual(thread_name, threading.main_thread().name)
+
+    def test_run_async_does_not_block_event_loop(self):
+        executor = DeviceExecutor(max_workers=4)
+        session = SimpleNamespace(serial="A", ui_lock=RLock())
+        release = threading.Event()
+
+        async def main():
+            blocked = asyncio.ensure_future(executor.run_async(session, lambda s: release.wait(5.0)))
+            fast = await executor.run_async(session, lambda s: "fast")
+            self.assertFalse(blocked.done())
+            release.set()
+            return fast, await blocked
+
+        self.assertEqual(asyncio.run(main()), ("fast", True))
+
+    def test_run_async_propagates_errors(self):
+        executor = DeviceExecutor(max_workers=1)
+        session = SimpleNamespace(serial="A", ui_lock=RLock())
+
+        def failing(_):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(executor.run_async(session, failing, requires_ui_lock=True))
+
+    def test_leased_session_is_released_once_the_call_finishes(self):
+        executor = DeviceExecutor(max_workers=1)
+        session = DeviceSession(serial="A", adb_device=None, u2_device=None)
+
+        session.begin_call()
+        future = executor.submit(session, lambda s: s.in_flight, leased=True)
+        released = threading.Event()
+        future.add_done_callback(lambda _: released.set())  # Runs after the executor's end_call.
+
+        self.assertEqual(future.result(timeout=5.0), 1)
+        self.assertTrue(released.wait(5.0))
+        self.assertEqual(session.in_flight, 0)
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
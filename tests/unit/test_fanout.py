@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from app.context import AppContext
+from errors import ValidationError
+from orchestration.executor import DeviceExecutor
+from orchestration.fanout import FanOutRunner
+
+
+class FakeDeviceManager:
+    def __init__(self, devices):
+        self.devices = devices
+
+    def list_devices(self):
+        return [SimpleNamespace(serial=serial, state=state, model=model) for serial, state, model in self.devices]
+
+
+class FakeSessionManager:
+    def resolve_serial(self, serial):
+        return serial
+
+    def resolves_in_memory(self):
+        return True
+
+    def lease_session(self, serial):
+        return SimpleNamespace(serial=serial, ui_lock=threading.RLock())
+
+    def should_retry_after_error(self, error):
+        return False
+
+
+class FanOutRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = DeviceExecutor(max_workers=8)
+        self.ctx = AppContext(session_manager=FakeSessionManager(), executor=self.executor)
+        self.device_manager = FakeDeviceManager(
+            [
+                ("A", "device", "Pixel 7"),
+                ("B", "device", "Galaxy S23"),
+                ("C", "offline", "Pixel 7"),
+                ("D", "device", None),
+            ]
+        )
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_resolve_targets(self):
+        runner = FanOutRunner(self.ctx, self.device_manager)
+        self.assertEqual(runner.resolve_targets(serials=["B", "A", "B"]), ["B", "A"])
+        self.assertEqual(runner.resolve_targets(all_online=True), ["A", "B", "D"])
+        self.assertEqual(runner.resolve_targets(model="pixel"), ["A"])
+        self.assertEqual(runner.resolve_targets(serials=["B", "A"], model="galaxy"), ["B"])
+        with self.assertRaises(ValidationError):
+            runner.resolve_targets()
+        with self.assertRaises(ValidationError):
+            runner.resolve_targets(model="nexus")
+
+    def test_partial_failures_and_timeouts_are_reported_per_device(self):
+        runner = FanOutRunner(self.ctx, self.device_manager, device_timeout_s=0.2)
+
+        def operation(session):
+            if session.serial == "B":
+                raise RuntimeError("device B exploded")
+            if session.serial == "C":
+                time.sleep(1.0)
+            return f"ok:{session.serial}"
+
+        result = asyncio.run(runner.run(["A", "B", "C"], operation, requires_ui_lock=True))
+
+        self.assertEqual([item["serial"] for item in result["results"]], ["A", "B", "C"])
+        self.assertEqual([item["status"] for item in result["results"]], ["ok", "error", "timeout"])
+        self.assertEqual(result["results"][0]["result"], "ok:A")
+        self.assertEqual(result["results"][1]["error"], "device B exploded")
+        self.assertEqual((result["succeeded"], result["failed"], result["timed_out"]), (1, 1, 1))
+        self.assertEqual(runner.stats()["in_flight"], 0)
+
+    def test_concurrency_is_capped(self):
+        runner = FanOutRunner(self.ctx, self.device_manager, max_concurrency=3)
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def operation(session):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+            return session.serial
+
+        serials = [f"S{index}" for index in range(8)]
+        result = asyncio.run(runner.run(serials, operation))
+        self.assertEqual(result["succeeded"], 8)
+        self.assertEqual(running["peak"], 3)
+
+        running["peak"] = 0
+        runner = FanOutRunner(self.ctx, self.device_manager, max_concurrency=3)
+        asyncio.run(runner.run(serials, operation, max_concurrency=2))
+        self.assertEqual(running["peak"], 2)
+
+        with self.assertRaises(ValidationError):
+            asyncio.run(runner.run(serials, operation, max_concurrency=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from threading import Event
+from time import sleep
+
+from adb.frame_grabber import FrameGrabber
+
+
+class CountingCapture:
+    def __init__(self):
+        self.calls = 0
+        self.captured = Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.captured.set()
+        return f"frame-{self.calls}".encode()
+
+
+class FrameGrabberTest(unittest.TestCase):
+    def test_grabber_buffers_latest_frames(self):
+        capture = CountingCapture()
+        grabber = FrameGrabber(capture, interval_s=0.01, ring_size=2, idle_timeout_s=5.0)
+        grabber.ensure_running()
+        try:
+            self.assertTrue(capture.captured.wait(1.0))
+            sleep(0.05)
+            frames = grabber.frames()
+            self.assertEqual(len(frames), 2)
+            self.assertEqual(grabber.latest().data, frames[-1].data)
+        finally:
+            grabber.stop()
+
+    def test_grabber_stops_when_idle(self):
+        capture = CountingCapture()
+        grabber = FrameGrabber(capture, interval_s=0.01, idle_timeout_s=0.03)
+        grabber.ensure_running()
+        sleep(0.15)
+        self.assertFalse(grabber.is_running())
+        calls_after_idle = capture.calls
+        sleep(0.05)
+        self.assertEqual(capture.calls, calls_after_idle)
+
+    def test_latest_respects_max_age(self):
+        grabber = FrameGrabber(CountingCapture(), interval_s=1.0)
+        grabber.offer(b"old", captured_at=0.0)
+        self.assertIsNone(grabber.latest(max_age_s=1.0))
+        self.assertEqual(grabber.latest().data, b"old")
+
+    def test_offer_ignores_out_of_order_frames(self):
+        grabber = FrameGrabber(CountingCapture(), ring_size=3)
+        grabber.offer(b"new", captured_at=10.0)
+        grabber.offer(b"stale", captured_at=5.0)
+        self.assertEqual([frame.data for frame in grabber.frames()], [b"new"])
+
+    def test_latest_rejects_frames_from_before_the_last_input_action(self):
+        generation = [3]
+        grabber = FrameGrabber(CountingCapture(), generation=lambda: generation[0])
+        grabber.offer(b"before-tap", generation=3)
+        self.assertEqual(grabber.latest().data, b"before-tap")
+
+        generation[0] = 4
+        self.assertIsNone(grabber.latest())
+        grabber.offer(b"after-tap", generation=4)
+        self.assertEqual(grabber.latest().data, b"after-tap")
+
+    def test_background_frames_are_tagged_with_the_generation_read_before_capture(self):
+        generation = [7]
+
+        def capture():
+            generation[0] = 8  # An input action lands while the frame is being captured.
+            return b"frame"
+
+        grabber = FrameGrabber(capture, interval_s=5.0, idle_timeout_s=5.0, generation=lambda: generation[0])
+        grabber.ensure_running()
+        try:
+            for _ in range(100):
+                if grabber.frames():
+                    break
+                sleep(0.01)
+            self.assertEqual(grabber.frames()[0].generation, 7)
+            self.assertIsNone(grabber.latest())
+        finally:
+            grabber.stop()
+
+    def test_capture_errors_are_counted(self):
+        failed = Event()
+
+        def failing_capture():
+            failed.set()
+            raise RuntimeError("device offline")
+
+        grabber = FrameGrabber(failing_capture, interval_s=0.01)
+        grabber.ensure_running()
+        try:
+            self.assertTrue(failed.wait(1.0))
+            sleep(0.02)
+            self.assertGreaterEqual(grabber.stats()["capture_errors"], 1)
+            self.assertIsNone(grabber.latest())
+        finally:
+            grabber.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
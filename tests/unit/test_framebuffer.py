@@ -0,0 +1,41 @@
+import struct
+import unittest
+
+from adb.framebuffer import parse_raw_screencap
+
+
+def _raw_screencap(width, height, pixel_format=1, colorspace=True):
+    header = struct.pack("<III", width, height, pixel_format)
+    if colorspace:
+        header += struct.pack("<I", 1)
+    return header + bytes(range(4)) * (width * height)
+
+
+class FramebufferTest(unittest.TestCase):
+    def test_parse_header_with_colorspace(self):
+        frame = parse_raw_screencap(_raw_screencap(3, 2))
+        self.assertEqual((frame.width, frame.height, frame.rawmode), (3, 2, "RGBA"))
+        self.assertEqual(len(frame.pixels), 3 * 2 * 4)
+        self.assertEqual(bytes(frame.pixels[:4]), bytes([0, 1, 2, 3]))
+
+    def test_parse_legacy_header(self):
+        frame = parse_raw_screencap(_raw_screencap(2, 2, pixel_format=2, colorspace=False))
+        self.assertEqual(frame.rawmode, "RGBX")
+        self.assertEqual(len(frame.pixels), 2 * 2 * 4)
+
+    def test_parse_does_not_copy_pixels(self):
+        data = _raw_screencap(2, 2)
+        frame = parse_raw_screencap(data)
+        self.assertIs(frame.pixels.obj, data)
+
+    def test_parse_rejects_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            parse_raw_screencap(_raw_screencap(2, 2, pixel_format=4))
+
+    def test_parse_rejects_truncated_output(self):
+        with self.assertRaises(ValueError):
+            parse_raw_screencap(_raw_screencap(2, 2)[:-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import unittest
+
+from errors import ValidationError
+from ui.hierarchy_nodes import diff_nodes, encode_compact, parse_hierarchy_nodes, prune_nodes
+from ui.hierarchy_service import HierarchyService, filter_hierarchy_xml
+from ui.ui_state import UiStateTracker
+
+DUMP = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy rotation="0">
+  <node index="0" text="" resource-id="" class="android.widget.FrameLayout" clickable="false"
+        bounds="[0,0][1080,2400]">
+    <node index="0" text="" resource-id="" class="android.widget.LinearLayout" clickable="false"
+          bounds="[0,0][1080,2400]">
+      <node index="0" text="{title}" resource-id="com.example:id/title" class="android.widget.TextView"
+            clickable="false" bounds="[0,0][1080,120]" />
+      <node index="1" text="OK" resource-id="" class="android.widget.Button" clickable="true"
+            bounds="[0,120][1080,240]" />
+      <node index="2" text="OK" resource-id="" class="android.widget.Button" clickable="true"
+            bounds="[0,240][1080,240]" />
+      <node index="3" text="" resource-id="com.example:id/hidden" class="android.view.View" clickable="true"
+            visible-to-user="false" bounds="[0,300][1080,400]">
+        <node index="0" text="Inside hidden" resource-id="" class="android.widget.TextView" clickable="false"
+              bounds="[0,300][1080,400]" />
+      </node>
+    </node>
+  </node>
+</hierarchy>
+"""
+
+
+class FakeU2Device:
+    def __init__(self, xml):
+        self.xml = xml
+
+    def dump_hierarchy(self, compressed=False):
+        return self.xml
+
+
+class HierarchyNodesTest(unittest.TestCase):
+    def test_ids_are_stable_across_dumps_and_parents_link_up(self):
+        first = parse_hierarchy_nodes(DUMP.format(title="Inbox"))
+        second = parse_hierarchy_nodes(DUMP.format(title="Inbox (3)"))
+        self.assertEqual([node.id for node in first], [node.id for node in second])
+        self.assertEqual(len({node.id for node in first}), len(first))
+        self.assertIsNone(first[0].parent_id)
+        self.assertEqual(first[2].parent_id, first[1].id)
+        self.assertEqual(first[2].class_path, "FrameLayout[0]/LinearLayout[0]/TextView[0]")
+        self.assertEqual(first[2].bounds, (0, 0, 1080, 120))
+
+    def test_prune_drops_hidden_subtrees_and_collapses_wrappers(self):
+        nodes = parse_hierarchy_nodes(DUMP.format(title="Inbox"))
+        kept, counts = prune_nodes(nodes)
+
+        self.assertEqual([node.attributes["text"] for node in kept], ["Inbox", "OK"])
+        self.assertTrue(all(node.parent_id is None for node in kept))
+        self.assertEqual(counts, {"hidden": 3, "collapsed": 2})
+
+    def test_encode_interns_strings_and_truncates(self):
+        nodes = parse_hierarchy_nodes(DUMP.format(title="OK"))
+        compact = encode_compact(nodes, ["text", "class", "clickable", "bounds"])
+
+        self.assertEqual(compact["columns"], ["id", "parent", "text", "class", "clickable", "bounds"])
+        self.assertEqual(compact["strings"], ["OK", "android.widget.TextView", "android.widget.Button"])
+        self.assertEqual([row[2:5] for row in compact["nodes"]], [[0, 1, 0], [0, 2, 1]])
+        self.assertEqual(compact["nodes"][1][5], [0, 120, 1080, 240])
+        self.assertFalse(compact["truncated"])
+
+        capped = encode_compact(nodes, ["text", "class"], max_bytes=340)
+        self.assertTrue(capped["truncated"])
+        self.assertEqual((capped["total_nodes"], capped["returned_nodes"]), (2, 1))
+        self.assertEqual(capped["strings"], ["OK", "android.widget.TextView"])
+
+    def test_service_returns_compact_json(self):
+        device = FakeU2Device(DUMP.format(title="Inbox"))
+        payload = json.loads(HierarchyService().get_compact_dump(device, ["text"]))
+        self.assertEqual(payload["format"], "compact-v1")
+        self.assertEqual(payload["strings"], ["Inbox", "OK"])
+
+        with self.assertRaises(ValidationError):
+            HierarchyService().get_compact_dump(device, ["text"], max_bytes=0)
+
+
+class HierarchyDiffTest(unittest.TestCase):
+    def test_diff_reports_added_removed_modified_and_moved(self):
+        base = parse_hierarchy_nodes(DUMP.format(title="Inbox"))
+        changed = (
+            DUMP.format(title="Inbox (3)")
+            .replace('bounds="[0,120][1080,240]"', 'bounds="[0,130][1080,250]"')
+            .replace(
+                '<node index="2" text="OK"',
+                '<node index="4" text="New" resource-id="" class="android.widget.Button" clickable="true"\n'
+                '            bounds="[0,500][1080,600]" />\n      <node index="2" text="OK"',
+            )
+            .replace(
+                '<node index="3" text="" resource-id="com.example:id/hidden"',
+                '<node index="3" text="" resource-id="com.example:id/other"',
+            )
+        )
+        diff = diff_nodes(base, parse_hierarchy_nodes(changed), ["text", "bounds"])
+
+        self.assertEqual([row["text"] for row in diff["added"]], ["New", None])
+        self.assertEqual(len(diff["removed"]), 1)
+        modified = {row["id"]: row for row in diff["modified"]}
+        title_id, button_id = base[2].id, base[3].id
+        self.assertEqual(modified[title_id], {"id": title_id, "text": "Inbox (3)"})
+        self.assertEqual(modified[button_id], {"id": button_id, "bounds": [0, 130, 1080, 250]})
+        # The child of the replaced container keeps its class path but now points at the new parent.
+        self.assertEqual(modified[base[6].id]["parent"], diff["added"][1]["id"])
+        self.assertEqual(diff["unchanged"], 3)
+
+    def test_service_diff_against_token_and_unknown_token(self):
+        device = FakeU2Device(DUMP.format(title="Inbox"))
+        ui_state = UiStateTracker()
+        service = HierarchyService(snapshot_max_age_s=0)
+        first = json.loads(service.get_compact_dump(device, ["text"], ui_state=ui_state))
+
+        device.xml = DUMP.format(title="Inbox (1)")
+        diff = json.loads(
+            service.get_dump_diff(device, ["text"], first["token"], ui_state=ui_state, prune=True)
+        )
+        self.assertFalse(diff["reset"])
+        self.assertEqual(diff["modified"], [{"id": first["nodes"][0][0], "text": "Inbox (1)"}])
+        self.assertEqual((diff["added"], diff["removed"], diff["unchanged"]), ([], [], 1))
+
+        reset = json.loads(service.get_dump_diff(device, ["text"], "unknown", ui_state=ui_state, prune=True))
+        self.assertTrue(reset["reset"])
+        self.assertEqual(len(reset["added"]), 2)
+
+    def test_xml_dump_carries_snapshot_token_only_on_request(self):
+        device = FakeU2Device(DUMP.format(title="Inbox"))
+        ui_state = UiStateTracker()
+        service = HierarchyService()
+
+        plain = service.get_filtered_dump(device, ["text"], ui_state=ui_state)
+        self.assertEqual(plain, filter_hierarchy_xml(device.dump_hierarchy(), ["text"]))
+
+        xml = service.get_filtered_dump(device, ["text"], ui_state=ui_state, include_token=True)
+        token = ui_state.snapshot(False, max_age_s=60.0).token
+        self.assertIn(f'<hierarchy snapshot-token="{token}">', xml)
+        self.assertIsNotNone(ui_state.snapshot_by_token(token))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from ui.hierarchy_service import HierarchyService, filter_hierarchy_xml
+from ui.interaction_service import InteractionService
+from ui.ui_state import UiStateTracker
+
+DUMP = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy rotation="0">
+  <node index="0" text="" resource-id="" class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">
+    <node index="0" text="Tom &amp; Jerry &lt;3 &quot;quoted&quot;" resource-id="com.example:id/title"
+          class="android.widget.TextView" content-desc="line&#10;break&#9;tab" bounds="[0,0][1080,120]" />
+    <node index="1" text="Ünïcödé ✓" class="android.widget.Button"
+          bounds="[0,120][1080,240]">inner &gt; text</node>
+    <node index="2" class="android.view.View" bounds="[0,240][1080,360]"></node>
+  </node>
+</hierarchy>
+"""
+
+
+def _elementtree_filter(xml_dump, attributes_to_keep):
+    root = ET.fromstring(xml_dump)
+    for node in root.iter():
+        for attribute in list(node.attrib):
+            if attribute not in attributes_to_keep:
+                del node.attrib[attribute]
+    return ET.tostring(root, encoding="unicode")
+
+
+class FakeU2Device:
+    def __init__(self):
+        self.compressed = None
+
+    def dump_hierarchy(self, compressed=False):
+        self.compressed = compressed
+        return DUMP
+
+
+class FakeInputDevice:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def click(self, x, y):
+        pass
+
+    def press(self, key):
+        if self.fail:
+            raise ConnectionError("device offline")
+
+
+class HierarchyFilterTest(unittest.TestCase):
+    def test_output_matches_elementtree_round_trip(self):
+        for attributes in (["text"], ["text", "content-desc", "bounds"], ["class", "index", "rotation"], ["hint"]):
+            with self.subTest(attributes=attributes):
+                self.assertEqual(filter_hierarchy_xml(DUMP, attributes), _elementtree_filter(DUMP, attributes))
+
+    def test_keeps_only_requested_attributes(self):
+        output = filter_hierarchy_xml(DUMP, ["resource-id"])
+        self.assertIn('resource-id="com.example:id/title"', output)
+        self.assertNotIn("bounds=", output)
+        self.assertIn("<node />", output)
+
+    def test_service_forwards_compressed_flag(self):
+        device = FakeU2Device()
+        HierarchyService().get_filtered_dump(device, ["text"], compressed=True)
+        self.assertTrue(device.compressed)
+
+
+class HierarchySnapshotCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.device = FakeU2Device()
+        self.device.dumps = 0
+        original_dump = self.device.dump_hierarchy
+
+        def counting_dump(compressed=False):
+            self.device.dumps += 1
+            return original_dump(compressed)
+
+        self.device.dump_hierarchy = counting_dump
+        self.ui_state = UiStateTracker()
+        self.service = HierarchyService(snapshot_max_age_s=60.0)
+
+    def test_fresh_snapshot_is_reused(self):
+        first = self.service.get_filtered_dump(self.device, ["text"], ui_state=self.ui_state)
+        second = self.service.get_filtered_dump(self.device, ["bounds"], ui_state=self.ui_state)
+        self.assertEqual(self.device.dumps, 1)
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.ui_state.stats()["snapshot_hits"], 1)
+
+    def test_input_action_invalidates_snapshot(self):
+        self.service.get_snapshot(self.device, ui_state=self.ui_state)
+        InteractionService.tap(FakeInputDevice(), 1, 2, ui_state=self.ui_state)
+        self.service.get_snapshot(self.device, ui_state=self.ui_state)
+        self.assertEqual(self.device.dumps, 2)
+
+    def test_failed_action_still_invalidates_snapshot(self):
+        self.service.get_snapshot(self.device, ui_state=self.ui_state)
+        with self.assertRaises(ConnectionError):
+            InteractionService.system_action(FakeInputDevice(fail=True), "BACK", ui_state=self.ui_state)
+        self.assertIsNone(self.ui_state.snapshot(False, max_age_s=60.0))
+
+    def test_force_refresh_and_max_age(self):
+        self.service.get_snapshot(self.device, ui_state=self.ui_state)
+        self.service.get_snapshot(self.device, ui_state=self.ui_state, force_refresh=True)
+        HierarchyService(snapshot_max_age_s=0).get_snapshot(self.device, ui_state=self.ui_state)
+        self.assertEqual(self.device.dumps, 3)
+
+    def test_dump_overtaken_by_action_is_not_cached(self):
+        generation = self.ui_state.generation
+        self.ui_state.bump()
+        self.ui_state.store("<hierarchy />", False, generation, captured_at=0.0)
+        self.assertIsNone(self.ui_state.snapshot(False, max_age_s=float("inf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
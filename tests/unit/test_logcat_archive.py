@@ -0,0 +1,192 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from adb.logcat_archive import LogcatArchive, LogcatArchiver
+from adb.logcat_reader import LogRecord
+from adb.logcat_service import LogcatService
+from errors import ValidationError
+
+
+def _record(seq, timestamp, pid, level, message, tag="Tag"):
+    return LogRecord(
+        seq=seq,
+        time_text=f"{timestamp:.3f}",
+        timestamp=timestamp,
+        pid=pid,
+        tid=pid,
+        level=level,
+        tag=tag,
+        message=message,
+    )
+
+
+class LogcatArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _archive(self, **kwargs):
+        kwargs.setdefault("block_max_bytes", 200)
+        return LogcatArchive(self.root, **kwargs)
+
+    def test_search_filters_by_regex_level_and_time(self):
+        archive = self._archive()
+        for index in range(20):
+            level = "E" if index % 5 == 0 else "D"
+            archive.append("emulator-5554", _record(index, 100.0 + index, 42, level, f"event {index}"))
+
+        lines = list(archive.search("emulator-5554", pattern=r"event 1\d", min_level="E"))
+        self.assertEqual([line.split(": ", 1)[1] for line in lines], ["event 10", "event 15"])
+
+        windowed = list(archive.search("emulator-5554", since_ts=103.0, until_ts=105.0))
+        self.assertEqual([line.split()[-1] for line in windowed], ["3", "4", "5"])
+
+    def test_search_by_package_uses_learned_pids(self):
+        archive = self._archive()
+        start_proc = "Start proc 77:com.example/u0a1 for activity"
+        archive.append("serial", _record(1, 1.0, 10, "I", start_proc, tag="ActivityManager"))
+        archive.append("serial", _record(2, 2.0, 77, "E", "FATAL EXCEPTION: main"))
+        archive.append("serial", _record(3, 3.0, 88, "E", "unrelated crash"))
+        archive.note_pids("serial", "com.other", {88})
+
+        lines = list(archive.search("serial", app_package="com.example"))
+        self.assertEqual(len(lines), 1)
+        self.assertIn("FATAL EXCEPTION", lines[0])
+        self.assertIn("unrelated", list(archive.search("serial", app_package="com.other"))[0])
+
+    def test_search_skips_segments_deleted_while_it_runs(self):
+        archive = self._archive(segment_max_bytes=100, block_max_bytes=50)
+        for index in range(40):
+            archive.append("serial", _record(index, 1000.0 + index, 1, "I", f"message {index} " + "x" * 40))
+        archive.flush()
+        segments = sorted(Path(self.root, "serial").glob("*.seg"))
+        self.assertGreater(len(segments), 2)
+
+        search = archive.search("serial")
+        first = next(search)
+        for path in segments[1:-1]:
+            path.unlink()
+        remaining = list(search)
+
+        self.assertIn("message 0 ", first)
+        self.assertIn("message 39", remaining[-1])
+
+    def test_segments_rotate_and_old_segments_are_deleted_by_size(self):
+        archive = self._archive(segment_max_bytes=100, retention_bytes=400, block_max_bytes=50)
+        for index in range(400):
+            archive.append("serial", _record(index, 1000.0 + index, 1, "I", f"message {index} " + "x" * 40))
+        archive.flush()
+
+        segments = sorted(Path(self.root, "serial").glob("*.seg"))
+        self.assertGreater(len(segments), 1)
+        self.assertLessEqual(sum(path.stat().st_size for path in segments[:-1]), 400)
+        lines = list(archive.search("serial"))
+        self.assertIn("message 399", lines[-1])
+        self.assertNotIn("message 0 ", lines[0])
+
+    def test_segments_older_than_retention_age_are_deleted(self):
+        archive = self._archive(segment_max_bytes=1, retention_age_s=60)
+        archive.append("serial", _record(1, 1.0, 1, "I", "old"))
+        archive.flush()
+        old_segment = next(Path(self.root, "serial").glob("*.seg"))
+        stale = time.time() - 3600
+        os.utime(old_segment, (stale, stale))
+
+        archive.append("serial", _record(2, 2.0, 1, "I", "new"))
+        archive.flush()
+
+        self.assertFalse(old_segment.exists())
+        self.assertEqual([line.split()[-1] for line in archive.search("serial")], ["new"])
+
+    def test_quiet_device_segments_expire_without_rotation(self):
+        archive = self._archive(retention_age_s=60)
+        archive.append("serial", _record(1, 1.0, 1, "I", "old"))
+        archive.flush()
+        segment = next(Path(self.root, "serial").glob("*.seg"))
+        stale = time.time() - 3600
+        os.utime(segment, (stale, stale))
+
+        self.assertEqual(archive.enforce_retention(), 1)
+        self.assertFalse(segment.exists())
+        archive.append("serial", _record(2, 2.0, 1, "I", "new"))
+        self.assertEqual([line.split()[-1] for line in archive.search("serial")], ["new"])
+
+    def test_opening_the_archive_applies_retention_to_detached_devices(self):
+        archive = self._archive()
+        archive.append("gone", _record(1, 1.0, 1, "I", "old"))
+        archive.flush()
+        segment = next(Path(self.root, "gone").glob("*.seg"))
+        stale = time.time() - 3600
+        os.utime(segment, (stale, stale))
+
+        self._archive(retention_age_s=60)
+        self.assertFalse(segment.exists())
+        self.assertFalse(segment.with_suffix(".idx").exists())
+
+    def test_reopened_archive_skips_replayed_records(self):
+        archive = self._archive()
+        archive.append("serial", _record(1, 1.0, 1, "I", "first"))
+        archive.flush()
+
+        reopened = self._archive()
+        reopened.append("serial", _record(1, 1.0, 1, "I", "first"))
+        reopened.append("serial", _record(2, 2.0, 1, "I", "second"))
+
+        self.assertEqual([line.split()[-1] for line in reopened.search("serial")], ["first", "second"])
+
+
+class FakeArchiver:
+    def __init__(self, archive):
+        self.archive = archive
+
+    def reader_for(self, serial):
+        return None
+
+
+class LogcatArchiveSearchServiceTest(unittest.TestCase):
+    def test_search_archive_truncates_and_validates(self):
+        with tempfile.TemporaryDirectory() as root:
+            archive = LogcatArchive(root)
+            for index in range(5):
+                archive.append("serial", _record(index, float(index + 1), 1, "W", f"warn {index}"))
+            service = LogcatService(archiver=FakeArchiver(archive))
+
+            result = service.search_archive("serial", pattern="warn", app_package=None, level="DEBUG", max_results=3)
+            self.assertEqual(len(result["lines"]), 3)
+            self.assertTrue(result["truncated"])
+
+            with self.assertRaises(ValidationError):
+                service.search_archive("serial", pattern="(", app_package=None, level="DEBUG")
+
+    def test_search_archive_requires_archive(self):
+        with self.assertRaises(ValidationError):
+            LogcatService().search_archive("serial", pattern=None, app_package=None, level="DEBUG")
+
+
+class FakeDeviceManager:
+    def __init__(self):
+        self.requested = []
+
+    def get_device(self, serial):
+        self.requested.append(serial)
+        raise ConnectionError("device offline")
+
+
+class LogcatArchiverTest(unittest.TestCase):
+    def test_failed_start_does_not_keep_reader(self):
+        with tempfile.TemporaryDirectory() as root:
+            device_manager = FakeDeviceManager()
+            archiver = LogcatArchiver(LogcatArchive(root), device_manager)
+            archiver.handle_device_event("serial", present=True)
+            self.assertEqual(device_manager.requested, ["serial"])
+            self.assertIsNone(archiver.reader_for("serial"))
+
+
+if __name__ == "__main__":
+    unittest.main()
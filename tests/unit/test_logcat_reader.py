@@ -0,0 +1,204 @@
+import unittest
+from threading import Event
+
+from adb.logcat_reader import LogcatReader, LogRingBuffer, parse_logcat_line
+from adb.logcat_service import LogcatService, decode_logcat_cursor
+from errors import ValidationError
+
+
+def _line(timestamp, pid, level, message, tag="Tag", tid=None):
+    return f"{timestamp:.3f} {pid:5d} {tid or pid:5d} {level} {tag}: {message}"
+
+
+class FakeStream:
+    def __init__(self, payload):
+        self.chunks = [payload]
+        self.closed = Event()
+
+    def recv(self, size):
+        if self.chunks:
+            return self.chunks.pop(0)
+        self.closed.wait(5.0)
+        return b""
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeLogDevice:
+    def __init__(self, dump="", stream_payload=b"", pids="123"):
+        self.dump = dump
+        self.stream_payload = stream_payload
+        self.pids = pids
+        self.commands = []
+        self.streamed = Event()
+        self.stream = None
+
+    def shell(self, command, stream=False):
+        self.commands.append(command)
+        if stream:
+            self.stream = FakeStream(self.stream_payload)
+            self.streamed.set()
+            return self.stream
+        if command.startswith("pidof"):
+            return self.pids
+        return self.dump
+
+
+class LogcatParsingTest(unittest.TestCase):
+    def test_parse_epoch_threadtime_line(self):
+        fields = parse_logcat_line("  1700000000.123  1234  5678 W ActivityManager: Slow operation")
+        self.assertEqual(fields["timestamp"], 1700000000.123)
+        self.assertEqual((fields["pid"], fields["tid"], fields["level"]), (1234, 5678, "W"))
+        self.assertEqual((fields["tag"], fields["message"]), ("ActivityManager", "Slow operation"))
+
+    def test_parse_classic_threadtime_line_and_padded_tag(self):
+        fields = parse_logcat_line("10-12 14:03:01.456   42   43 E MyTag   : boom: details")
+        self.assertIsNone(fields["timestamp"])
+        self.assertEqual((fields["tag"], fields["message"]), ("MyTag", "boom: details"))
+
+    def test_parse_skips_non_record_lines(self):
+        self.assertIsNone(parse_logcat_line("--------- beginning of main"))
+
+
+class LogRingBufferTest(unittest.TestCase):
+    def test_query_filters_by_pid_and_min_level(self):
+        buffer = LogRingBuffer(capacity=10)
+        for index, (pid, level) in enumerate([(1, "D"), (2, "E"), (1, "E"), (1, "I"), (12, "E")]):
+            buffer.append(parse_logcat_line(_line(100.0 + index, pid, level, f"m{index}")))
+
+        records = buffer.query(pids={1}, min_level="I")
+        self.assertEqual([record.message for record in records], ["m2", "m3"])
+        self.assertEqual([r.message for r in buffer.query(min_level="E")], ["m1", "m2", "m4"])
+
+    def test_query_limit_returns_newest_records_in_order(self):
+        buffer = LogRingBuffer(capacity=10)
+        for index in range(5):
+            buffer.append(parse_logcat_line(_line(100.0 + index, 7, "D", f"m{index}")))
+        self.assertEqual([r.message for r in buffer.query(pids={7}, limit=2)], ["m3", "m4"])
+
+    def test_eviction_keeps_indexes_consistent(self):
+        buffer = LogRingBuffer(capacity=2)
+        for index, pid in enumerate([1, 2, 1]):
+            buffer.append(parse_logcat_line(_line(100.0 + index, pid, "D", f"m{index}")))
+
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual([r.message for r in buffer.query(pids={1})], ["m2"])
+        self.assertEqual([r.message for r in buffer.query()], ["m1", "m2"])
+        self.assertEqual(buffer.last_seq, 3)
+
+
+class LogcatReaderTest(unittest.TestCase):
+    def test_reader_primes_and_follows_without_duplicates(self):
+        dump = "\n".join([_line(100.0, 1, "D", "a"), _line(101.0, 1, "D", "b")])
+        stream = "\n".join([_line(101.0, 1, "D", "b"), _line(102.0, 1, "D", "c"), ""]).encode()
+        device = FakeLogDevice(dump=dump, stream_payload=stream)
+        reader = LogcatReader(device)
+        reader.ensure_running()
+        try:
+            self.assertTrue(device.streamed.wait(1.0))
+            for _ in range(100):
+                if len(reader.buffer) >= 3:
+                    break
+                Event().wait(0.01)
+            self.assertEqual([r.message for r in reader.buffer.query()], ["a", "b", "c"])
+            self.assertIn("-T 101.000", device.commands[-1])
+        finally:
+            reader.stop()
+        self.assertTrue(device.stream.closed.is_set())
+
+
+class LogcatServiceTest(unittest.TestCase):
+    def test_get_for_package_matches_exact_pids(self):
+        dump = "\n".join([_line(100.0, 123, "D", "mine"), _line(101.0, 1234, "D", "other")])
+        device = FakeLogDevice(dump=dump, pids="123")
+
+        output = LogcatService(streaming=False).get_for_package(device, "com.example", "DEBUG")
+        self.assertIn("mine", output)
+        self.assertNotIn("other", output)
+
+    def test_get_for_package_reads_from_reader_buffer(self):
+        reader = LogcatReader(FakeLogDevice())
+        reader.buffer.append(parse_logcat_line(_line(100.0, 5, "E", "crash")))
+        reader.buffer.append(parse_logcat_line(_line(101.0, 6, "E", "other app")))
+        device = FakeLogDevice(pids="5 9")
+
+        output = LogcatService().get_for_package(device, "com.example", "ERROR", reader=reader)
+        self.assertEqual(output.splitlines(), [reader.buffer.query(pids={5})[0].format()])
+        self.assertEqual(device.commands, ["pidof com.example"])
+
+    def test_get_for_package_requires_running_app(self):
+        with self.assertRaises(ValidationError):
+            LogcatService(streaming=False).get_for_package(FakeLogDevice(pids=""), "com.example", "DEBUG")
+
+
+class LogcatUpdatesTest(unittest.TestCase):
+    def setUp(self):
+        self.reader = LogcatReader(FakeLogDevice())
+        self.device = FakeLogDevice(pids="5")
+        self.service = LogcatService()
+
+    def _append(self, timestamp, pid, message, level="D"):
+        self.reader.buffer.append(parse_logcat_line(_line(timestamp, pid, level, message)))
+
+    def _read(self, **kwargs):
+        kwargs.setdefault("app_package", "com.example")
+        kwargs.setdefault("level", "DEBUG")
+        return self.service.read_updates(self.device, self.reader, **kwargs)
+
+    def test_cursor_returns_only_new_lines(self):
+        self._append(100.0, 5, "first")
+        page = self._read()
+        self.assertEqual(len(page["lines"]), 1)
+
+        self._append(101.0, 6, "other app")
+        self._append(102.0, 5, "second")
+        page = self._read(cursor=page["cursor"])
+        self.assertEqual([line.split(": ", 1)[1] for line in page["lines"]], ["second"])
+
+        page = self._read(cursor=page["cursor"])
+        self.assertEqual(page["lines"], [])
+        self.assertFalse(page["has_more"])
+
+    def test_cursor_pages_with_has_more(self):
+        page = self._read()
+        for index in range(5):
+            self._append(100.0 + index, 5, f"m{index}")
+
+        first = self._read(cursor=page["cursor"], max_lines=3)
+        second = self._read(cursor=first["cursor"], max_lines=3)
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(first["lines"]) + len(second["lines"]), 5)
+
+    def test_cursor_keeps_pids_of_exited_process(self):
+        page = self._read()
+        self._append(100.0, 5, "crash")
+        self.device.pids = ""
+        page = self._read(cursor=page["cursor"])
+        self.assertEqual(len(page["lines"]), 1)
+        self.assertEqual(decode_logcat_cursor(page["cursor"])["pids"], {5})
+
+    def test_time_window_filters_records(self):
+        for index in range(4):
+            self._append(100.0 + index, 5, f"m{index}")
+        page = self._read(since_ts=101.0, until_ts=102.0)
+        self.assertEqual([line.split(": ", 1)[1] for line in page["lines"]], ["m1", "m2"])
+
+    def test_cursor_from_other_reader_resets(self):
+        self._append(100.0, 5, "first")
+        stale_cursor = self._read()["cursor"]
+        self.reader = LogcatReader(FakeLogDevice())
+        self._append(200.0, 5, "after restart")
+
+        page = self._read(cursor=stale_cursor)
+        self.assertTrue(page["reset"])
+        self.assertEqual(len(page["lines"]), 1)
+
+    def test_invalid_cursor_rejected(self):
+        with self.assertRaises(ValidationError):
+            self._read(cursor="not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
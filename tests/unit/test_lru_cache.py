@@ -0,0 +1,42 @@
+import unittest
+
+from shared.lru_cache import ByteLRUCache
+
+
+class ByteLRUCacheTest(unittest.TestCase):
+    def test_get_returns_cached_value_and_counts_hits(self):
+        cache = ByteLRUCache(max_bytes=10)
+        cache.put("a", b"123")
+        self.assertEqual(cache.get("a"), b"123")
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_evicts_least_recently_used_when_over_budget(self):
+        cache = ByteLRUCache(max_bytes=6)
+        cache.put("a", b"aaa")
+        cache.put("b", b"bbb")
+        cache.get("a")
+        cache.put("c", b"ccc")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"aaa")
+        self.assertEqual(cache.get("c"), b"ccc")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["bytes"], 6)
+
+    def test_oversized_values_are_not_cached(self):
+        cache = ByteLRUCache(max_bytes=2)
+        cache.put("a", b"abc")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_replacing_key_updates_size(self):
+        cache = ByteLRUCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("a", b"12")
+        self.assertEqual(cache.stats()["bytes"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import unittest
+from threading import RLock
+from types import SimpleNamespace
+
+from orchestration.executor import DeviceExecutor
+from shared.metrics import Histogram, LatencyMetrics, record_phase
+
+
+class HistogramTest(unittest.TestCase):
+    def test_cumulative_buckets_and_quantiles(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.99), 1.0)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+
+class LatencyMetricsTest(unittest.TestCase):
+    def test_track_call_aggregates_phases_per_tool_and_device(self):
+        metrics = LatencyMetrics()
+        with metrics.track_call("tap") as call:
+            record_phase("queue_wait", 0.002, "A")
+            record_phase("device_call", 0.02, "A")
+            record_phase("device_call", 0.03, "B")
+            call.handler_done_at = time.perf_counter()
+        with self.assertRaises(RuntimeError):
+            with metrics.track_call("tap"):
+                raise RuntimeError("boom")
+        record_phase("device_call", 1.0, "A")  # Outside a call: ignored.
+
+        snapshot = metrics.snapshot()
+        tap = snapshot["tools"]["tap"]
+        self.assertEqual((tap["calls"], tap["errors"]), (2, 1))
+        self.assertEqual(list(tap["phases"]), ["queue_wait", "device_call", "serialize"])
+        self.assertAlmostEqual(tap["phases"]["device_call"]["sum_s"], 0.05)
+        self.assertEqual(sorted(snapshot["devices"]), ["A", "B"])
+        self.assertAlmostEqual(snapshot["devices"]["A"]["total"]["sum_s"], 0.022)
+
+    def test_prometheus_text(self):
+        metrics = LatencyMetrics(buckets=(0.01,))
+        with metrics.track_call('odd"tool'):
+            record_phase("device_call", 0.005, "emulator-5554")
+
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE mcp_tool_call_duration_seconds histogram", text)
+        self.assertIn('mcp_tool_phase_duration_seconds_bucket{tool="odd\\"tool",phase="device_call",le="0.01"} 1', text)
+        self.assertIn('mcp_device_phase_duration_seconds_count{serial="emulator-5554",phase="device_call"} 1', text)
+        self.assertIn('mcp_device_call_duration_seconds_bucket{serial="emulator-5554",le="+Inf"} 1', text)
+
+    def test_executor_records_queue_lock_and_device_phases_from_worker_threads(self):
+        metrics = LatencyMetrics()
+        executor = DeviceExecutor(max_workers=2)
+        session = SimpleNamespace(serial="A", ui_lock=RLock())
+
+        async def main():
+            with metrics.track_call("click"):
+                await executor.call_async(lambda: time.sleep(0.01), key="A")
+                return await executor.run_async(session, lambda s: time.sleep(0.01) or "ok", requires_ui_lock=True)
+
+        self.assertEqual(asyncio.run(main()), "ok")
+        executor.shutdown()
+        phases = metrics.snapshot()["devices"]["A"]["phases"]
+        self.assertEqual(list(phases), ["queue_wait", "ui_lock_wait", "device_call"])
+        self.assertGreaterEqual(phases["device_call"]["sum_s"], 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from threading import Event, Lock
+from time import sleep
+
+from orchestration.scheduler import FairScheduler, TaskPriority
+
+
+class FairSchedulerTest(unittest.TestCase):
+    def _block_single_worker(self, scheduler):
+        release = Event()
+        started = Event()
+
+        def gate():
+            started.set()
+            release.wait(5.0)
+
+        future = scheduler.submit("gate", gate)
+        self.assertTrue(started.wait(1.0))
+        return release, future
+
+    def test_round_robin_across_devices(self):
+        scheduler = FairScheduler(max_workers=1)
+        release, _ = self._block_single_worker(scheduler)
+        order = []
+        futures = [
+            scheduler.submit(serial, lambda label=f"{serial}{index}": order.append(label))
+            for serial, index in [("A", 1), ("A", 2), ("A", 3), ("B", 1), ("B", 2)]
+        ]
+
+        release.set()
+        for future in futures:
+            future.result(timeout=1.0)
+        self.assertEqual(order, ["A1", "B1", "A2", "B2", "A3"])
+        scheduler.shutdown()
+
+    def test_higher_priority_dispatched_first(self):
+        scheduler = FairScheduler(max_workers=1)
+        release, _ = self._block_single_worker(scheduler)
+        order = []
+        futures = [
+            scheduler.submit("A", lambda: order.append("low"), priority=TaskPriority.LOW),
+            scheduler.submit("B", lambda: order.append("normal"), priority=TaskPriority.NORMAL),
+            scheduler.submit("C", lambda: order.append("high"), priority=TaskPriority.HIGH),
+        ]
+
+        release.set()
+        for future in futures:
+            future.result(timeout=1.0)
+        self.assertEqual(order, ["high", "normal", "low"])
+        scheduler.shutdown()
+
+    def test_exclusive_tasks_do_not_occupy_extra_workers(self):
+        scheduler = FairScheduler(max_workers=3, per_device_limit=3)
+        lock = Lock()
+        running = 0
+        max_running = 0
+
+        def ui_task():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            sleep(0.02)
+            with lock:
+                running -= 1
+
+        ui_futures = [scheduler.submit("A", ui_task, exclusive=True) for _ in range(3)]
+        other = scheduler.submit("B", lambda: "B done")
+
+        self.assertEqual(other.result(timeout=1.0), "B done")
+        for future in ui_futures:
+            future.result(timeout=1.0)
+        self.assertEqual(max_running, 1)
+        scheduler.shutdown()
+
+    def test_per_device_in_flight_limit(self):
+        scheduler = FairScheduler(max_workers=4, per_device_limit=1)
+        release = Event()
+        first = scheduler.submit("A", lambda: release.wait(5.0))
+        second = scheduler.submit("A", lambda: "second")
+        sleep(0.05)
+
+        self.assertFalse(second.done())
+        self.assertEqual(scheduler.stats()["devices"]["A"]["queued"], 1)
+        release.set()
+        self.assertTrue(first.result(timeout=1.0))
+        self.assertEqual(second.result(timeout=1.0), "second")
+        scheduler.shutdown()
+
+    def test_stats_report_completed_tasks_and_errors_propagate(self):
+        scheduler = FairScheduler(max_workers=2)
+
+        def failing():
+            raise RuntimeError("boom")
+
+        scheduler.submit("A", lambda: None).result(timeout=1.0)
+        with self.assertRaises(RuntimeError):
+            scheduler.submit("A", failing, priority=TaskPriority.HIGH).result(timeout=1.0)
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["devices"]["A"]["completed"], 2)
+        self.assertEqual(stats["devices"]["A"]["queued"], 0)
+        self.assertEqual(stats["priorities"]["HIGH"]["completed"], 1)
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
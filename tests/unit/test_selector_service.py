@@ -1,43 +1,152 @@
 import unittest
 
 from errors import UiElementNotFoundError, ValidationError
+from ui.hierarchy_nodes import parse_hierarchy_nodes
+from ui.hierarchy_service import HierarchyService
+from ui.selector_engine import UiSelector, XPathSelector
 from ui.selector_service import SelectorService
+from ui.ui_state import UiStateTracker
 
+SCREEN = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy rotation="0">
+  <node index="0" text="" resource-id="" class="android.widget.FrameLayout" content-desc="" clickable="false"
+        bounds="[0,0][1080,2400]">
+    <node index="0" text="Sign in" resource-id="com.example:id/title" class="android.widget.TextView"
+          content-desc="" clickable="false" bounds="[0,0][1080,120]" />
+    <node index="1" text="" resource-id="com.example:id/list" class="androidx.recyclerview.widget.RecyclerView"
+          content-desc="" clickable="false" bounds="[0,120][1080,2000]">
+      <node index="0" text="Order #12" resource-id="com.example:id/row" class="android.widget.TextView"
+            content-desc="" clickable="true" bounds="[0,120][1080,240]" />
+      <node index="1" text="Order #13" resource-id="com.example:id/row" class="android.widget.TextView"
+            content-desc="" clickable="true" bounds="[0,240][1080,360]" />
+      <node index="2" text="Order #14" resource-id="com.example:id/row" class="android.widget.TextView"
+            content-desc="" clickable="true" bounds="[0,360][1080,360]" />
+    </node>
+    <node index="2" text="Sign in" resource-id="com.example:id/submit" class="android.widget.Button"
+          content-desc="Submit form" clickable="true" bounds="[100,2100][980,2300]" />
+  </node>
+</hierarchy>
+"""
+EMPTY_SCREEN = "<hierarchy rotation=\"0\" />"
 
-class FakeObject:
-    def __init__(self, found):
-        self.found = found
-        self.clicked = False
 
-    def wait(self, timeout):
-        return self.found
+class FakeU2Device:
+    def __init__(self, dumps):
+        self.dumps = list(dumps)
+        self.dump_count = 0
+        self.clicks = []
 
-    def click(self):
-        self.clicked = True
+    def dump_hierarchy(self, compressed=False):
+        self.dump_count += 1
+        return self.dumps.pop(0) if len(self.dumps) > 1 else self.dumps[0]
 
+    def click(self, x, y):
+        self.clicks.append((x, y))
 
-class FakeDevice:
-    def __init__(self, found=True):
-        self.obj = FakeObject(found)
 
-    def __call__(self, **kwargs):
-        return self.obj
+def _texts(nodes):
+    return [node.attributes["text"] for node in nodes]
 
 
-class SelectorServiceTest(unittest.TestCase):
-    def test_selector_requires_exactly_one_selector(self):
+class XPathSelectorTest(unittest.TestCase):
+    def setUp(self):
+        self.nodes = parse_hierarchy_nodes(SCREEN)
+
+    def test_descendant_steps_with_short_class_and_position(self):
+        self.assertEqual(_texts(XPathSelector("//RecyclerView/TextView[2]").select(self.nodes)), ["Order #13"])
+        self.assertEqual(
+            _texts(XPathSelector("/hierarchy/node/android.widget.Button").select(self.nodes)), ["Sign in"]
+        )
+
+    def test_descendant_positions_count_siblings_under_each_parent(self):
+        self.assertEqual(_texts(XPathSelector("//TextView[1]").select(self.nodes)), ["Sign in", "Order #12"])
+        self.assertEqual(_texts(XPathSelector("//TextView[2]").select(self.nodes)), ["Order #13"])
+        self.assertEqual(_texts(XPathSelector("//*[@clickable='true'][2]").select(self.nodes)), ["Order #13"])
+
+    def test_predicates_functions_and_boolean_operators(self):
+        cases = {
+            "//*[@resource-id='com.example:id/row' and not(@text='Order #13')]": ["Order #12", "Order #14"],
+            "//*[contains(@text,'Sign') and @clickable='true']": ["Sign in"],
+            "//TextView[matches(text(),'#1[34]$') or starts-with(@text,'Sign')]": ["Sign in", "Order #13", "Order #14"],
+            "//node[@content-desc]": ["Sign in"],
+        }
+        for expression, expected in cases.items():
+            with self.subTest(expression=expression):
+                self.assertEqual(_texts(XPathSelector(expression).select(self.nodes)), expected)
+
+    def test_invalid_expressions_are_rejected(self):
+        for expression in ("TextView", "//TextView[@text=", "//TextView[matches(@text,'(')]", "//*[#]"):
+            with self.subTest(expression=expression), self.assertRaises(ValidationError):
+                XPathSelector(expression)
+
+
+class UiSelectorTest(unittest.TestCase):
+    def setUp(self):
+        self.nodes = parse_hierarchy_nodes(SCREEN)
+
+    def test_combined_criteria_regex_index_and_area(self):
+        rows = UiSelector(resource_id="com.example:id/row", regex=False).select(self.nodes)
+        self.assertEqual(_texts(rows), ["Order #12", "Order #13"])  # Order #14 has zero height.
+
+        second = UiSelector(text=r"Order #\d+", class_name=r".*TextView", regex=True, index=1).select(self.nodes)
+        self.assertEqual(_texts(second), ["Order #13"])
+
+        both = UiSelector(text="Sign in", class_name="android.widget.Button").select(self.nodes)
+        self.assertEqual([node.attributes["resource-id"] for node in both], ["com.example:id/submit"])
+
+    def test_selector_requires_a_criterion(self):
+        with self.assertRaises(ValidationError):
+            UiSelector()
         with self.assertRaises(ValidationError):
-            SelectorService.click(FakeDevice(), text="a", resource_id="id")
+            UiSelector(text="(", regex=True)
 
-    def test_selector_not_found(self):
-        with self.assertRaises(UiElementNotFoundError):
-            SelectorService.click(FakeDevice(found=False), text="missing")
 
-    def test_selector_click_success(self):
-        device = FakeDevice(found=True)
-        result = SelectorService.click(device, text="hello")
-        self.assertIn("Clicked element", result)
-        self.assertTrue(device.obj.clicked)
+class SelectorServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.service = SelectorService(HierarchyService(snapshot_max_age_s=60.0), sleep=self.sleeps.append)
+
+    def test_click_taps_center_of_match_with_one_dump(self):
+        device = FakeU2Device([SCREEN])
+        ui_state = UiStateTracker()
+        result = self.service.click(device, xpath="//Button[@text='Sign in']", ui_state=ui_state)
+
+        self.assertIn("at (540, 2200)", result)
+        self.assertEqual(device.clicks, [(540, 2200)])
+        self.assertEqual(device.dump_count, 1)
+        self.assertEqual(ui_state.generation, 1)
+
+    def test_click_polls_with_backoff_until_element_appears(self):
+        device = FakeU2Device([EMPTY_SCREEN, EMPTY_SCREEN, EMPTY_SCREEN, SCREEN])
+        self.service.click(device, content_desc="Submit form", timeout_s=30.0, ui_state=UiStateTracker())
+        self.assertEqual(device.dump_count, 4)
+        self.assertEqual(self.sleeps, [0.1, 0.2])
+
+    def test_match_from_a_bumped_generation_is_rechecked_on_a_fresh_dump(self):
+        ui_state = UiStateTracker()
+        device = FakeU2Device([SCREEN])
+        dump_hierarchy = device.dump_hierarchy
+
+        def dump_racing_a_shell_command(compressed=False):
+            xml = dump_hierarchy(compressed)
+            if device.dump_count == 1:
+                ui_state.bump()
+            return xml
+
+        device.dump_hierarchy = dump_racing_a_shell_command
+        self.service.click(device, content_desc="Submit form", ui_state=ui_state)
+
+        self.assertEqual(device.dump_count, 2)
+        self.assertEqual(device.clicks, [(540, 2200)])
+        self.assertEqual(self.sleeps, [])
+
+    def test_selector_not_found_does_not_bump_generation(self):
+        device = FakeU2Device([EMPTY_SCREEN])
+        ui_state = UiStateTracker()
+        with self.assertRaises(UiElementNotFoundError):
+            self.service.click(device, text="missing", timeout_s=0, ui_state=ui_state)
+        self.assertEqual(ui_state.generation, 0)
+        self.assertEqual(device.clicks, [])
 
 
 if __name__ == "__main__":
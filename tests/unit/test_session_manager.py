@@ -1,7 +1,12 @@
 import unittest
 from concurrent.futures import ThreadPoolExecutor
+from threading import Event
 from time import sleep
 
+from errors import DeviceResolutionError
+
+from orchestration.health_monitor import SessionHealthMonitor
+from orchestration.session_reaper import SessionReaper
 from orchestration.session_manager import DeviceSessionManager
 
 
@@ -50,6 +55,41 @@ class FakeU2Provider:
         return {"u2": serial}
 
 
+class ClosableU2Device:
+    def __init__(self):
+        self.closed = False
+        self._reqsess = ClosableHttpSession()
+
+    def close(self):
+        self.closed = True
+
+
+class ClosableHttpSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class BlockingU2Provider:
+    def __init__(self, blocked_serial, fail=False):
+        self.blocked_serial = blocked_serial
+        self.fail = fail
+        self.release = Event()
+        self.entered = Event()
+        self.connect_calls = 0
+
+    def connect(self, serial):
+        self.connect_calls += 1
+        if serial == self.blocked_serial:
+            self.entered.set()
+            self.release.wait(5.0)
+            if self.fail:
+                raise RuntimeError("uiautomator transport error")
+        return {"u2": serial}
+
+
 class SessionManagerTest(unittest.TestCase):
     def test_session_manager_uses_default_serial(self):
         manager = DeviceSessionManager(
@@ -106,13 +146,74 @@ class SessionManagerTest(unittest.TestCase):
             device_manager=FakeDeviceManager(["A"], device_factories={"A": factory}),
             u2_client_provider=FakeU2Provider(),
             default_serial=None,
-            healthcheck_interval_s=0.0,
         )
+        monitor = SessionHealthMonitor(manager, max_concurrency=1)
 
-        session = manager.get_session("A")
-        self.assertEqual(session.serial, "A")
+        s1 = manager.get_session("A")
+        self.assertEqual(monitor.run_once(force=True), 1)
+        self.assertFalse(s1.healthy)
+
+        s2 = manager.get_session("A")
+        self.assertIsNot(s1, s2)
+        self.assertTrue(s2.healthy)
         self.assertEqual(created, 2)
 
+    def test_session_manager_get_session_does_not_probe_inline(self):
+        adb_device = FakeAdbDevice(states=["offline"])
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"], device_factories={"A": lambda: adb_device}),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            healthcheck_interval_s=5.0,
+        )
+        s1 = manager.get_session("A")
+        s2 = manager.get_session("A")
+        self.assertIs(s1, s2)
+        self.assertEqual(adb_device._index, 0)
+
+    def test_zero_healthcheck_interval_probes_on_every_call_unless_disabled(self):
+        created = []
+
+        def factory():
+            created.append(FakeAdbDevice(states=["offline"] if not created else ["device"]))
+            return created[-1]
+
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"], device_factories={"A": factory}),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            healthcheck_interval_s=0.0,
+        )
+        session = manager.get_session("A")
+        self.assertEqual(len(created), 2)
+        self.assertTrue(session.healthy)
+        manager.get_session("A")
+        self.assertEqual(created[1]._index, 1)
+
+        created.clear()
+        disabled = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"], device_factories={"A": factory}),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            healthcheck_interval_s=0.0,
+            healthcheck_enabled=False,
+        )
+        disabled.get_session("A")
+        self.assertEqual(created[0]._index, 0)
+
+    def test_health_monitor_only_probes_due_sessions(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            healthcheck_interval_s=3600.0,
+        )
+        monitor = SessionHealthMonitor(manager)
+        manager.get_session("A")
+
+        self.assertEqual(monitor.run_once(force=True), 1)
+        self.assertEqual(monitor.run_once(), 0)
+
     def test_session_manager_eviction_on_ttl(self):
         manager = DeviceSessionManager(
             device_manager=FakeDeviceManager(["A"]),
@@ -153,6 +254,174 @@ class SessionManagerTest(unittest.TestCase):
         self.assertIs(s1, s2)
         self.assertEqual(provider.connect_calls, 1)
 
+    def test_session_manager_evicts_session_on_detach(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+        )
+        manager.get_session("A")
+        manager.handle_device_event("A", present=False)
+        self.assertEqual(manager.active_sessions(), [])
+
+    def test_session_manager_slow_device_does_not_block_other_serials(self):
+        provider = BlockingU2Provider(blocked_serial="A")
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A", "B"]),
+            u2_client_provider=provider,
+            default_serial=None,
+            healthcheck_interval_s=3600.0,
+        )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow = pool.submit(manager.get_session, "A")
+            self.assertTrue(provider.entered.wait(1.0))
+            session_b = pool.submit(manager.get_session, "B").result(timeout=1.0)
+            self.assertEqual(session_b.serial, "B")
+            self.assertFalse(slow.done())
+            provider.release.set()
+            self.assertEqual(slow.result(timeout=1.0).serial, "A")
+
+    def test_session_manager_shares_creation_failure_with_waiters(self):
+        provider = BlockingU2Provider(blocked_serial="A", fail=True)
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=provider,
+            default_serial=None,
+            connect_retries=0,
+        )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(manager.get_session, "A")
+            self.assertTrue(provider.entered.wait(1.0))
+            second = pool.submit(manager.get_session, "A")
+            sleep(0.05)
+            provider.release.set()
+            with self.assertRaises(DeviceResolutionError):
+                first.result(timeout=1.0)
+            with self.assertRaises(DeviceResolutionError):
+                second.result(timeout=1.0)
+
+        self.assertEqual(provider.connect_calls, 1)
+
+    def test_reap_idle_closes_expired_sessions_but_skips_busy_ones(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A", "B"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            session_ttl_s=10.0,
+        )
+        idle = manager.get_session("A")
+        busy = manager.get_session("B")
+        busy.begin_call()
+        now = max(idle.last_used_at, busy.last_used_at) + 60.0
+
+        self.assertEqual(manager.reap_idle(now=now), ["A"])
+        self.assertEqual(manager.active_sessions(), ["B"])
+        stats = manager.session_stats(now=now)
+        self.assertEqual(stats["evictions"]["idle"], 1)
+        self.assertEqual(stats["skipped_in_flight"], 1)
+        self.assertEqual(stats["sessions"][0]["in_flight"], 1)
+
+        busy.end_call()
+        self.assertEqual(manager.reap_idle(now=busy.last_used_at + 60.0), ["B"])
+        self.assertEqual(manager.active_sessions(), [])
+
+    def test_max_sessions_evicts_least_recently_used(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A", "B", "C"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            max_sessions=2,
+        )
+        manager.get_session("A").touch(now=1.0)
+        manager.get_session("B").touch(now=2.0)
+        manager.get_session("A").touch(now=3.0)
+        manager.get_session("C")
+
+        self.assertEqual(manager.active_sessions(), ["A", "C"])
+        self.assertEqual(manager.session_stats()["evictions"]["lru"], 1)
+
+    def test_max_sessions_never_evicts_busy_sessions(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A", "B"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            max_sessions=1,
+        )
+        manager.get_session("A").begin_call()
+        manager.get_session("B")
+
+        self.assertEqual(manager.active_sessions(), ["A", "B"])
+        manager.get_session("B").touch(now=0.0)
+        manager.get_session("A").end_call()
+        self.assertEqual(manager.reap_idle(), ["B"])
+        self.assertEqual(manager.active_sessions(), ["A"])
+
+    def test_leased_session_is_not_evicted_before_its_call_is_queued(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A", "B"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            session_ttl_s=10.0,
+            max_sessions=1,
+        )
+        leased = manager.lease_session("A")
+        manager.get_session("B").touch(now=0.0)
+
+        self.assertEqual(leased.in_flight, 1)
+        self.assertEqual(manager.reap_idle(now=leased.last_used_at + 60.0), ["B"])
+        self.assertEqual(manager.active_sessions(), ["A"])
+
+        leased.end_call()
+        self.assertEqual(manager.reap_idle(now=leased.last_used_at + 60.0), ["A"])
+
+    def test_cleared_session_is_closed_only_after_its_last_call_ends(self):
+        u2_device = ClosableU2Device()
+        provider = FakeU2Provider()
+        provider.connect = lambda serial: u2_device
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=provider,
+            default_serial=None,
+        )
+        busy = manager.lease_session("A")
+
+        self.assertTrue(manager.clear_session("A"))
+        self.assertEqual(manager.active_sessions(), [])
+        self.assertFalse(u2_device.closed)
+
+        busy.end_call()
+        self.assertTrue(u2_device.closed)
+
+    def test_closing_a_session_closes_the_u2_client_and_its_http_session(self):
+        u2_device = ClosableU2Device()
+        provider = FakeU2Provider()
+        provider.connect = lambda serial: u2_device
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=provider,
+            default_serial=None,
+        )
+        manager.get_session("A")
+
+        self.assertTrue(manager.clear_session("A"))
+        self.assertTrue(u2_device.closed)
+        self.assertTrue(u2_device._reqsess.closed)
+
+    def test_session_reaper_run_once_and_disabled_interval(self):
+        manager = DeviceSessionManager(
+            device_manager=FakeDeviceManager(["A"]),
+            u2_client_provider=FakeU2Provider(),
+            default_serial=None,
+            session_ttl_s=0.01,
+        )
+        manager.get_session("A")
+        sleep(0.05)
+
+        self.assertEqual(SessionReaper(manager).run_once(), ["A"])
+        self.assertFalse(SessionReaper(manager, interval_s=0).enabled)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from orchestration.session_warmer import SessionWarmer
+
+
+class FakeDeviceManager:
+    def __init__(self, serials):
+        self.serials = serials
+
+    def list_serials(self):
+        return list(self.serials)
+
+
+class FakeSessionManager:
+    def __init__(self, connect_s=0.1, failing=()):
+        self.connect_s = connect_s
+        self.failing = set(failing)
+        self.connects = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def get_session(self, serial):
+        with self.lock:
+            self.connects.append(serial)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.connect_s)
+        with self.lock:
+            self.running -= 1
+        if serial in self.failing:
+            raise RuntimeError(f"uiautomator2 failed to start on {serial}")
+        return SimpleNamespace(serial=serial)
+
+    def probe_session(self, session):
+        return True
+
+
+class SessionWarmerTest(unittest.TestCase):
+    def test_warms_attached_devices_in_parallel_and_reports_readiness(self):
+        session_manager = FakeSessionManager(failing={"C"})
+        warmer = SessionWarmer(session_manager, FakeDeviceManager(["A", "B", "C", "D"]), max_concurrency=2)
+
+        started_at = time.monotonic()
+        status = warmer.warm(wait_s=5.0)
+
+        self.assertLess(time.monotonic() - started_at, 0.35)
+        self.assertEqual(session_manager.peak, 2)
+        states = {serial: item["state"] for serial, item in status.items()}
+        self.assertEqual(states, {"A": "ready", "B": "ready", "C": "failed", "D": "ready"})
+        self.assertIn("failed to start on C", status["C"]["error"])
+        self.assertEqual(status["A"]["attempts"], 1)
+        warmer.stop()
+
+    def test_concurrent_requests_share_one_warm_up(self):
+        session_manager = FakeSessionManager(connect_s=0.2)
+        warmer = SessionWarmer(session_manager, FakeDeviceManager(["A"]))
+
+        self.assertIn(warmer.warm(["A"])["A"]["state"], {"pending", "warming"})
+        status = warmer.warm(["A"], wait_s=5.0)
+
+        self.assertEqual(status["A"]["state"], "ready")
+        self.assertEqual(session_manager.connects, ["A"])
+        warmer.stop()
+
+    def test_submit_returns_futures_an_event_loop_can_await(self):
+        session_manager = FakeSessionManager(connect_s=0.05)
+        warmer = SessionWarmer(session_manager, FakeDeviceManager(["A", "B"]))
+
+        async def warm_and_wait():
+            futures = warmer.submit()
+            await asyncio.wait([asyncio.wrap_future(future) for future in futures.values()], timeout=5.0)
+            return warmer.status(list(futures))
+
+        status = asyncio.run(warm_and_wait())
+
+        self.assertEqual({serial: item["state"] for serial, item in status.items()}, {"A": "ready", "B": "ready"})
+        warmer.stop()
+
+    def test_attach_events_warm_configured_serials_and_detach_forgets_them(self):
+        session_manager = FakeSessionManager(connect_s=0.0)
+        warmer = SessionWarmer(session_manager, FakeDeviceManager([]), serials=["A"], on_attach=True)
+
+        warmer.handle_device_event("A", True)
+        warmer.handle_device_event("B", True)
+        deadline = time.monotonic() + 5.0
+        while warmer.status(["A"])["A"]["state"] != "ready" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(session_manager.connects, ["A"])
+        self.assertEqual(warmer.status(["B"]), {"B": {"state": "unknown"}})
+        warmer.handle_device_event("A", False)
+        self.assertEqual(warmer.status(), {})
+        warmer.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
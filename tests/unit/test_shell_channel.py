@@ -0,0 +1,181 @@
+import socket
+import struct
+import subprocess
+import threading
+import unittest
+
+from adb.shell_channel import BoundedOutput, ShellChannel, ShellChannelPool
+
+HEADER = struct.Struct("<BI")
+
+
+class FakeAdbShell:
+    """Device side of a shell transport: bridges a socket to a local ``sh`` process."""
+
+    def __init__(self, v2: bool, chunk_size: int = 4096):
+        self.v2 = v2
+        self.chunk_size = chunk_size
+        self.host_sock, self._device_sock = socket.socketpair()
+        self._send_lock = threading.Lock()
+        self.process = subprocess.Popen(
+            ["sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if v2 else subprocess.STDOUT,
+        )
+        threading.Thread(target=self._pump_stdin, daemon=True).start()
+        threading.Thread(target=self._pump_output, args=(self.process.stdout, 1), daemon=True).start()
+        if v2:
+            threading.Thread(target=self._pump_output, args=(self.process.stderr, 2), daemon=True).start()
+
+    def _pump_stdin(self):
+        buffer = b""
+        try:
+            while True:
+                chunk = self._device_sock.recv(65536)
+                if not chunk:
+                    break
+                if not self.v2:
+                    self.process.stdin.write(chunk)
+                    self.process.stdin.flush()
+                    continue
+                buffer += chunk
+                while len(buffer) >= HEADER.size:
+                    packet_id, length = HEADER.unpack_from(buffer)
+                    if len(buffer) < HEADER.size + length:
+                        break
+                    payload, buffer = buffer[HEADER.size : HEADER.size + length], buffer[HEADER.size + length :]
+                    if packet_id == 0:
+                        self.process.stdin.write(payload)
+                        self.process.stdin.flush()
+        except OSError:
+            pass
+        finally:
+            self.process.kill()
+
+    def _pump_output(self, pipe, packet_id):
+        try:
+            while True:
+                data = pipe.read1(self.chunk_size)
+                if not data:
+                    break
+                for start in range(0, len(data), self.chunk_size):
+                    piece = data[start : start + self.chunk_size]
+                    with self._send_lock:
+                        self._device_sock.sendall(HEADER.pack(packet_id, len(piece)) + piece if self.v2 else piece)
+        except OSError:
+            pass
+
+    def close(self):
+        self.process.kill()
+        self._device_sock.close()
+        self.host_sock.close()
+
+
+class ShellChannelTest(unittest.TestCase):
+    def setUp(self):
+        self.shells = []
+
+    def tearDown(self):
+        for shell in self.shells:
+            shell.close()
+
+    def _channel(self, v2=True, chunk_size=4096):
+        shell = FakeAdbShell(v2=v2, chunk_size=chunk_size)
+        self.shells.append(shell)
+        return ShellChannel(shell.host_sock, v2=v2)
+
+    def test_v2_batch_reports_exit_codes_and_separate_streams(self):
+        channel = self._channel(v2=True)
+        results = channel.run(["echo hello", "echo oops >&2; exit 3", "printf 'no newline'", "cd /; exit 0"])
+
+        self.assertEqual([result.exit_code for result in results], [0, 3, 0, 0])
+        self.assertEqual((results[0].stdout, results[0].stderr), ("hello\n", ""))
+        self.assertEqual((results[1].stdout, results[1].stderr), ("", "oops\n"))
+        self.assertEqual(results[2].stdout, "no newline")
+        # Commands run in their own sh -c, so the channel survives "exit".
+        self.assertEqual(channel.run(["echo still here"])[0].stdout, "still here\n")
+
+    def test_legacy_merges_stderr_and_handles_markers_split_across_reads(self):
+        channel = self._channel(v2=False, chunk_size=1)
+        results = channel.run(["echo out; echo err >&2; false", "echo second"])
+
+        self.assertEqual([result.exit_code for result in results], [1, 0])
+        self.assertEqual(results[0].stdout, "out\nerr\n")
+        self.assertEqual(results[1].stdout, "second\n")
+
+    def test_timeout_closes_channel_and_skips_remaining_commands(self):
+        channel = self._channel(v2=True)
+        results = channel.run(["echo before", "sleep 5", "echo never"], timeout_s=0.3)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].stdout, "before\n")
+        self.assertTrue(results[1].timed_out)
+        self.assertIsNone(results[1].exit_code)
+        self.assertTrue(channel.closed)
+
+    def test_long_output_is_bounded(self):
+        channel = self._channel(v2=True)
+        result = channel.run(["head -c 200000 /dev/zero | tr '\\0' x; echo end"], max_output_bytes=1000)[0]
+
+        self.assertEqual(result.output_bytes, 200004)
+        self.assertTrue(result.truncated)
+        self.assertTrue(result.stdout.startswith("x" * 500))
+        self.assertTrue(result.stdout.endswith("xxxend\n"))
+        self.assertIn("[199004 bytes omitted]", result.stdout)
+
+
+class BoundedOutputTest(unittest.TestCase):
+    def test_keeps_head_and_tail(self):
+        output = BoundedOutput(6)
+        for chunk in (b"abc", b"defg", b"hij"):
+            output.write(chunk)
+        self.assertEqual(output.total_bytes, 10)
+        self.assertTrue(output.truncated)
+        self.assertEqual(output.text(), "abc\n... [4 bytes omitted] ...\nhij")
+
+
+class ShellChannelPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.shells = []
+
+    def tearDown(self):
+        for shell in self.shells:
+            shell.close()
+
+    def _open(self):
+        shell = FakeAdbShell(v2=True)
+        self.shells.append(shell)
+        return ShellChannel(shell.host_sock, v2=True)
+
+    def test_reuses_channels_and_replaces_timed_out_ones(self):
+        pool = ShellChannelPool(self._open, max_channels=1)
+        self.assertEqual(pool.run(["echo 1"])[0].stdout, "1\n")
+        self.assertEqual(pool.run(["echo 2"])[0].stdout, "2\n")
+        self.assertEqual((pool.stats()["opened"], pool.stats()["reused"]), (1, 1))
+
+        self.assertTrue(pool.run(["sleep 5"], timeout_s=0.2)[0].timed_out)
+        self.assertEqual(pool.run(["echo 3"])[0].stdout, "3\n")
+        stats = pool.stats()
+        self.assertEqual((stats["opened"], stats["discarded"], stats["idle"], stats["busy"]), (2, 1, 1, 0))
+        self.assertEqual(stats["protocol"], "v2")
+
+        pool.close()
+        self.assertEqual(pool.stats()["idle"], 0)
+
+    def test_run_reports_output_chunks_as_they_arrive(self):
+        pool = ShellChannelPool(self._open)
+        chunks = []
+        results = pool.run(
+            ["echo a; echo b >&2", "exit 7"],
+            max_output_bytes=1,
+            on_output=lambda index, kind, chunk: chunks.append((index, kind, chunk)),
+        )
+
+        self.assertIn((0, "stdout", b"a\n"), chunks)
+        self.assertIn((0, "stderr", b"b\n"), chunks)
+        self.assertEqual([result.exit_code for result in results], [0, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import socket
+import threading
+import time
+import unittest
+
+from adb.wire_client import AdbConnectionPool, AdbWireClient, AdbWireError, PooledAdbDevice
+
+
+class FakeAdbServer:
+    """Speaks enough of the adb server smart-socket protocol for the pooled client."""
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.transport_handshakes = 0
+        self.services = []
+        self._waiting: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def drop_idle(self):
+        """Close connections that selected a transport but have not started a service yet."""
+        with self._lock:
+            waiting, self._waiting = self._waiting, []
+        for sock in waiting:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self._server.close()
+        self.drop_idle()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(sock,), daemon=True).start()
+
+    def _handle(self, sock):
+        serial = None
+        try:
+            while True:
+                request = self._read_request(sock)
+                if request is None:
+                    return
+                with self._lock:
+                    if sock in self._waiting:
+                        self._waiting.remove(sock)
+                if request == "host:devices":
+                    listing = "".join(f"{name}\t{state}\n" for name, state in self.devices.items())
+                    sock.sendall(b"OKAY" + _block(listing))
+                    return
+                if request.startswith("host-serial:") and request.endswith(":get-state"):
+                    name = request[len("host-serial:") : -len(":get-state")]
+                    if name in self.devices:
+                        sock.sendall(b"OKAY" + _block(self.devices[name]))
+                    else:
+                        sock.sendall(b"FAIL" + _block(f"device '{name}' not found"))
+                    return
+                if request.startswith("host:transport:"):
+                    name = request[len("host:transport:") :]
+                    if self.devices.get(name) != "device":
+                        sock.sendall(b"FAIL" + _block(f"device '{name}' not found"))
+                        return
+                    serial = name
+                    with self._lock:
+                        self.transport_handshakes += 1
+                        self._waiting.append(sock)
+                    sock.sendall(b"OKAY")
+                    continue
+                if request.startswith("shell:") and serial is not None:
+                    with self._lock:
+                        self.services.append((serial, request))
+                    sock.sendall(b"OKAY" + f"{serial}:{request[len('shell:'):]}\n".encode())
+                    return
+                sock.sendall(b"FAIL" + _block(f"unknown request {request}"))
+                return
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                if sock in self._waiting:
+                    self._waiting.remove(sock)
+            sock.close()
+
+    @staticmethod
+    def _read_request(sock):
+        header = b""
+        while len(header) < 4:
+            chunk = sock.recv(4 - len(header))
+            if not chunk:
+                return None
+            header += chunk
+        length = int(header, 16)
+        payload = b""
+        while len(payload) < length:
+            chunk = sock.recv(length - len(payload))
+            if not chunk:
+                return None
+            payload += chunk
+        return payload.decode()
+
+
+def _block(text):
+    data = text.encode()
+    return f"{len(data):04x}".encode() + data
+
+
+def _wait_for(predicate, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class AdbWireClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAdbServer({"A": "device", "B": "offline"})
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close()
+        self.server.close()
+
+    def _client(self, **kwargs):
+        pool = AdbConnectionPool("127.0.0.1", self.server.port, **kwargs)
+        self.pools.append(pool)
+        return AdbWireClient(pool)
+
+    def test_host_requests(self):
+        client = self._client(prefill=False)
+        self.assertEqual(client.device_states(), {"A": "device", "B": "offline"})
+        self.assertEqual(client.get_state("A"), "device")
+        with self.assertRaisesRegex(AdbWireError, "not found"):
+            client.get_state("missing")
+        with self.assertRaisesRegex(AdbWireError, "not found"):
+            client.shell("B", "true")
+        self.assertEqual(client.pool.stats()["open"], 0)
+
+    def test_transport_connections_are_prefilled_and_reused(self):
+        client = self._client(max_idle_per_serial=2)
+        device = PooledAdbDevice(client, "A")
+
+        self.assertEqual(device.shell("echo hi"), "A:echo hi")
+        self.assertTrue(_wait_for(lambda: client.pool.stats()["idle"] == 2))
+        self.assertEqual(device.shell(["getprop", "ro.build.id"], encoding=None), b"A:getprop ro.build.id\n")
+
+        stats = client.pool.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertTrue(_wait_for(lambda: self.server.transport_handshakes == 4))
+        services = [service for _, service in self.server.services]
+        self.assertEqual(services, ["shell:echo hi", "shell:getprop ro.build.id"])
+
+    def test_dead_idle_connections_fail_the_health_check(self):
+        client = self._client(max_idle_per_serial=1)
+        client.shell("A", "first")
+        self.assertTrue(_wait_for(lambda: client.pool.stats()["idle"] == 1))
+
+        self.server.drop_idle()
+        self.assertTrue(_wait_for(lambda: not client.pool._idle["A"][0].is_alive()))
+        self.assertEqual(client.shell("A", "second"), b"A:second\n")
+
+        stats = client.pool.stats()
+        self.assertEqual((stats["health_check_failures"], stats["hits"], stats["misses"]), (1, 0, 2))
+
+    def test_connection_limit(self):
+        client = self._client(prefill=False, max_connections=1, connect_timeout_s=0.1)
+        held = client.pool.acquire_transport("A")
+
+        with self.assertRaisesRegex(AdbWireError, "limit reached"):
+            client.get_state("A")
+        self.assertEqual(client.pool.stats()["limit_waits"], 1)
+
+        held.close()
+        self.assertEqual(client.get_state("A"), "device")
+        self.assertEqual(client.pool.stats()["open"], 0)
+
+    def test_stream_shell_returns_open_connection(self):
+        device = PooledAdbDevice(self._client(prefill=False), "A")
+        connection = device.shell("logcat", stream=True)
+        self.assertEqual(connection.conn.recv(100), b"A:logcat\n")
+        connection.close()
+
+    def test_long_lived_services_do_not_hold_connection_slots(self):
+        client = self._client(prefill=False, max_connections=1, connect_timeout_s=0.1)
+        device = PooledAdbDevice(client, "A")
+        stream = device.shell("logcat", stream=True)
+        transport = device.open_transport()
+
+        self.assertEqual(client.get_state("A"), "device")
+        stats = client.pool.stats()
+        self.assertEqual((stats["open"], stats["long_lived"], stats["limit_waits"]), (0, 2, 0))
+
+        stream.close()
+        transport.close()
+        self.assertEqual(client.pool.stats()["long_lived"], 0)
+
+    def test_long_lived_service_reuses_an_idle_connection_and_frees_its_slot(self):
+        client = self._client(max_idle_per_serial=1)
+        client.shell("A", "first")
+        self.assertTrue(_wait_for(lambda: client.pool.stats()["idle"] == 1))
+        client.pool._refiller.shutdown(wait=True)
+
+        connection = client.pool.acquire_long_lived("A")
+
+        stats = client.pool.stats()
+        self.assertEqual((stats["open"], stats["long_lived"], stats["hits"]), (0, 1, 1))
+        connection.close()
+        self.assertEqual(client.pool.stats()["long_lived"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()